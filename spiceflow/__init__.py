@@ -9,9 +9,28 @@ for planetary explorers.
 # current version
 from .version import __version__
 
-from .simulate import simulate
+from .simulate import simulate, simulate_series
 from .render import render
+from .events import find_fov_events
 from .furnsh import remote_furnsh
+from .parallel import simulate_parallel
+from .stream import render_sequence
+from .tiled import render_tiled
+from .xml_util import write_svdoc
+from .export import export_npz, export_parquet
 
 
-__all__ = [__version__, "simulate", "render", "remote_furnsh"]
+__all__ = [
+    __version__,
+    "simulate",
+    "simulate_series",
+    "simulate_parallel",
+    "render",
+    "render_sequence",
+    "render_tiled",
+    "write_svdoc",
+    "export_npz",
+    "export_parquet",
+    "remote_furnsh",
+    "find_fov_events",
+]
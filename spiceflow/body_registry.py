@@ -0,0 +1,109 @@
+import numpy as np
+import spiceypy as spice
+from .util import get_object_type, loaded_kernels
+
+
+def get_body_frame(target, object_id):
+    """
+    Obtain the body-fixed frame of a body
+
+    Parameters
+    ----------
+    target : str
+        body name
+    object_id : int
+        NAIF ID of the body
+
+    Returns
+    -------
+    frame : str
+        body-fixed frame name, or None if no frame is defined
+    """
+    iau_frame = f"IAU_{target}"
+    frcode = spice.namfrm(iau_frame)
+    if frcode == 0:
+        frame_name = f"FRAME_{object_id}_NAME"
+        try:
+            iau_frame = spice.gcpool(frame_name, 0, 1)[0]
+        except spice.utils.support_types.SpiceyError:
+            return None
+        if spice.namfrm(iau_frame) == 0:
+            return None
+    return iau_frame
+
+
+def get_body_radii(object_id):
+    """
+    Obtain the radii of a body
+
+    Parameters
+    ----------
+    object_id : int
+        NAIF ID of the body
+
+    Returns
+    -------
+    radii : numpy.ndarray
+        triaxial radii in km, or None if the radii are not defined
+    """
+    try:
+        return np.array(spice.gdpool(f"BODY{object_id}_RADII", 0, 3))
+    except spice.utils.support_types.SpiceyError:
+        return None
+
+
+def build_body_registry():
+    """
+    Build the list of unique bodies in the loaded SPK files
+
+    Returns
+    -------
+    bodies : list
+        dicts with the NAIF ID, name, type, radii and body-fixed frame of
+        each body, in the order of first appearance in the SPK files; bodies
+        whose attributes cannot be obtained are skipped
+    """
+    bodies = {}
+    for filename in loaded_kernels("SPK"):
+        ids = spice.spkobj(filename)
+        for i in range(spice.card(ids)):
+            obj = ids[i]
+            if obj in bodies:
+                continue
+            try:
+                name = spice.bodc2s(obj)
+                bodies[obj] = {
+                    "naif_id": obj,
+                    "name": name,
+                    "type": get_object_type(obj),
+                    "radii": get_body_radii(obj),
+                    "frame": get_body_frame(name, obj),
+                }
+            except spice.utils.support_types.SpiceyError:
+                continue
+    return list(bodies.values())
+
+
+_bodies = None
+_bodies_kernels = None
+
+
+def get_bodies():
+    """
+    Obtain the unique bodies in the loaded SPK files
+
+    The registry is built once and rebuilt only when kernels are loaded or
+    unloaded.
+
+    Returns
+    -------
+    bodies : list
+        dicts with the NAIF ID, name, type, radii and body-fixed frame of
+        each body
+    """
+    global _bodies, _bodies_kernels
+    kernels = loaded_kernels()
+    if _bodies is None or kernels != _bodies_kernels:
+        _bodies = build_body_registry()
+        _bodies_kernels = kernels
+    return _bodies
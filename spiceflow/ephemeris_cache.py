@@ -0,0 +1,204 @@
+import numpy as np
+import spiceypy as spice
+
+
+# validation status of the grid intervals
+_UNKNOWN = 0
+_VALID = 1
+_INVALID = 2
+
+
+class EphemerisCache:
+    """
+    Interpolation cache of positions and rotations over a time window
+
+    Positions are sampled on a regular grid with their velocities and
+    served by cubic Hermite interpolation, and rotations are sampled as
+    quaternions and served by spherical linear interpolation. The grid is
+    sampled lazily: the first epoch in a grid interval samples its two ends
+    (unless shared with a sampled neighbour) and validates the interval
+    against a direct SPICE call at its midpoint. Epochs in intervals
+    exceeding the tolerance or failing in SPICE, or outside the window, are
+    served by direct SPICE calls.
+
+    Validating an interval costs about two SPICE calls, so the cache pays
+    off when the epochs are denser than the grid, e.g. a frame sequence
+    with several frames per step.
+
+    The methods spkpos and pxform have the same signatures as those of
+    spiceypy, so the cache can be used in place of the spiceypy module.
+    """
+
+    def __init__(self, start, stop, step, pos_tol=1.0e-3, rot_tol=1.0e-8):
+        """
+        Parameters
+        ----------
+        start : float
+            start of the window in ephemeris time
+        stop : float
+            stop of the window in ephemeris time
+        step : float
+            grid step in seconds
+        pos_tol : float
+            tolerance of interpolated positions in km
+        rot_tol : float
+            tolerance of interpolated rotations in radians
+        """
+        self._grid = np.append(np.arange(start, stop, step), stop)
+        self._pos_tol = pos_tol
+        self._rot_tol = rot_tol
+        self._positions = {}
+        self._rotations = {}
+
+    @property
+    def start(self):
+        return self._grid[0]
+
+    @property
+    def stop(self):
+        return self._grid[-1]
+
+    def _interval(self, et):
+        if et < self._grid[0] or et > self._grid[-1]:
+            return None
+        i = np.searchsorted(self._grid, et, side="right") - 1
+        i = min(i, len(self._grid) - 2)
+        t0 = self._grid[i]
+        return i, (et - t0) / (self._grid[i + 1] - t0)
+
+    def _new_entry(self, width):
+        n = len(self._grid)
+        return {
+            "samples": np.full((n, width), np.nan),
+            "lts": np.full(n, np.nan),
+            "status": np.full(n - 1, _UNKNOWN, dtype=np.int8),
+        }
+
+    def _sample_positions(self, key, entry, i):
+        targ, ref, abcorr, obs = key
+        states = entry["samples"]
+        lts = entry["lts"]
+        mid = (self._grid[i] + self._grid[i + 1]) / 2.0
+        try:
+            for j in (i, i + 1):
+                if np.isnan(lts[j]):
+                    state, lt = spice.spkezr(
+                        targ, self._grid[j], ref, abcorr, obs
+                    )
+                    states[j] = state
+                    lts[j] = lt
+            actual, _lt = spice.spkpos(targ, mid, ref, abcorr, obs)
+        except spice.utils.support_types.SpiceyError:
+            return _INVALID
+        h = self._grid[i + 1] - self._grid[i]
+        estimate = _hermite(states[i], states[i + 1], h, 0.5)
+        if np.linalg.norm(estimate - actual) <= self._pos_tol:
+            return _VALID
+        return _INVALID
+
+    def _sample_rotations(self, key, entry, i):
+        fromfr, tofr = key
+        quats = entry["samples"]
+        mid = (self._grid[i] + self._grid[i + 1]) / 2.0
+        try:
+            for j in (i, i + 1):
+                if np.isnan(quats[j, 0]):
+                    quats[j] = spice.m2q(
+                        spice.pxform(fromfr, tofr, self._grid[j])
+                    )
+            actual = spice.pxform(fromfr, tofr, mid)
+        except spice.utils.support_types.SpiceyError:
+            return _INVALID
+        estimate = spice.q2m(_slerp(quats[i], quats[i + 1], 0.5))
+        cos_angle = (np.trace(np.dot(actual.T, estimate)) - 1.0) / 2.0
+        angle = np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        if angle <= self._rot_tol:
+            return _VALID
+        return _INVALID
+
+    def _lookup(self, entries, sample, key, et, width):
+        """ Obtain the sampled entry and the interval of et, if valid """
+        interval = self._interval(et)
+        if interval is None:
+            return None, None
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = self._new_entry(width)
+        i = interval[0]
+        if entry["status"][i] == _UNKNOWN:
+            entry["status"][i] = sample(key, entry, i)
+        if entry["status"][i] != _VALID:
+            return None, None
+        return entry, interval
+
+    def spkpos(self, targ, et, ref, abcorr, obs):
+        """
+        Return the position of a target relative to an observer
+
+        See spiceypy.spkpos for the parameters.
+        """
+        key = (targ, ref, abcorr, obs)
+        entry, interval = self._lookup(
+            self._positions, self._sample_positions, key, et, 6
+        )
+        if entry is None:
+            return spice.spkpos(targ, et, ref, abcorr, obs)
+
+        states = entry["samples"]
+        lts = entry["lts"]
+        i, s = interval
+        h = self._grid[i + 1] - self._grid[i]
+        pos = _hermite(states[i], states[i + 1], h, s)
+        lt = lts[i] + (lts[i + 1] - lts[i]) * s
+        return pos, lt
+
+    def pxform(self, fromfr, tofr, et):
+        """
+        Return the rotation matrix between two frames
+
+        See spiceypy.pxform for the parameters.
+        """
+        key = (fromfr, tofr)
+        entry, interval = self._lookup(
+            self._rotations, self._sample_rotations, key, et, 4
+        )
+        if entry is None:
+            return spice.pxform(fromfr, tofr, et)
+
+        quats = entry["samples"]
+        i, s = interval
+        return spice.q2m(_slerp(quats[i], quats[i + 1], s))
+
+
+def _hermite(state0, state1, h, s):
+    """ Cubic Hermite interpolation of positions from states """
+    state0 = np.asarray(state0)
+    state1 = np.asarray(state1)
+    h = np.reshape(h, np.shape(h) + (1,))
+    s2 = s * s
+    s3 = s2 * s
+    h00 = 2 * s3 - 3 * s2 + 1
+    h10 = s3 - 2 * s2 + s
+    h01 = -2 * s3 + 3 * s2
+    h11 = s3 - s2
+    return (
+        h00 * state0[..., 0:3]
+        + h10 * h * state0[..., 3:6]
+        + h01 * state1[..., 0:3]
+        + h11 * h * state1[..., 3:6]
+    )
+
+
+def _slerp(q0, q1, s):
+    """ Spherical linear interpolation of unit quaternions """
+    dot = np.dot(q0, q1)
+    if dot < 0.0:
+        q1 = -q1
+        dot = -dot
+    theta = np.arccos(min(dot, 1.0))
+    sin_theta = np.sin(theta)
+    if sin_theta < 1.0e-12:
+        return q0
+    return (
+        np.sin((1.0 - s) * theta) * q0 + np.sin(s * theta) * q1
+    ) / sin_theta
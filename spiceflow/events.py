@@ -0,0 +1,172 @@
+import os
+import numpy as np
+import spiceypy as spice
+from .body_registry import get_body_frame, get_body_radii
+from .fov import get_fov
+from .parallel import get_pool
+from .util import vec_dist
+
+
+__all__ = ["find_fov_events"]
+
+
+def _target_positions(target, ets, frame, abcorr, obsrvr):
+    try:
+        pos, _lt = spice.spkpos(target, ets, frame, abcorr, obsrvr)
+        return np.reshape(pos, (len(ets), 3))
+    except spice.utils.support_types.SpiceyError:
+        pass
+
+    # some epochs are not covered by the kernels
+    pos = np.full((len(ets), 3), np.nan)
+    for i, et in enumerate(ets):
+        try:
+            pos[i], _lt = spice.spkpos(target, et, frame, abcorr, obsrvr)
+        except spice.utils.support_types.SpiceyError:
+            pass
+    return pos
+
+
+def _candidate_window(fov, target, radius, ets, abcorr, obsrvr):
+    pos = _target_positions(target, ets, fov.frame, abcorr, obsrvr)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dist = np.linalg.norm(pos, axis=1)
+        ang_radius = np.arcsin(np.clip(radius / dist, 0.0, 1.0))
+        sep = vec_dist(fov.bounds_rect.center_vec, pos)
+
+        # the target may move across the FOV between samples, so samples
+        # within the angle to the adjacent target directions plus the
+        # angular radius of the target are candidates
+        motion = vec_dist(pos[:-1], pos[1:]) + np.fmax(
+            ang_radius[:-1], ang_radius[1:]
+        )
+        margin = np.fmax(
+            np.concatenate([ang_radius[:1], motion]),
+            np.concatenate([motion, ang_radius[-1:]]),
+        )
+        candidate = sep - fov.enclosing_angle <= margin
+
+    indices = np.flatnonzero(candidate)
+    window = spice.cell_double(2 * len(indices) + 2)
+    last = len(ets) - 1
+    for i in indices:
+        spice.wninsd(ets[max(i - 1, 0)], ets[min(i + 1, last)], window)
+    return window
+
+
+def _find_events(args):
+    inst, targets, start, stop, step, refine_step, abcorr, obsrvr = args
+    fov = get_fov(spice.bodn2c(inst))
+    ets = np.append(np.arange(start, stop, step), stop)
+
+    events = {}
+    for target in targets:
+        events[target] = []
+        naif_id = spice.bodn2c(target)
+        radii = get_body_radii(naif_id)
+        frame = get_body_frame(target, naif_id)
+        if radii is None or frame is None:
+            tshape, tframe, radius = "POINT", " ", 0.0
+        else:
+            tshape, tframe, radius = "ELLIPSOID", frame, np.max(radii)
+
+        cnfine = _candidate_window(fov, target, radius, ets, abcorr, obsrvr)
+        if spice.wncard(cnfine) == 0:
+            continue
+        result = spice.gftfov(
+            inst, target, tshape, tframe, abcorr, obsrvr, refine_step, cnfine
+        )
+        for i in range(spice.wncard(result)):
+            events[target].append(spice.wnfetd(result, i))
+    return events
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for left, right in sorted(intervals):
+        if merged and left <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], right))
+        else:
+            merged.append((left, right))
+    return merged
+
+
+def find_fov_events(
+    inst,
+    targets,
+    start,
+    stop,
+    step,
+    abcorr,
+    obsrvr,
+    refine_step=None,
+    kernels=None,
+    processes=None,
+):
+    """
+    Find time intervals when targets are in the FOV of an instrument
+
+    The target positions are sampled at every step to find candidate
+    windows where a target may be in the FOV, and only those windows are
+    searched by gftfov. The step must be shorter than the shortest event
+    to be found.
+
+    Parameters
+    ----------
+    inst : str
+        instrument name
+    targets : list
+        target names
+    start : str or float
+        start time as a time string or ephemeris time
+    stop : str or float
+        stop time as a time string or ephemeris time
+    step : float
+        sampling step of the coarse search in seconds
+    abcorr : str
+        aberration correction
+    obsrvr : str
+        observer name
+    refine_step : float
+        step of the gftfov search in seconds (default: step / 10)
+    kernels : str or list
+        meta-kernel or list of kernels; if given, the time range is split
+        across worker processes which load these kernels
+    processes : int
+        number of worker processes (default: os.cpu_count())
+
+    Returns
+    -------
+    events : dict
+        list of (start, stop) intervals in ephemeris time for each target
+    """
+    if isinstance(targets, str):
+        targets = [targets]
+    if isinstance(start, str):
+        start = spice.str2et(start)
+    if isinstance(stop, str):
+        stop = spice.str2et(stop)
+    if refine_step is None:
+        refine_step = step / 10.0
+
+    if kernels is None:
+        return _find_events(
+            (inst, targets, start, stop, step, refine_step, abcorr, obsrvr)
+        )
+
+    nsplit = processes if processes is not None else os.cpu_count()
+    bounds = np.linspace(start, stop, nsplit + 1)
+    args = [
+        (inst, targets, t0, t1, step, refine_step, abcorr, obsrvr)
+        for t0, t1 in zip(bounds[:-1], bounds[1:])
+    ]
+    with get_pool(kernels, processes) as pool:
+        results = pool.map(_find_events, args)
+
+    events = {}
+    for target in targets:
+        intervals = []
+        for result in results:
+            intervals.extend(result[target])
+        events[target] = _merge_intervals(intervals)
+    return events
@@ -0,0 +1,263 @@
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from .table import Table
+
+
+__all__ = [
+    "STAR_DTYPE",
+    "SOLAR_OBJECT_DTYPE",
+    "stars_to_array",
+    "solar_objects_to_array",
+    "export_npz",
+    "load_npz",
+    "export_parquet",
+]
+
+
+STAR_DTYPE = np.dtype(
+    [
+        ("frame", np.int32),
+        ("et", np.float64),
+        ("hip_id", np.int32),
+        ("image_pos", np.float64, (2,)),
+        ("ra", np.float64),
+        ("dec", np.float64),
+        ("visual_magnitude", np.float64),
+        ("distance", np.float64),
+        ("position", np.float64, (3,)),
+    ]
+)
+
+SOLAR_OBJECT_DTYPE = np.dtype(
+    [
+        ("frame", np.int32),
+        ("et", np.float64),
+        ("naif_id", np.int32),
+        ("name", "U36"),
+        ("image_pos", np.float64, (2,)),
+        ("magnitude", np.float64),
+        ("distance", np.float64),
+        ("position", np.float64, (3,)),
+        ("radius", np.float64, (3,)),
+        ("rotation", np.float64, (3, 3)),
+    ]
+)
+
+
+def _column(rows, name):
+    if isinstance(rows, Table):
+        return rows[name]
+    return [row[name] for row in rows]
+
+
+def stars_to_array(obsinfo, frame=0):
+    """
+    Convert the stars of an observation into a structured array
+
+    Parameters
+    ----------
+    obsinfo : ObsInfo
+        observation information
+    frame : int
+        frame number stored in the "frame" field
+
+    Returns
+    -------
+    stars : numpy.ndarray
+        structured array of STAR_DTYPE
+    """
+    stars = np.empty(len(obsinfo.stars), dtype=STAR_DTYPE)
+    stars["frame"] = frame
+    stars["et"] = obsinfo.et
+    if len(stars) == 0:
+        return stars
+    for name in STAR_DTYPE.names[2:]:
+        stars[name] = _column(obsinfo.stars, name)
+    return stars
+
+
+def solar_objects_to_array(obsinfo, frame=0):
+    """
+    Convert the solar objects of an observation into a structured array
+
+    Unknown magnitudes are stored as NaN.
+
+    Parameters
+    ----------
+    obsinfo : ObsInfo
+        observation information
+    frame : int
+        frame number stored in the "frame" field
+
+    Returns
+    -------
+    solar_objects : numpy.ndarray
+        structured array of SOLAR_OBJECT_DTYPE
+    """
+    solar_objects = np.empty(
+        len(obsinfo.solar_objects), dtype=SOLAR_OBJECT_DTYPE
+    )
+    solar_objects["frame"] = frame
+    solar_objects["et"] = obsinfo.et
+    if len(solar_objects) == 0:
+        return solar_objects
+    for name in SOLAR_OBJECT_DTYPE.names[2:]:
+        values = _column(obsinfo.solar_objects, name)
+        if name == "magnitude":
+            values = [np.nan if v is None else v for v in values]
+        solar_objects[name] = values
+    return solar_objects
+
+
+def export_npz(obsinfos, filename):
+    """
+    Export the stars and solar objects of observations into a .npz file
+
+    The file contains the structured arrays "stars" of STAR_DTYPE and
+    "solar_objects" of SOLAR_OBJECT_DTYPE, whose "frame" fields are the
+    indices of the observations. The records of each frame are appended
+    to temporary files and copied into the archive at the end, so that
+    the memory use does not depend on the number of frames.
+
+    Parameters
+    ----------
+    obsinfos : iterable
+        ObsInfo of each frame, e.g. simulate_series(...)
+    filename : str
+        output .npz file
+
+    Returns
+    -------
+    nframes : int
+        number of frames exported
+    """
+    outputs = [
+        ("stars", STAR_DTYPE, stars_to_array),
+        ("solar_objects", SOLAR_OBJECT_DTYPE, solar_objects_to_array),
+    ]
+    records = {}
+    counts = {}
+    for name, _dtype, _convert in outputs:
+        records[name] = tempfile.TemporaryFile()
+        counts[name] = 0
+    try:
+        nframes = 0
+        for frame, obsinfo in enumerate(obsinfos):
+            for name, _dtype, convert in outputs:
+                array = convert(obsinfo, frame)
+                records[name].write(array.tobytes())
+                counts[name] += len(array)
+            nframes += 1
+
+        # np.savez layout: an uncompressed .npy member for each array
+        if not filename.endswith(".npz"):
+            filename += ".npz"
+        with zipfile.ZipFile(filename, "w", allowZip64=True) as archive:
+            for name, dtype, _convert in outputs:
+                header = {
+                    "descr": np.lib.format.dtype_to_descr(dtype),
+                    "fortran_order": False,
+                    "shape": (counts[name],),
+                }
+                with archive.open(name + ".npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array_header_1_0(f, header)
+                    records[name].seek(0)
+                    shutil.copyfileobj(records[name], f)
+    finally:
+        for f in records.values():
+            f.close()
+    return nframes
+
+
+def load_npz(filename):
+    """
+    Load stars and solar objects exported by export_npz
+
+    Parameters
+    ----------
+    filename : str
+        .npz file
+
+    Returns
+    -------
+    stars : numpy.ndarray
+        structured array of STAR_DTYPE
+    solar_objects : numpy.ndarray
+        structured array of SOLAR_OBJECT_DTYPE
+    """
+    with np.load(filename) as data:
+        return data["stars"], data["solar_objects"]
+
+
+def _flat_columns(array):
+    """ Split the sub-array fields into columns with index suffixes """
+    columns = {}
+    for name in array.dtype.names:
+        values = array[name]
+        if values.ndim == 1:
+            columns[name] = values
+            continue
+        for index in np.ndindex(values.shape[1:]):
+            suffix = "".join(str(i) for i in index)
+            columns[f"{name}_{suffix}"] = values[(slice(None),) + index]
+    return columns
+
+
+def export_parquet(obsinfos, dirname):
+    """
+    Export the stars and solar objects of observations into Parquet files
+
+    The files stars.parquet and solar_objects.parquet are written frame by
+    frame with the columns of STAR_DTYPE and SOLAR_OBJECT_DTYPE, where the
+    sub-array fields are split into columns such as image_pos_0 and
+    rotation_12. pyarrow is an optional dependency required only by this
+    function.
+
+    Parameters
+    ----------
+    obsinfos : iterable
+        ObsInfo of each frame, e.g. simulate_series(...)
+    dirname : str
+        output directory
+
+    Returns
+    -------
+    nframes : int
+        number of frames exported
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("export_parquet requires pyarrow") from e
+
+    os.makedirs(dirname, exist_ok=True)
+    outputs = [
+        ("stars", STAR_DTYPE, stars_to_array),
+        ("solar_objects", SOLAR_OBJECT_DTYPE, solar_objects_to_array),
+    ]
+    writers = {}
+    try:
+        for name, dtype, _convert in outputs:
+            schema = pyarrow.Table.from_pydict(
+                _flat_columns(np.empty(0, dtype))
+            ).schema
+            writers[name] = pyarrow.parquet.ParquetWriter(
+                os.path.join(dirname, name + ".parquet"), schema
+            )
+        nframes = 0
+        for frame, obsinfo in enumerate(obsinfos):
+            for name, _dtype, convert in outputs:
+                table = pyarrow.Table.from_pydict(
+                    _flat_columns(convert(obsinfo, frame)),
+                    schema=writers[name].schema,
+                )
+                writers[name].write_table(table)
+            nframes += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return nframes
@@ -1,6 +1,5 @@
 import numpy as np
 import spiceypy as spice
-from itertools import combinations
 from .flow_rect import FlowRect
 
 
@@ -23,6 +22,7 @@ class Fov:
             * spice.dpr()
         )
         self._aspect = self.bounds_rect.aspect
+        self._enclosing_angle, self._inscribed_angle = self._calc_cone()
 
     @property
     def shape(self):
@@ -56,6 +56,18 @@ class Fov:
     def aspect(self):
         return self._aspect
 
+    @property
+    def enclosing_angle(self):
+        # half angle of the cone around bounds_rect.center_vec that encloses
+        # the FOV
+        return self._enclosing_angle
+
+    @property
+    def inscribed_angle(self):
+        # half angle of the cone around bounds_rect.center_vec that is
+        # inscribed in the FOV
+        return self._inscribed_angle
+
     def _calc_bounds_rect(self):
         if self._shape in ["RECTANGLE", "POLYGON"]:
             left = np.min(self._bounds[:, 0])
@@ -63,8 +75,8 @@ class Fov:
             right = np.max(self._bounds[:, 0])
             bottom = np.max(self._bounds[:, 1])
         elif self._shape == "CIRCLE":
-            dx = self._bounds[0] - self._boresight[0]
-            dy = self._bounds[1] - self._boresight[1]
+            dx = self._bounds[0][0] - self._boresight[0]
+            dy = self._bounds[0][1] - self._boresight[1]
             r = np.sqrt(dx ** 2 + dy ** 2)
             left = self._boresight[0] - r
             top = self._boresight[1] - r
@@ -73,27 +85,20 @@ class Fov:
         elif self._shape == "ELLIPSE":
             cx = self._boresight[0]
             cy = self._boresight[1]
-            left = right = cx
-            top = bottom = cy
-            dx = self._bounds[0] - cx
-            dy = self._bounds[1] - cy
+            dx = self._bounds[0][0] - cx
+            dy = self._bounds[0][1] - cy
             a = np.sqrt(dx ** 2 + dy ** 2)
             t = np.arctan2(dy, dx)
-            sint = np.sin(t)
-            cost = np.cos(t)
-            dx = self._bounds[3] - cx
-            dy = self._bounds[4] - cy
+            dx = self._bounds[1][0] - cx
+            dy = self._bounds[1][1] - cy
             b = np.sqrt(dx ** 2 + dy ** 2)
-            for i in range(90):
-                rad = np.radians(i)
-                tx = a * np.cos(rad)
-                ty = b * np.sin(rad)
-                x = tx * cost - ty * sint + cx
-                y = tx * sint + ty * cost + cy
-                right = max(x, right)
-                bottom = max(y, bottom)
-            left = right - (right - cx) * 2
-            top = bottom - (bottom - cy) * 2
+            # half extents of the ellipse rotated by t
+            ex = np.sqrt((a * np.cos(t)) ** 2 + (b * np.sin(t)) ** 2)
+            ey = np.sqrt((a * np.sin(t)) ** 2 + (b * np.cos(t)) ** 2)
+            left = cx - ex
+            top = cy - ey
+            right = cx + ex
+            bottom = cy + ey
         else:
             raise ValueError(
                 "Unknown instrument shape {}".format(self._shape)
@@ -105,15 +110,83 @@ class Fov:
     def _calc_fovmax(self):
         fovmax = -1.0
         if self._shape in ["RECTANGLE", "POLYGON"]:
-            fovmax = -1.0
-            for i, j in combinations(range(len(self._bounds)), 2):
-                dist = spice.vsep(self._bounds[i], self._bounds[j]) * 0.5
-                if dist > fovmax:
-                    fovmax = dist
+            # half of the maximum separation between boundary vectors
+            u = self._bounds / np.linalg.norm(
+                self._bounds, axis=1, keepdims=True
+            )
+            cross = np.linalg.norm(
+                np.cross(u[:, np.newaxis, :], u[np.newaxis, :, :]), axis=2
+            )
+            dot = u @ u.T
+            fovmax = np.max(np.arctan2(cross, dot)) * 0.5
         elif self._shape == "CIRCLE":
             fovmax = spice.vsep(self._boresight, self._bounds[0])
         elif self._shape == "ELLIPSE":
             dist1 = spice.vsep(self._boresight, self._bounds[0])
             dist2 = spice.vsep(self._boresight, self._bounds[1])
-            fovmax = dist1 if dist1 > dist2 else dist1
+            fovmax = max(dist1, dist2)
         return fovmax
+
+    def _calc_cone(self):
+        center = spice.vhat(self.bounds_rect.center_vec)
+        if self._shape in ["RECTANGLE", "POLYGON"]:
+            u = self._bounds / np.linalg.norm(
+                self._bounds, axis=1, keepdims=True
+            )
+            enclosing = np.max(np.arccos(np.clip(u @ center, -1.0, 1.0)))
+            # distances from the center to the great circles of the edges
+            normals = np.cross(u, np.roll(u, -1, axis=0))
+            normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+            sines = normals @ center
+            if np.all(sines > 0.0) or np.all(sines < 0.0):
+                inscribed = np.min(np.arcsin(np.abs(sines)))
+            else:
+                inscribed = 0.0
+        else:
+            dists = [spice.vsep(center, bound) for bound in self._bounds]
+            enclosing = max(dists)
+            inscribed = min(dists)
+        return enclosing, inscribed
+
+
+_FOV_KEYWORDS = [
+    "FOV_SHAPE",
+    "FOV_FRAME",
+    "BORESIGHT",
+    "FOV_BOUNDARY",
+    "FOV_BOUNDARY_CORNERS",
+    "FOV_CLASS_SPEC",
+    "FOV_REF_VECTOR",
+    "FOV_REF_ANGLE",
+    "FOV_CROSS_ANGLE",
+    "FOV_ANGLE_UNITS",
+]
+
+_fovs = {}
+
+
+def get_fov(inst_id):
+    """
+    Obtain the memoized FOV of an instrument
+
+    The FOV is rebuilt only when the kernel pool variables defining it
+    are updated, which is detected by a kernel pool watcher.
+
+    Parameters
+    ----------
+    inst_id : int
+        NAIF ID of the instrument
+
+    Returns
+    -------
+    fov : Fov
+        instrument FOV
+    """
+    agent = f"SPICEFLOW_FOV_{inst_id}"
+    if inst_id not in _fovs:
+        names = [f"INS{inst_id}_{keyword}" for keyword in _FOV_KEYWORDS]
+        lenvals = max(len(name) for name in names) + 1
+        spice.swpool(agent, len(names), lenvals, names)
+    if spice.cvpool(agent) or inst_id not in _fovs:
+        _fovs[inst_id] = Fov(inst_id)
+    return _fovs[inst_id]
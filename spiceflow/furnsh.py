@@ -1,8 +1,13 @@
+import os
+import urllib.error
 import urllib.request
 import urllib.parse
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import spiceypy as spice
 from pathlib import Path
+from .kernel_filter import file_reader, http_reader, read_daf_summaries
+from .kernel_filter import select_kernels
 
 
 __all__ = ["download", "remote_furnsh"]
@@ -31,21 +36,126 @@ def _meta_kernel_to_urls(meta_kernel, url, local_kernel_dir, remote_root):
     return kernel_urls
 
 
-def _download_kernels(kernels, verbose=True):
-    for kernel_url, kernel_pathname in kernels:
-        if verbose is True:
-            print("{} ==> {}".format(kernel_url, kernel_pathname))
-        p = Path(kernel_pathname)
-        if not p.exists():
-            if not p.parent.exists():
-                p.parent.mkdir(parents=True)
-            download(kernel_url, kernel_pathname)
+def _print_progress():
+    started = set()
 
+    def progress(url, filename, _nbytes, _total):
+        # printed once when each download starts or resumes
+        if filename not in started:
+            started.add(filename)
+            print("{} ==> {}".format(url, filename))
 
-def _make_new_meta_kernel(kernels, local_kernel_dir, new_pathname):
+    return progress
+
+
+def _download_kernels(
+    kernels, verbose=True, progress=None, max_workers=4, cache=None
+):
+    if progress is None and verbose is True:
+        progress = _print_progress()
+    pathnames = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for kernel_url, kernel_pathname in kernels:
+            p = Path(kernel_pathname)
+            if kernel_pathname in pathnames:
+                continue
+            pathnames.add(kernel_pathname)
+            if cache is not None:
+                # cached kernels are revalidated even if they exist
+                future = executor.submit(
+                    cache.materialize,
+                    kernel_url,
+                    kernel_pathname,
+                    progress=progress,
+                )
+            elif not p.exists():
+                p.parent.mkdir(parents=True, exist_ok=True)
+                future = executor.submit(
+                    download, kernel_url, kernel_pathname, progress
+                )
+            else:
+                continue
+            futures.append(future)
+        # raise the first error after the other downloads are finished
+        for future in futures:
+            future.result()
+
+
+def _read_summaries(kernels, max_workers=4):
+    def read(kernel):
+        kernel_url, kernel_pathname = kernel
+        if Path(kernel_pathname).exists():
+            return read_daf_summaries(file_reader(kernel_pathname))
+        return read_daf_summaries(http_reader(kernel_url))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read, kernels))
+
+
+def _read_pool():
+    names = []
+    try:
+        while True:
+            chunk = spice.gnpool("*", len(names), 256)
+            names.extend(chunk)
+            if len(chunk) < 256:
+                break
+    except spice.utils.support_types.NotFoundError:
+        pass
+    variables = {}
+    for name in names:
+        n, vtype = spice.dtpool(name)
+        if vtype == "C":
+            variables[name] = (vtype, list(spice.gcpool(name, 0, n)))
+        else:
+            variables[name] = (vtype, spice.gdpool(name, 0, n).tolist())
+    return variables
+
+
+def _write_pool(variables):
+    current = _read_pool()
+    for name in current:
+        if name not in variables:
+            spice.dvpool(name)
+    for name, (vtype, values) in variables.items():
+        if current.get(name) == (vtype, values):
+            continue
+        if vtype == "C":
+            spice.pcpool(name, values)
+        else:
+            spice.pdpool(name, values)
+
+
+def _select_kernels(kernels, window, bodies, frames, download):
+    summaries = _read_summaries(kernels)
+    others = [k for k, daf in zip(kernels, summaries) if daf is None]
+    download(others)
+    # the text kernels define the names, frames and clocks; they are read
+    # by ldpool and the kernel pool is restored afterwards, since unloading
+    # text kernels would also clear the kernels and variables of the user
+    pathnames = list(dict.fromkeys(path for _url, path in others))
+    variables = _read_pool()
+    try:
+        for pathname in pathnames:
+            # EK files are not needed for the selection
+            if spice.getfat(pathname)[0] != "DAS":
+                spice.ldpool(pathname)
+        selected = select_kernels(summaries, window, bodies, frames)
+    finally:
+        _write_pool(variables)
+    download([k for k, s in zip(kernels, selected) if s and k not in others])
+    return selected
+
+
+def _make_new_meta_kernel(
+    kernels, local_kernel_dir, new_pathname, selected=None
+):
     path_values = spice.gcpool("PATH_VALUES", 0, 256)
     path_symbols = spice.gcpool("PATH_SYMBOLS", 0, 256)
     kernels_to_load = spice.gcpool("KERNELS_TO_LOAD", 0, 1024)
+    if selected is not None:
+        kernels_to_load = [k for k, s in zip(kernels_to_load, selected) if s]
 
     s = "KPL/MK\n"
     s += "\\begindata\n"
@@ -69,25 +179,171 @@ def _make_new_meta_kernel(kernels, local_kernel_dir, new_pathname):
         f.write(s)
 
 
-def download(url, filename):
+def _open_range(url, offset, validator):
+    request = urllib.request.Request(url)
+    if offset > 0:
+        request.add_header("Range", f"bytes={offset}-")
+        # the remote file is sent in full if it was modified
+        request.add_header("If-Range", validator)
+    try:
+        return urllib.request.urlopen(request)
+    except urllib.error.HTTPError as e:
+        # the offset is past the end of the remote file, so the partial file
+        # is of another version
+        if e.code == 416 and offset > 0:
+            return None
+        raise
+
+
+def _range_start(response):
+    """ First byte position of the Content-Range of a response """
+    content_range = response.headers.get("Content-Range", "")
+    try:
+        unit, byte_range = content_range.split(" ", 1)
+        start = int(byte_range.split("-", 1)[0])
+    except ValueError:
+        return None
+    return start if unit == "bytes" else None
+
+
+def _validator(response):
+    """ Validator of a response usable for If-Range """
+    etag = response.headers.get("ETag")
+    if etag is not None and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def download(url, filename, progress=None, chunk_size=1 << 20):
     """
     download a file from url
 
+    The file is streamed in chunks into filename + ".part", which is
+    renamed to filename when the download is completed. If the partial
+    file exists, the download is resumed by an HTTP Range request with
+    If-Range, so that it is restarted if the remote file was modified. The
+    validator of the partial file is stored in filename + ".part.validator".
+
     Parameters
     ----------
     url : str
         the url of the request
     filename : str
         local filename
+    progress : callable
+        function called as progress(url, filename, nbytes, total) when the
+        download starts and after each chunk, where total is None if the
+        size is unknown
+    chunk_size : int
+        size of the chunks in bytes
     """
-    with urllib.request.urlopen(url) as response:
-        with open(filename, "wb+") as f:
-            f.write(response.read())
+    part = filename + ".part"
+    validator_file = part + ".validator"
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    validator = None
+    if offset > 0 and os.path.exists(validator_file):
+        with open(validator_file) as f:
+            validator = f.read().strip()
+    if not validator:
+        # the partial file cannot be verified
+        offset = 0
+
+    response = _open_range(url, offset, validator)
+    if response is None:
+        offset = 0
+        response = _open_range(url, offset, validator)
+    elif response.status == 206 and _range_start(response) != offset:
+        response.close()
+        offset = 0
+        response = _open_range(url, offset, validator)
+
+    with response:
+        if response.status != 206:
+            # the server does not support ranges or the file was modified
+            offset = 0
+            validator = _validator(response)
+            if validator is not None:
+                with open(validator_file, "w") as f:
+                    f.write(validator)
+            elif os.path.exists(validator_file):
+                os.unlink(validator_file)
+        length = response.headers.get("Content-Length")
+        total = offset + int(length) if length is not None else None
+
+        nbytes = offset
+        with open(part, "ab" if offset > 0 else "wb") as f:
+            if progress is not None:
+                progress(url, filename, nbytes, total)
+            while True:
+                chunk = response.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                nbytes += len(chunk)
+                if progress is not None:
+                    progress(url, filename, nbytes, total)
+
+    if total is not None and nbytes != total:
+        raise IOError(f"incomplete download: {nbytes} of {total} bytes")
+    os.replace(part, filename)
+    if os.path.exists(validator_file):
+        os.unlink(validator_file)
 
 
 def remote_furnsh(
-    url, filename, local_kernel_dir=".", remote_root="../..", verbose=True
+    url,
+    filename,
+    local_kernel_dir=".",
+    remote_root="../..",
+    verbose=True,
+    progress=None,
+    max_workers=4,
+    cache=None,
+    window=None,
+    bodies=None,
+    frames=None,
 ):
+    """
+    Download the kernels of a remote meta-kernel and load them
+
+    If window, bodies or frames is given, the SPK and CK kernels which
+    cannot contribute to them are neither downloaded nor loaded. The
+    coverage of the kernels is read from the summary records, which are
+    fetched by HTTP Range requests for the kernels not downloaded yet.
+    The other kernels such as text kernels are always loaded.
+
+    Parameters
+    ----------
+    url : str
+        url of the meta-kernel
+    filename : str
+        local meta-kernel to be written
+    local_kernel_dir : str
+        directory where the kernels are downloaded
+    remote_root : str
+        root of the kernel paths relative to the meta-kernel url
+    verbose : bool
+        whether to print the kernels when their downloads start, unless
+        progress is given
+    progress : callable
+        function called as progress(url, filename, nbytes, total) during
+        the downloads
+    max_workers : int
+        maximum number of concurrent downloads
+    cache : KernelCache
+        shared kernel cache; if given, the kernels are revalidated and
+        linked from the cache into local_kernel_dir
+    window : tuple
+        (start, stop) as time strings or ephemeris times of the
+        observations
+    bodies : list
+        names or NAIF IDs of the bodies whose positions are needed; the
+        centers of their SPK segments are included
+    frames : list
+        names or IDs of the frames whose orientations are needed, e.g.
+        the instrument frames; the CK frames on which they depend are
+        included
+    """
     mk = tempfile.NamedTemporaryFile(delete=False)
     with urllib.request.urlopen(url) as response:
         content = response.read()
@@ -96,7 +352,15 @@ def remote_furnsh(
     kernels = _meta_kernel_to_urls(
         mk.name, url, local_kernel_dir, remote_root
     )
-    _download_kernels(kernels, verbose)
-    _make_new_meta_kernel(kernels, local_kernel_dir, filename)
+
+    def download(kernels):
+        _download_kernels(kernels, verbose, progress, max_workers, cache)
+
+    if window is None and bodies is None and frames is None:
+        download(kernels)
+        selected = None
+    else:
+        selected = _select_kernels(kernels, window, bodies, frames, download)
+    _make_new_meta_kernel(kernels, local_kernel_dir, filename, selected)
     Path(mk.name).unlink()
     spice.furnsh(filename)
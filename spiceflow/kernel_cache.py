@@ -0,0 +1,292 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from .util import get_cache_dir
+
+
+__all__ = ["KernelCache"]
+
+
+class KernelCache:
+    """
+    Shared cache of kernels keyed by URL and content hash
+
+    Kernels are stored once per content under objects/<sha256> in the cache
+    directory, and each URL has a record of the content hash with the ETag
+    and Last-Modified headers of the response. A cached kernel is
+    revalidated by a conditional request and downloaded again only if it
+    was modified on the server. If the server fails or cannot be reached,
+    the cached kernel is used as it is.
+
+    The least recently used kernels are evicted when the total size exceeds
+    max_bytes. Kernels materialized by hard links or copies remain usable
+    after eviction, while symbolic links are broken.
+    """
+
+    def __init__(self, root=None, max_bytes=None, chunk_size=1 << 20):
+        """
+        Parameters
+        ----------
+        root : str
+            cache directory (default: <spiceflow.util.get_cache_dir()>/kernels)
+        max_bytes : int
+            maximum total size of the kernels in bytes (default: 16 GiB or
+            the value of the environment variable
+            SPICEFLOW_KERNEL_CACHE_BYTES)
+        chunk_size : int
+            size of the download chunks in bytes
+        """
+        if root is None:
+            root = get_cache_dir() / "kernels"
+        if max_bytes is None:
+            max_bytes = int(
+                os.environ.get("SPICEFLOW_KERNEL_CACHE_BYTES", 16 * 2 ** 30)
+            )
+        self._root = Path(root)
+        self._objects = self._root / "objects"
+        self._urls = self._root / "urls"
+        self._tmp = self._root / "tmp"
+        for path in (self._objects, self._urls, self._tmp):
+            path.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._chunk_size = chunk_size
+        self._lock = threading.Lock()
+
+    @property
+    def root(self):
+        return self._root
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    def _record_path(self, url):
+        return self._urls / (hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def _read_record(self, url):
+        try:
+            with open(self._record_path(url)) as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not (self._objects / record["sha256"]).exists():
+            return None
+        return record
+
+    def _write_record(self, url, record):
+        record["accessed"] = time.time()
+        fd, tmp = tempfile.mkstemp(dir=self._tmp, suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp, self._record_path(url))
+
+    def _store(self, url, response, progress):
+        length = response.headers.get("Content-Length")
+        total = int(length) if length is not None else None
+        digest = hashlib.sha256()
+        nbytes = 0
+        fd, tmp = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if progress is not None:
+                    progress(url, None, nbytes, total)
+                while True:
+                    chunk = response.read(self._chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    digest.update(chunk)
+                    nbytes += len(chunk)
+                    if progress is not None:
+                        progress(url, None, nbytes, total)
+            if total is not None and nbytes != total:
+                raise IOError(
+                    f"incomplete download: {nbytes} of {total} bytes"
+                )
+            sha256 = digest.hexdigest()
+            # identical contents from other URLs are stored only once
+            os.replace(tmp, self._objects / sha256)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return {
+            "url": url,
+            "sha256": sha256,
+            "size": nbytes,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def fetch(self, url, progress=None):
+        """
+        Obtain the cached path of a kernel, downloading it if necessary
+
+        Parameters
+        ----------
+        url : str
+            url of the kernel
+        progress : callable
+            function called as progress(url, None, nbytes, total) during the
+            download
+
+        Returns
+        -------
+        path : pathlib.Path
+            path of the kernel in the cache
+        """
+        record = self._read_record(url)
+        while True:
+            request = urllib.request.Request(url)
+            if record is not None:
+                if record.get("etag"):
+                    request.add_header("If-None-Match", record["etag"])
+                if record.get("last_modified"):
+                    request.add_header(
+                        "If-Modified-Since", record["last_modified"]
+                    )
+
+            stored = False
+            try:
+                with urllib.request.urlopen(request) as response:
+                    record = self._store(url, response, progress)
+                    stored = True
+            except urllib.error.URLError:
+                # not modified, or the server fails or cannot be reached
+                if record is None:
+                    raise
+
+            with self._lock:
+                path = self._objects / record["sha256"]
+                if not stored and not path.exists():
+                    # evicted by another process after the record was read
+                    record = None
+                    continue
+                self._write_record(url, record)
+                if stored:
+                    self.evict(keep=record["sha256"])
+            return path
+
+    def evict(self, keep=None):
+        """
+        Evict the least recently used kernels exceeding max_bytes
+
+        Parameters
+        ----------
+        keep : str
+            content hash which is not evicted
+        """
+        # other processes sharing the cache may remove the files meanwhile
+        sizes = {}
+        for path in self._objects.iterdir():
+            try:
+                sizes[path.name] = path.stat().st_size
+            except FileNotFoundError:
+                continue
+        nbytes = sum(sizes.values())
+        if nbytes <= self._max_bytes:
+            return
+
+        records = {}
+        for path in self._urls.glob("*.json"):
+            try:
+                with open(path) as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                continue
+            records[path] = record
+
+        # a content shared by URLs is accessed when any of them is accessed
+        accessed = {}
+        for record in records.values():
+            sha256 = record["sha256"]
+            accessed[sha256] = max(
+                accessed.get(sha256, 0.0), record["accessed"]
+            )
+        for sha256 in sizes:
+            accessed.setdefault(sha256, 0.0)
+
+        for sha256 in sorted(accessed, key=accessed.get):
+            if nbytes <= self._max_bytes:
+                break
+            if sha256 == keep or sha256 not in sizes:
+                continue
+            (self._objects / sha256).unlink(missing_ok=True)
+            nbytes -= sizes[sha256]
+            for path, record in records.items():
+                if record["sha256"] == sha256:
+                    path.unlink(missing_ok=True)
+
+    def materialize(self, url, filename, mode="hardlink", progress=None):
+        """
+        Fetch a kernel and place it at a local path
+
+        Parameters
+        ----------
+        url : str
+            url of the kernel
+        filename : str
+            local path of the kernel
+        mode : str
+            "hardlink", "symlink" or "copy"; a hard link falls back to a
+            symbolic link, which falls back to a copy
+        progress : callable
+            function called as progress(url, filename, nbytes, total) during
+            the download
+
+        Returns
+        -------
+        filename : str
+            local path of the kernel
+        """
+        if progress is not None:
+            callback = progress
+
+            def progress(url, _path, nbytes, total):
+                callback(url, filename, nbytes, total)
+
+        target = Path(filename)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        while True:
+            source = self.fetch(url, progress)
+            try:
+                self._place(source, target, mode)
+                return filename
+            except FileNotFoundError:
+                if source.exists():
+                    raise
+                # evicted by another process before it was placed
+
+    def _place(self, source, target, mode):
+        try:
+            if target.samefile(source):
+                return
+        except OSError:
+            pass
+
+        tmp = target.with_name(target.name + ".tmp")
+        if tmp.exists() or tmp.is_symlink():
+            tmp.unlink()
+        modes = ["hardlink", "symlink", "copy"]
+        for mode in modes[modes.index(mode) :]:
+            try:
+                if mode == "hardlink":
+                    os.link(source, tmp)
+                elif mode == "symlink":
+                    os.symlink(os.path.abspath(source), tmp)
+                else:
+                    shutil.copyfile(source, tmp)
+                break
+            except FileNotFoundError:
+                # the source was removed, which the fallbacks cannot fix
+                raise
+            except OSError:
+                if mode == "copy":
+                    raise
+        os.replace(tmp, target)
@@ -0,0 +1,281 @@
+import struct
+import urllib.request
+import spiceypy as spice
+
+
+__all__ = [
+    "file_reader",
+    "http_reader",
+    "read_daf_summaries",
+    "select_kernels",
+]
+
+
+DAF_RECORD_BYTES = 1024
+
+# frame classes of frinfo
+FRAME_CLASS_CK = 3
+FRAME_CLASS_TK = 4
+
+
+def file_reader(filename):
+    """
+    Make a function reading a byte range of a local file
+
+    Parameters
+    ----------
+    filename : str
+        local file
+
+    Returns
+    -------
+    read : callable
+        function called as read(offset, size) returning bytes
+    """
+
+    def read(offset, size):
+        with open(filename, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    return read
+
+
+def http_reader(url):
+    """
+    Make a function reading a byte range of a remote file
+
+    The byte ranges are fetched by HTTP Range requests, so that only the
+    records read are downloaded from servers supporting them.
+
+    Parameters
+    ----------
+    url : str
+        url of the file
+
+    Returns
+    -------
+    read : callable
+        function called as read(offset, size) returning bytes
+    """
+
+    def read(offset, size):
+        request = urllib.request.Request(url)
+        request.add_header("Range", f"bytes={offset}-{offset + size - 1}")
+        with urllib.request.urlopen(request) as response:
+            if response.status == 206:
+                return response.read(size)
+            # the server does not support ranges
+            return response.read(offset + size)[offset:]
+
+    return read
+
+
+def read_daf_summaries(read):
+    """
+    Read the segment summaries of a DAF such as SPK and CK
+
+    Only the file record and the summary records are read.
+
+    Parameters
+    ----------
+    read : callable
+        function called as read(offset, size) returning bytes of the file
+
+    Returns
+    -------
+    daf : tuple or None
+        (idword, summaries) where idword is e.g. "DAF/SPK" and summaries is
+        the list of (double components, integer components) of the
+        segments, or None if the file is not a DAF
+    """
+    record = read(0, DAF_RECORD_BYTES)
+    idword = record[0:8].decode("ascii", "replace").strip()
+    if not idword.startswith("DAF/") or len(record) < DAF_RECORD_BYTES:
+        return None
+    order = ">" if record[88:96] == b"BIG-IEEE" else "<"
+    nd, ni = struct.unpack(order + "2i", record[8:16])
+    if not (0 <= nd <= 124 and 2 <= ni <= 250):
+        # files without the format string in the native order of the writer
+        order = "<" if order == ">" else ">"
+        nd, ni = struct.unpack(order + "2i", record[8:16])
+    (fward,) = struct.unpack(order + "i", record[76:80])
+
+    size = 8 * (nd + (ni + 1) // 2)
+    dc_format = order + f"{nd}d"
+    ic_format = order + f"{ni}i"
+    summaries = []
+    number = fward
+    while number > 0:
+        record = read((number - 1) * DAF_RECORD_BYTES, DAF_RECORD_BYTES)
+        next_number, _prev, nsum = struct.unpack(order + "3d", record[0:24])
+        for i in range(int(nsum)):
+            start = 24 + i * size
+            dc = struct.unpack(dc_format, record[start : start + 8 * nd])
+            start += 8 * nd
+            ic = struct.unpack(ic_format, record[start : start + 4 * ni])
+            summaries.append((dc, ic))
+        number = int(next_number)
+    return idword, summaries
+
+
+def _body_id(body):
+    if isinstance(body, str):
+        return spice.bodn2c(body)
+    return body
+
+
+def _frame_ck_ids(frame):
+    """ CK IDs on which a frame depends through fixed offset frames """
+    if isinstance(frame, str):
+        frame = spice.namfrm(frame)
+    ck_ids = set()
+    while frame != 0:
+        try:
+            _center, frame_class, class_id = spice.frinfo(frame)
+        except spice.utils.support_types.SpiceyError:
+            break
+        if frame_class == FRAME_CLASS_CK:
+            ck_ids.add(class_id)
+            break
+        if frame_class != FRAME_CLASS_TK:
+            break
+        frame = _tk_relative(frame, class_id)
+    return ck_ids
+
+
+def _tk_relative(frame, class_id):
+    """ Frame relative to which a fixed offset frame is defined, or 0 """
+    # the variables of a TK frame are named by its ID or by its name
+    for key in (class_id, spice.frmnam(frame)):
+        name = f"TKFRAME_{key}_RELATIVE"
+        try:
+            return spice.namfrm(spice.gcpool(name, 0, 1)[0])
+        except spice.utils.support_types.SpiceyError:
+            pass
+    return 0
+
+
+def _ck_clock(ck_id):
+    """ Spacecraft clock ID of a CK ID """
+    try:
+        return int(spice.gipool(f"CK_{ck_id}_SCLK", 0, 1)[0])
+    except spice.utils.support_types.SpiceyError:
+        # the default clock of the spacecraft of the CK ID
+        return int(ck_id / 1000)
+
+
+def _ck_window(ck_id, window, ticks):
+    """ Time window in encoded SCLK of the clock of a CK ID """
+    clock = _ck_clock(ck_id)
+    if clock not in ticks:
+        try:
+            ticks[clock] = (
+                spice.sce2c(clock, window[0]),
+                spice.sce2c(clock, window[1]),
+            )
+        except spice.utils.support_types.SpiceyError:
+            # the clock is unknown, so the CK is not limited in time
+            ticks[clock] = None
+    return ticks[clock]
+
+
+def _overlaps(dc, window):
+    return window is None or (dc[0] <= window[1] and dc[1] >= window[0])
+
+
+def _closure(segments, ids, next_ids):
+    """ Extend ids by the ids on which the segments of ids depend """
+    while True:
+        added = set()
+        for segment in segments:
+            if segment[1] in ids:
+                added |= next_ids(segment) - ids
+        if not added:
+            return ids
+        ids |= added
+
+
+def select_kernels(summaries, window=None, bodies=None, frames=None):
+    """
+    Select kernels which can contribute to a time window, bodies and frames
+
+    SPK kernels are selected if a segment overlapping the window has a
+    target in bodies, or in the centers of such segments recursively. CK
+    kernels are selected if a segment overlapping the window is of a CK
+    frame on which a frame in frames depends, through fixed offset frames
+    and the reference frames of such segments recursively. Other kernels
+    are always selected. The kernels defining the body names, frames and
+    spacecraft clocks must be loaded.
+
+    Parameters
+    ----------
+    summaries : list
+        results of read_daf_summaries of each kernel
+    window : tuple
+        (start, stop) as time strings or ephemeris times, or None for no
+        limit
+    bodies : list
+        names or NAIF IDs of the bodies, or None for all bodies
+    frames : list
+        names or IDs of the frames, or None for all frames
+
+    Returns
+    -------
+    selected : list
+        whether each kernel is selected
+    """
+    if window is not None:
+        window = tuple(
+            spice.str2et(t) if isinstance(t, str) else t for t in window
+        )
+
+    # (kernel index, ids, double components, integer components)
+    spk_segments = []
+    ck_segments = []
+    for index, daf in enumerate(summaries):
+        if daf is None:
+            continue
+        idword, segments = daf
+        if idword == "DAF/SPK":
+            for dc, ic in segments:
+                spk_segments.append((index, ic[0], dc, ic))
+        elif idword == "DAF/CK":
+            for dc, ic in segments:
+                ck_segments.append((index, ic[0], dc, ic))
+
+    spk_segments = [s for s in spk_segments if _overlaps(s[2], window)]
+    if bodies is not None:
+        body_ids = _closure(
+            spk_segments,
+            {_body_id(body) for body in bodies},
+            lambda segment: {segment[3][1]},
+        )
+        spk_segments = [s for s in spk_segments if s[1] in body_ids]
+
+    if window is not None:
+        ticks = {}
+        ck_windows = {
+            ck_id: _ck_window(ck_id, window, ticks)
+            for ck_id in {s[1] for s in ck_segments}
+        }
+        ck_segments = [
+            s for s in ck_segments if _overlaps(s[2], ck_windows[s[1]])
+        ]
+    if frames is not None:
+        ck_ids = set()
+        for frame in frames:
+            ck_ids |= _frame_ck_ids(frame)
+        ck_ids = _closure(
+            ck_segments, ck_ids, lambda segment: _frame_ck_ids(segment[3][1])
+        )
+        ck_segments = [s for s in ck_segments if s[1] in ck_ids]
+
+    used = {s[0] for s in spk_segments + ck_segments}
+    selected = []
+    for index, daf in enumerate(summaries):
+        if daf is None or daf[0] not in ("DAF/SPK", "DAF/CK"):
+            selected.append(True)
+        else:
+            selected.append(index in used)
+    return selected
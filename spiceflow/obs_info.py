@@ -1,18 +1,63 @@
 import xml.etree.ElementTree as ET
 import spiceypy as spice
 
-from .fov import Fov
+from .body_registry import get_bodies
+from .fov import get_fov
 from .solar_object import search_solar_objects
 from .star import search_stars
+from .star_catalog import get_star_catalog
 from .transform import viewport_frustum
 from .util import vec_padist
-from .xml_util import get_view_xml, get_solar_xml, get_star_xml
+from .xml_util import get_frame_xml
+
+
+class ObsContext:
+    """
+    Epoch-independent state shared by observations of an instrument
+
+    The instrument FOV, the star catalog, the bodies in the loaded SPK files
+    and the body-fixed frames of the bodies do not depend on the epoch, so
+    they are computed once and shared by ObsInfo instances. Positions and
+    rotations are obtained through an optional EphemerisCache.
+    """
+
+    def __init__(self, inst, ephemeris=None):
+        self.inst = inst
+        self.inst_id = spice.bodn2c(inst)
+        self.fov = get_fov(self.inst_id)
+        self.catalog = get_star_catalog()
+        self.bodies = get_bodies()
+        self.ephemeris = ephemeris
+
+    def spkpos(self, targ, et, ref, abcorr, obs):
+        if self.ephemeris is not None:
+            return self.ephemeris.spkpos(targ, et, ref, abcorr, obs)
+        return spice.spkpos(targ, et, ref, abcorr, obs)
+
+    def pxform(self, fromfr, tofr, et):
+        if self.ephemeris is not None:
+            return self.ephemeris.pxform(fromfr, tofr, et)
+        return spice.pxform(fromfr, tofr, et)
 
 
 class ObsInfo:
     MAX_ROOMS = 256
 
-    def __init__(self, inst, et, abcorr, obsrvr, width, height, mag_limit):
+    def __init__(
+        self,
+        inst,
+        et,
+        abcorr,
+        obsrvr,
+        width,
+        height,
+        mag_limit,
+        context=None,
+    ):
+        if context is None:
+            context = ObsContext(inst)
+        self.context = context
+
         # input parameter
         self.inst = inst
         self.et = et
@@ -23,16 +68,18 @@ class ObsInfo:
 
         # parameters equivalent to input parameter
         self.date = spice.et2utc(et, "ISOC", 3)
-        self.inst_id = spice.bodn2c(inst)
+        self.inst_id = context.inst_id
 
         # Instrument FOV
-        self.fov = Fov(self.inst_id)
+        self.fov = context.fov
         self.fov_in_degrees = self.fov.fovmax * 2.0 * spice.dpr()
 
         # geometry information
-        self.pos, _ = spice.spkpos(obsrvr, et, self.fov.frame, abcorr, "SUN")
-        self.obs2refmtx = spice.pxform(self.fov.frame, "J2000", et)
-        self.ref2obsmtx = spice.pxform("J2000", self.fov.frame, et)
+        self.pos, _ = context.spkpos(
+            obsrvr, et, self.fov.frame, abcorr, "SUN"
+        )
+        self.obs2refmtx = context.pxform(self.fov.frame, "J2000", et)
+        self.ref2obsmtx = context.pxform("J2000", self.fov.frame, et)
 
         # screen information
         pos_angle, angle_res, ra, dec = get_geometry_info(
@@ -47,7 +94,14 @@ class ObsInfo:
 
         # searched objects
         self.solar_objects = search_solar_objects(self)
-        self.stars = search_stars(self, mag_limit)
+        self.stars = search_stars(self, mag_limit, context.catalog)
+
+    def __getstate__(self):
+        # the shared context holds the star catalog and is not transferred
+        # to other processes
+        state = self.__dict__.copy()
+        state["context"] = None
+        return state
 
     def set_obs_table(self, obs_table):
         for solar_object in self.solar_objects:
@@ -61,12 +115,7 @@ class ObsInfo:
 
     def to_xml(self):
         sv_doc = ET.Element("svdoc")
-        sv_frame = ET.SubElement(sv_doc, "frame")
-        sv_frame.append(get_view_xml(self))
-        for solar_object in self.solar_objects:
-            sv_frame.append(get_solar_xml(solar_object))
-        for star in self.stars:
-            sv_frame.append(get_star_xml(star))
+        sv_doc.append(get_frame_xml(self))
         return sv_doc
 
 
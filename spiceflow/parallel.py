@@ -0,0 +1,143 @@
+import multiprocessing
+import numpy as np
+import spiceypy as spice
+from .obs_info import ObsContext
+from .simulate import simulate_series
+
+
+__all__ = ["et_range", "simulate_parallel"]
+
+
+# state of a worker process
+_worker = {}
+
+
+def _init_worker(kernels, inst=None):
+    for kernel in kernels:
+        spice.furnsh(kernel)
+    if inst is not None:
+        _worker["context"] = ObsContext(inst)
+
+
+def _simulate_chunk(args):
+    inst = args[0]
+    context = _worker.get("context")
+    if context is None or context.inst != inst:
+        raise ValueError(
+            f"the worker pool was not created for the instrument {inst}; "
+            "pass inst to get_pool"
+        )
+    return list(simulate_series(*args, context=context))
+
+
+def et_range(start, stop, step):
+    """
+    Make a series of epochs
+
+    Parameters
+    ----------
+    start : str or float
+        start time as a time string or ephemeris time
+    stop : str or float
+        stop time (exclusive) as a time string or ephemeris time
+    step : float
+        step in seconds
+
+    Returns
+    -------
+    ets : numpy.ndarray
+        epochs in ephemeris time
+    """
+    if isinstance(start, str):
+        start = spice.str2et(start)
+    if isinstance(stop, str):
+        stop = spice.str2et(stop)
+    return np.arange(start, stop, step)
+
+
+def get_pool(kernels, processes=None, inst=None):
+    """
+    Create a process pool whose workers load SPICE kernels
+
+    CSPICE keeps global state and is not thread-safe, so the workers are
+    started with the "spawn" method and load the kernels by themselves.
+
+    Parameters
+    ----------
+    kernels : str or list
+        meta-kernel or list of kernels loaded by each worker
+    processes : int
+        number of worker processes (default: os.cpu_count())
+    inst : str
+        instrument whose ObsContext is built once by each worker; required
+        to simulate observations in the pool
+
+    Returns
+    -------
+    pool : multiprocessing.pool.Pool
+        process pool
+    """
+    if isinstance(kernels, str):
+        kernels = [kernels]
+    ctx = multiprocessing.get_context("spawn")
+    return ctx.Pool(
+        processes, initializer=_init_worker, initargs=(list(kernels), inst)
+    )
+
+
+def simulate_parallel(
+    kernels,
+    inst,
+    ets,
+    abcorr,
+    obsrvr,
+    width,
+    height,
+    mag_limit,
+    processes=None,
+    chunksize=16,
+):
+    """
+    Simulate observations at a series of epochs in worker processes
+
+    The epochs are split into chunks of chunksize epochs, and each chunk is
+    simulated by simulate_series in a worker process. Each worker builds
+    the epoch-independent ObsContext once and shares it by its chunks.
+
+    Parameters
+    ----------
+    kernels : str or list
+        meta-kernel or list of kernels loaded by each worker
+    inst : str
+        instrument name
+    ets : iterable
+        epochs in ephemeris time
+    abcorr : str
+        aberration correction
+    obsrvr : str
+        observer name
+    width : int
+        image width
+    height : int
+        image height
+    mag_limit : float
+        limiting magnitude of stars
+    processes : int
+        number of worker processes (default: os.cpu_count())
+    chunksize : int
+        number of epochs simulated by a worker at a time
+
+    Returns
+    -------
+    obsinfos : iterator
+        ObsInfo for each epoch in the order of ets
+    """
+    ets = list(ets)
+    args = (abcorr, obsrvr, width, height, mag_limit)
+    chunks = [
+        (inst, ets[i : i + chunksize]) + args
+        for i in range(0, len(ets), chunksize)
+    ]
+    with get_pool(kernels, processes, inst) as pool:
+        for obsinfos in pool.imap(_simulate_chunk, chunks):
+            yield from obsinfos
@@ -0,0 +1,299 @@
+import numpy as np
+from .resource_cache import get_resource_cache
+from .scene import load_texture, pixel_radius, solar_object_sprite
+from .scene import sphere_count
+from .star import rasterize_stars
+from .transform import viewport_frustum
+
+
+# number of points sampled on the limb cone of a body to find its bounds
+LIMB_SAMPLES = 16
+
+# color of shape models, which are drawn as their ellipsoids
+DEFAULT_COLOR = (255, 255, 255)
+
+
+def _texture_array(filename):
+    """ Texture as an RGB array whose first row is the north pole """
+    return get_resource_cache().get(
+        "texture-array",
+        filename,
+        lambda: np.ascontiguousarray(
+            np.asarray(load_texture(filename).convert("RGB"))[::-1]
+        ),
+        lambda array: array.nbytes,
+    )
+
+
+def _pixel_bounds(rect, width, height, position, radius, angle_res):
+    """
+    Obtain the pixel range covered by a body
+
+    The cone from the observer tangent to the bounding sphere of the body
+    is sampled along its edge and projected on the viewport.
+    """
+    dist = np.linalg.norm(position)
+    if radius >= dist:
+        return 0, width, 0, height
+    center = position / dist
+    angle = np.arcsin(radius / dist) * 1.05 + np.radians(2.0 * angle_res)
+    if angle >= np.pi / 2.0:
+        return 0, width, 0, height
+
+    # orthonormal basis around the center direction
+    axis = np.zeros(3)
+    axis[np.argmin(np.abs(center))] = 1.0
+    u = np.cross(center, axis)
+    u /= np.linalg.norm(u)
+    w = np.cross(center, u)
+    phi = np.linspace(0.0, 2.0 * np.pi, LIMB_SAMPLES, endpoint=False)
+    edge = np.cos(angle) * center[:, None] + np.sin(angle) * (
+        np.outer(u, np.cos(phi)) + np.outer(w, np.sin(phi))
+    )
+    if np.any(edge[2] <= 0.0):
+        return 0, width, 0, height
+
+    vp = viewport_frustum(rect, width, height, edge)
+    x0 = int(np.clip(np.floor(vp[0].min()) - 1, 0, width))
+    x1 = int(np.clip(np.ceil(vp[0].max()) + 2, 0, width))
+    y0 = int(np.clip(np.floor(vp[1].min()) - 1, 0, height))
+    y1 = int(np.clip(np.ceil(vp[1].max()) + 2, 0, height))
+    return x0, x1, y0, y1
+
+
+def pixel_rays(rect, width, height, x0, x1, y0, y1):
+    """
+    Obtain the directions of pixel rays in the instrument frame
+
+    This is the inverse of viewport_frustum at the pixel centers.
+
+    Parameters
+    ----------
+    rect : FlowRect
+        FOV rectangle
+    width : int
+        image width
+    height : int
+        image height
+    x0, x1, y0, y1 : int
+        pixel range [x0, x1) x [y0, y1)
+
+    Returns
+    -------
+    rays : numpy.ndarray
+        ray directions of shape (y1 - y0, x1 - x0, 3)
+    """
+    x = rect.left + (np.arange(x0, x1) + 0.5) * rect.width / width
+    y = rect.top + (np.arange(y0, y1) + 0.5) * rect.height / height
+    rays = np.empty((len(y), len(x), 3))
+    rays[..., 0] = x[None, :]
+    rays[..., 1] = y[:, None]
+    rays[..., 2] = rect.z
+    # viewport_frustum projects points along the rays and their opposites
+    return rays * np.sign(rect.z)
+
+
+def raycast_ellipsoid(rays, position, rotation, radii):
+    """
+    Intersect rays from the observer with an ellipsoid
+
+    Parameters
+    ----------
+    rays : numpy.ndarray
+        ray directions of shape (..., 3) in the instrument frame
+    position : numpy.ndarray
+        center of the ellipsoid in the instrument frame
+    rotation : numpy.ndarray
+        rotation matrix from the body-fixed frame to the instrument frame
+    radii : numpy.ndarray
+        radii of the ellipsoid
+
+    Returns
+    -------
+    hit : numpy.ndarray
+        whether each ray intersects the ellipsoid in front of the observer
+    points : numpy.ndarray
+        intersection points in the body-fixed frame
+    distances : numpy.ndarray
+        ray parameters of the intersections, i.e. the intersection points
+        in the instrument frame are distances * rays
+    """
+    radii = np.asarray(radii, dtype=np.float64)
+    origin = -np.dot(position, rotation)
+    dirs = np.dot(rays, rotation)
+    o = origin / radii
+    d = dirs / radii
+
+    a = np.einsum("...i,...i->...", d, d)
+    b = 2.0 * np.dot(d, o)
+    c = np.dot(o, o) - 1.0
+    disc = b * b - 4.0 * a * c
+    with np.errstate(invalid="ignore"):
+        t = (-b - np.sqrt(disc)) / (2.0 * a)
+    hit = (disc >= 0.0) & (t > 0.0)
+    t = np.where(hit, t, 0.0)
+    points = origin + t[..., None] * dirs
+    return hit, points, t
+
+
+class RaycastSession:
+    """
+    CPU rendering context kept across frames
+
+    Texture bodies are rendered by vectorized ray-ellipsoid intersection
+    with Lambertian shading, so neither pyrender nor an OpenGL context is
+    required. Shape models are drawn as their ellipsoids in a uniform
+    color, and wireframes are not supported. The interface is the same as
+    that of RenderSession.
+    """
+
+    def __init__(
+        self, width, height, bg_color=(0.0, 0.0, 0.0), wireframe=False
+    ):
+        if wireframe:
+            raise ValueError("wireframe is not supported by raycast")
+        self._width = None
+        self._height = None
+        self._bg_color = list(bg_color)
+        self._bg_pixel = (np.array(self._bg_color + [1.0]) * 255).astype(
+            np.uint8
+        )
+        self._update_size(width, height)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        pass
+
+    @property
+    def depth(self):
+        """
+        Depth of the last frame, 0 on the pixels without bodies
+
+        The depth is the distance in km along the boresight. It differs
+        from that of RenderSession, so only depth > 0 is meaningful across
+        the backends.
+        """
+        return np.where(np.isfinite(self._depth), self._depth, 0.0)
+
+    def _update_size(self, width, height):
+        if (width, height) == (self._width, self._height):
+            return
+        self._width = width
+        self._height = height
+        self._star_image = np.zeros(shape=(height, width, 4), dtype=np.uint8)
+        self._star_mask = np.empty((height, width, 1), dtype=bool)
+        self._depth = np.full((height, width), np.inf)
+
+    def _draw_body(self, obsinfo, solar_object, out, viewport):
+        rect = obsinfo.fov.bounds_rect
+        position = np.asarray(solar_object["position"], dtype=np.float64)
+        radii = solar_object["radius"]
+        x0, x1, y0, y1 = _pixel_bounds(
+            rect,
+            obsinfo.width,
+            obsinfo.height,
+            position,
+            np.max(radii),
+            obsinfo.angle_res,
+        )
+        vx, vy, vwidth, vheight = viewport
+        x0, x1 = max(x0, vx), min(x1, vx + vwidth)
+        y0, y1 = max(y0, vy), min(y1, vy + vheight)
+        if x0 >= x1 or y0 >= y1:
+            return
+
+        rotation = solar_object["rotation"]
+        rays = pixel_rays(rect, obsinfo.width, obsinfo.height, x0, x1, y0, y1)
+        hit, points, t = raycast_ellipsoid(rays, position, rotation, radii)
+        depth = t * rays[..., 2]
+        hit &= depth < self._depth[y0 - vy : y1 - vy, x0 - vx : x1 - vx]
+        if not np.any(hit):
+            return
+        points = points[hit]
+        rays = rays[hit]
+
+        # Lambertian shading by the direction to the Sun
+        normals = np.dot(points / np.square(radii), rotation.T)
+        normals /= np.linalg.norm(normals, axis=1)[:, None]
+        sun = -obsinfo.pos - t[hit][:, None] * rays
+        sun /= np.linalg.norm(sun, axis=1)[:, None]
+        shade = np.clip(np.einsum("ij,ij->i", normals, sun), 0.0, 1.0)
+
+        model = solar_object["model"]
+        if model["type"] == "texture-body":
+            texture = _texture_array(model["file"])
+            unit = points / radii
+            lon = np.arctan2(unit[:, 1], unit[:, 0])
+            lat = np.arctan2(unit[:, 2], np.hypot(unit[:, 0], unit[:, 1]))
+            u = (lon + np.pi) / (2.0 * np.pi)
+            v = (np.pi / 2.0 - lat) / np.pi
+            rows = np.rint(v * (texture.shape[0] - 1)).astype(int)
+            cols = np.rint(u * (texture.shape[1] - 1)).astype(int)
+            color = texture[rows, cols]
+        else:
+            color = np.array(DEFAULT_COLOR)
+
+        ys, xs = np.nonzero(hit)
+        ys += y0 - vy
+        xs += x0 - vx
+        out[ys, xs, 0:3] = color * shade[:, None]
+        out[ys, xs, 3] = 255
+        self._depth[ys, xs] = depth[hit]
+
+    def render(self, obsinfo, out=None, viewport=None):
+        """
+        Render an observation
+
+        Parameters
+        ----------
+        obsinfo : ObsInfo
+            observation information
+        out : numpy.ndarray
+            uint8 RGBA buffer of shape (height, width, 4) to render into;
+            a new buffer is allocated if omitted
+        viewport : tuple
+            tile (x, y, width, height) of the frame to render; the whole
+            frame is rendered if omitted
+
+        Returns
+        -------
+        image : numpy.ndarray
+            uint8 RGBA image
+        """
+        if viewport is None:
+            viewport = (0, 0, obsinfo.width, obsinfo.height)
+        x0, y0, width, height = viewport
+        self._update_size(width, height)
+
+        bodies = []
+        sprites = []
+        for solar_object in obsinfo.solar_objects:
+            if "model" not in solar_object:
+                continue
+            radius = pixel_radius(solar_object, obsinfo.angle_res)
+            if sphere_count(radius) is None:
+                sprites.append(solar_object_sprite(solar_object))
+            else:
+                bodies.append(solar_object)
+
+        self._star_image.fill(0)
+        star_image = rasterize_stars(
+            obsinfo.stars, width, height, self._star_image, (x0, y0)
+        )
+        rasterize_stars(sprites, width, height, star_image, (x0, y0))
+
+        # background color < stars < solar objects in the order of depth
+        if out is None:
+            out = np.empty((height, width, 4), dtype=np.uint8)
+        out[...] = self._bg_pixel
+        np.greater(star_image[..., 3:4], 0, out=self._star_mask)
+        np.copyto(out, star_image, where=self._star_mask)
+        self._depth.fill(np.inf)
+        for solar_object in bodies:
+            self._draw_body(obsinfo, solar_object, out, viewport)
+        return out
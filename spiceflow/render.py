@@ -1,37 +1,127 @@
+import functools
 import numpy as np
-import spiceypy as spice
 import pyrender
 import trimesh
-from PIL import Image, ImageOps
-from .star import star_texture
+from .raycast import RaycastSession
+from .resource_cache import get_resource_cache
+from .scene import load_texture, pixel_radius, solar_object_sprite
+from .scene import sphere_count
+from .star import rasterize_stars, star_texture
 
 
-def render_solar_object(solar_object, wireframe):
+@functools.lru_cache(maxsize=None)
+def unit_sphere(count=(32, 32)):
+    """
+    Obtain the cached geometry of a unit UV sphere
+
+    Parameters
+    ----------
+    count : tuple
+        number of latitude and longitude lines
+
+    Returns
+    -------
+    vertices : numpy.ndarray
+        vertices of the unit sphere
+    faces : numpy.ndarray
+        faces of the unit sphere
+    uv : numpy.ndarray
+        texture coordinates of the vertices in longitude and latitude
+    """
+    sphere = trimesh.creation.uv_sphere(count=list(count))
+    vertices = np.array(sphere.vertices)
+    faces = np.array(sphere.faces)
+    lon = np.arctan2(vertices[:, 1], vertices[:, 0])
+    lat = np.arctan2(vertices[:, 2], np.hypot(vertices[:, 0], vertices[:, 1]))
+    uv = np.stack(
+        [(lon + np.pi) / (2.0 * np.pi), (np.pi / 2.0 - lat) / np.pi], axis=1
+    )
+    for array in (vertices, faces, uv):
+        array.flags.writeable = False
+    return vertices, faces, uv
+
+
+def _trimesh_nbytes(mesh):
+    if isinstance(mesh, trimesh.Scene):
+        return sum(_trimesh_nbytes(g) for g in mesh.geometry.values())
+    return mesh.vertices.nbytes + mesh.faces.nbytes
+
+
+def _pyrender_nbytes(mesh):
+    nbytes = 0
+    for primitive in mesh.primitives:
+        for array in (
+            primitive.positions,
+            primitive.normals,
+            primitive.texcoord_0,
+            primitive.color_0,
+            primitive.indices,
+        ):
+            if array is not None:
+                nbytes += array.nbytes
+        texture = getattr(primitive.material, "baseColorTexture", None)
+        if texture is not None and isinstance(texture.source, np.ndarray):
+            nbytes += texture.source.nbytes
+    return nbytes
+
+
+def load_model(filename):
+    """
+    Load a shape model through the resource cache
+
+    Parameters
+    ----------
+    filename : str
+        model file readable by trimesh
+
+    Returns
+    -------
+    model : trimesh.Trimesh or trimesh.Scene
+        shape model
+    """
+    return get_resource_cache().get(
+        "model", filename, lambda: trimesh.load(filename), _trimesh_nbytes
+    )
+
+
+def _texture_body_mesh(filename, radius, wireframe, count):
+    vertices, faces, uv = unit_sphere(count)
+    sphere = trimesh.Trimesh(
+        vertices=vertices * np.array(radius), faces=faces, process=False
+    )
+    sphere.visual = trimesh.visual.TextureVisuals(
+        uv=uv,
+        image=load_texture(filename),
+    )
+    return pyrender.Mesh.from_trimesh(
+        mesh=sphere, smooth=True, wireframe=wireframe
+    )
+
+
+def render_solar_object(solar_object, wireframe, count=(32, 32)):
     if "model" in solar_object:
         model = solar_object["model"]
+        cache = get_resource_cache()
         if model["type"] == "texture-body":
-            sphere = trimesh.creation.uv_sphere(
-                radius=solar_object["radius"][0]
-            )
-            vs = trimesh.creation.uv_sphere().vertices
-            uv = []
-            for v in vs:
-                r, lon, lat = spice.reclat(np.array(v))
-                u = (lon + np.pi) / (2.0 * np.pi)
-                v = (np.pi / 2.0 - lat) / np.pi
-                uv.append([u, v])
-            uv = np.array(uv)
-            im = Image.open(model["file"])
-            sphere.visual = trimesh.visual.TextureVisuals(
-                uv=uv,
-                image=ImageOps.flip(im),
-            )
-            mesh = pyrender.Mesh.from_trimesh(
-                mesh=sphere, smooth=True, wireframe=wireframe
+            radius = tuple(solar_object["radius"])
+            mesh = cache.get(
+                "texture-body",
+                model["file"],
+                lambda: _texture_body_mesh(
+                    model["file"], radius, wireframe, count
+                ),
+                _pyrender_nbytes,
+                extra=(radius, wireframe, count),
             )
         elif model["type"] == "model":
-            polygon = trimesh.load(model["file"])
-            mesh = pyrender.Mesh.from_trimesh(mesh=polygon)
+            mesh = cache.get(
+                "model-mesh",
+                model["file"],
+                lambda: pyrender.Mesh.from_trimesh(
+                    mesh=load_model(model["file"])
+                ),
+                _pyrender_nbytes,
+            )
         pose = np.identity(4)
         pose[0:3, 0:3] = solar_object["rotation"]
         pose[0:3, 3] = solar_object["position"]
@@ -45,46 +135,230 @@ def render_star(star, width, height):
     )
 
 
-def render(obsinfo, bg_color=[0.0, 0.0, 0.0], wireframe=False):
-    scene = pyrender.Scene(bg_color=bg_color)
-    camera = pyrender.PerspectiveCamera(
-        yfov=np.radians(obsinfo.fov.fovy), aspectRatio=obsinfo.fov.aspect
-    )
+class RenderSession:
+    """
+    Offscreen rendering context kept across frames
+
+    The offscreen renderer, the scene, the camera, the light and the mesh
+    nodes of the solar objects are kept alive, and only the node poses,
+    the light position and the star layer are updated for each ObsInfo.
+
+    Texture bodies are tessellated according to their projected size, and
+    solar objects smaller than a pixel are drawn as sprites with the stars
+    instead of meshes.
+    """
 
     # rot_z(180) . rot_y(180)
-    camera_pose = np.array(
+    CAMERA_POSE = np.array(
         [[1, 0, 0, 0], [0, -1, 0, 0], [0, 0, -1, 0], [0, 0, 0, 1]],
         dtype=np.float64,
     )
-    scene.add(camera, pose=camera_pose)
 
-    star_image = np.zeros(
-        shape=(obsinfo.height, obsinfo.width, 4), dtype=np.uint8
-    )
+    def __init__(
+        self, width, height, bg_color=(0.0, 0.0, 0.0), wireframe=False
+    ):
+        self._width = width
+        self._height = height
+        self._bg_color = list(bg_color)
+        self._wireframe = wireframe
+        self._renderer = pyrender.OffscreenRenderer(width, height)
+        self._scene = pyrender.Scene(bg_color=self._bg_color)
+        self._camera_node = None
+        self._camera_params = None
+        self._mesh_nodes = {}
+        self._bg_pixel = (np.array(self._bg_color + [1.0]) * 255).astype(
+            np.uint8
+        )
+        self._allocate(width, height)
+        self._depth = None
 
-    for star in obsinfo.stars:
-        star_image += render_star(star, obsinfo.width, obsinfo.height)
-
-    for solar_object in obsinfo.solar_objects:
-        mesh, pose = render_solar_object(solar_object, wireframe)
-        scene.add(mesh, pose=pose)
-
-    # light = pyrender.PointLight(color=[1.0, 1.0, 1.0], intensity=3.8e27)
-    light = pyrender.PointLight(color=[1.0, 1.0, 1.0], intensity=3.8e17)
-    pose = np.identity(4)
-    pose[0:3, 3] = -obsinfo.pos
-    scene.add(light, pose=pose)
-
-    # Render the scene
-    r = pyrender.OffscreenRenderer(obsinfo.width, obsinfo.height)
-    flags = pyrender.RenderFlags.RGBA | pyrender.RenderFlags.SHADOWS_DIRECTIONAL
-    foreground, _ = r.render(scene, flags=flags)
-
-    # background layer: star_image, foreground layer:foreground
-    bg_color.append(1.0)
-    bg_color_int = (np.array(bg_color) * 255).astype(int)
-    return np.where(
-        foreground != bg_color_int,
-        foreground,
-        np.where(star_image != [0, 0, 0, 0], star_image, bg_color_int),
-    )
+        # light = pyrender.PointLight(color=[1.0, 1.0, 1.0], intensity=3.8e27)
+        light = pyrender.PointLight(color=[1.0, 1.0, 1.0], intensity=3.8e17)
+        self._light_node = self._scene.add(light, pose=np.identity(4))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """ Release the offscreen context """
+        if self._renderer is not None:
+            self._renderer.delete()
+            self._renderer = None
+
+    @property
+    def depth(self):
+        """
+        Depth of the last frame, 0 on the pixels without bodies
+
+        The depth is read from the OpenGL depth buffer, whose resolution
+        is coarse at the distances of solar objects, and differs from that
+        of RaycastSession, so only depth > 0 is meaningful across the
+        backends.
+        """
+        return self._depth
+
+    def _update_size(self, width, height):
+        if (width, height) == (self._width, self._height):
+            return
+        self._width = width
+        self._height = height
+        self._renderer.viewport_width = width
+        self._renderer.viewport_height = height
+        self._allocate(width, height)
+
+    def _allocate(self, width, height):
+        # buffers reused by the frames of the same size
+        self._star_image = np.zeros(shape=(height, width, 4), dtype=np.uint8)
+        self._star_mask = np.empty((height, width, 1), dtype=bool)
+        self._body_mask = np.empty((height, width, 1), dtype=bool)
+
+    def _update_camera(self, obsinfo, viewport):
+        fov = obsinfo.fov
+        if viewport is None:
+            params = (fov.fovy, fov.aspect)
+        else:
+            # sub-frustum of the tile in the frustum of the whole frame
+            rect = fov.bounds_rect
+            x0, y0, _width, _height = viewport
+            fx = rect.z * obsinfo.width / rect.width
+            fy = rect.z * obsinfo.height / rect.height
+            cx = -rect.left * obsinfo.width / rect.width - x0
+            cy = -rect.top * obsinfo.height / rect.height - y0
+            params = (fx, fy, cx, cy)
+        if params == self._camera_params:
+            return
+        if self._camera_node is not None:
+            self._scene.remove_node(self._camera_node)
+        if viewport is None:
+            camera = pyrender.PerspectiveCamera(
+                yfov=np.radians(fov.fovy), aspectRatio=fov.aspect
+            )
+        else:
+            # IntrinsicsCamera does not support an infinite far plane
+            camera = pyrender.IntrinsicsCamera(*params, zfar=1.0e12)
+        self._camera_node = self._scene.add(camera, pose=self.CAMERA_POSE)
+        self._camera_params = params
+
+    def _update_meshes(self, solar_objects, angle_res):
+        nodes = {}
+        sprites = []
+        for solar_object in solar_objects:
+            if "model" not in solar_object:
+                continue
+            count = sphere_count(pixel_radius(solar_object, angle_res))
+            if count is None:
+                sprites.append(solar_object_sprite(solar_object))
+                continue
+            mesh, pose = render_solar_object(
+                solar_object, self._wireframe, count
+            )
+            key = solar_object["naif_id"]
+            node = self._mesh_nodes.pop(key, None)
+            if node is not None and node.mesh is mesh:
+                self._scene.set_pose(node, pose)
+            else:
+                if node is not None:
+                    self._scene.remove_node(node)
+                node = self._scene.add(mesh, pose=pose)
+            nodes[key] = node
+
+        # bodies which are no longer in the FOV
+        for node in self._mesh_nodes.values():
+            self._scene.remove_node(node)
+        self._mesh_nodes = nodes
+        return sprites
+
+    def render(self, obsinfo, out=None, viewport=None):
+        """
+        Render an observation
+
+        Parameters
+        ----------
+        obsinfo : ObsInfo
+            observation information
+        out : numpy.ndarray
+            uint8 RGBA buffer of shape (height, width, 4) to render into;
+            a new buffer is allocated if omitted
+        viewport : tuple
+            tile (x, y, width, height) of the frame to render; the whole
+            frame is rendered if omitted
+
+        Returns
+        -------
+        image : numpy.ndarray
+            uint8 RGBA image
+        """
+        if viewport is None:
+            x0, y0, width, height = 0, 0, obsinfo.width, obsinfo.height
+        else:
+            x0, y0, width, height = viewport
+        self._update_size(width, height)
+        self._update_camera(obsinfo, viewport)
+        sprites = self._update_meshes(obsinfo.solar_objects, obsinfo.angle_res)
+
+        pose = np.identity(4)
+        pose[0:3, 3] = -obsinfo.pos
+        self._scene.set_pose(self._light_node, pose)
+
+        self._star_image.fill(0)
+        star_image = rasterize_stars(
+            obsinfo.stars, width, height, self._star_image, (x0, y0)
+        )
+        rasterize_stars(sprites, width, height, star_image, (x0, y0))
+
+        # Render the scene
+        flags = (
+            pyrender.RenderFlags.RGBA
+            | pyrender.RenderFlags.SHADOWS_DIRECTIONAL
+        )
+        foreground, depth = self._renderer.render(self._scene, flags=flags)
+        self._depth = depth
+
+        # background color < stars < solar objects, where stars are masked
+        # by their alpha and solar objects by the depth buffer
+        if out is None:
+            out = np.empty((height, width, 4), dtype=np.uint8)
+        out[...] = self._bg_pixel
+        np.greater(star_image[..., 3:4], 0, out=self._star_mask)
+        np.copyto(out, star_image, where=self._star_mask)
+        np.greater(depth[..., None], 0, out=self._body_mask)
+        np.copyto(out, foreground, where=self._body_mask)
+        return out
+
+
+def get_session_class(backend):
+    """
+    Obtain the rendering session class of a backend
+
+    Parameters
+    ----------
+    backend : str
+        "pyrender" for OpenGL rendering or "raycast" for CPU rendering
+
+    Returns
+    -------
+    session_class : type
+        RenderSession or RaycastSession
+    """
+    if backend == "pyrender":
+        return RenderSession
+    if backend == "raycast":
+        return RaycastSession
+    raise ValueError(f"unknown backend: {backend}")
+
+
+def render(
+    obsinfo,
+    bg_color=(0.0, 0.0, 0.0),
+    wireframe=False,
+    out=None,
+    backend="pyrender",
+):
+    session_class = get_session_class(backend)
+    with session_class(
+        obsinfo.width, obsinfo.height, bg_color, wireframe
+    ) as session:
+        return session.render(obsinfo, out)
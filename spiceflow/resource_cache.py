@@ -0,0 +1,100 @@
+import os
+from collections import OrderedDict
+
+
+class ResourceCache:
+    """
+    Bounded LRU cache of resources loaded from files
+
+    Resources are keyed by kind, file path, modification time and size of
+    the file, so that a modified file is loaded again. The least recently
+    used resources are evicted when the total size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._max_bytes = max_bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = value
+        self._evict()
+
+    def _evict(self):
+        while self._nbytes > self._max_bytes and self._entries:
+            _key, (_value, nbytes) = self._entries.popitem(last=False)
+            self._nbytes -= nbytes
+
+    def get(self, kind, path, loader, sizeof, extra=()):
+        """
+        Obtain a resource, loading it on a cache miss
+
+        Parameters
+        ----------
+        kind : str
+            kind of the resource
+        path : str
+            file the resource is loaded from
+        loader : callable
+            function returning the resource
+        sizeof : callable
+            function returning the size of the resource in bytes
+        extra : tuple
+            additional hashable key, e.g. parameters of the loader
+
+        Returns
+        -------
+        resource : object
+            cached or loaded resource
+        """
+        stat = os.stat(path)
+        key = (kind, os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        key += tuple(extra)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+        value = loader()
+        nbytes = sizeof(value)
+        if nbytes <= self._max_bytes:
+            self._entries[key] = (value, nbytes)
+            self._nbytes += nbytes
+            self._evict()
+        return value
+
+    def clear(self):
+        self._entries.clear()
+        self._nbytes = 0
+
+
+_cache = ResourceCache(
+    int(os.environ.get("SPICEFLOW_RESOURCE_CACHE_BYTES", 2 ** 30))
+)
+
+
+def get_resource_cache():
+    """
+    Obtain the process-wide cache of textures and models
+
+    The memory budget defaults to 1 GiB or the value of the environment
+    variable SPICEFLOW_RESOURCE_CACHE_BYTES, and can be changed by setting
+    max_bytes of the returned cache.
+
+    Returns
+    -------
+    cache : ResourceCache
+        process-wide resource cache
+    """
+    return _cache
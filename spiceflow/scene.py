@@ -0,0 +1,139 @@
+import numpy as np
+from PIL import Image, ImageOps
+from .resource_cache import get_resource_cache
+
+
+# solar objects smaller than this radius in pixels are drawn as sprites
+SPRITE_PIXEL_RADIUS = 0.5
+
+# maximum length in pixels of the sphere edges along the equator
+LOD_EDGE_PIXELS = 4.0
+
+# range of the number of latitude and longitude lines of the sphere
+LOD_COUNT_RANGE = (8, 64)
+
+# magnitude of sprites whose magnitude is unknown
+SPRITE_DEFAULT_MAGNITUDE = 7.0
+
+
+def pixel_radius(solar_object, angle_res):
+    """
+    Obtain the projected radius of a solar object in pixels
+
+    Parameters
+    ----------
+    solar_object : dict
+        solar object of ObsInfo
+    angle_res : float
+        angular resolution in degrees per pixel
+
+    Returns
+    -------
+    radius : float
+        projected radius in pixels
+    """
+    radius = np.max(solar_object["radius"])
+    ratio = min(radius / solar_object["distance"], 1.0)
+    return np.degrees(np.arcsin(ratio)) / angle_res
+
+
+def sphere_count(radius):
+    """
+    Select the level of detail of a sphere from its projected radius
+
+    Parameters
+    ----------
+    radius : float
+        projected radius in pixels
+
+    Returns
+    -------
+    count : tuple or None
+        number of latitude and longitude lines of the sphere, or None if
+        the sphere is smaller than a pixel and drawn as a sprite
+    """
+    if radius < SPRITE_PIXEL_RADIUS:
+        return None
+    lines = 2.0 * np.pi * radius / LOD_EDGE_PIXELS
+    lines = 2 ** int(np.ceil(np.log2(lines)))
+    lines = int(np.clip(lines, *LOD_COUNT_RANGE))
+    return (lines, lines)
+
+
+def _image_nbytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+def load_texture(filename):
+    """
+    Load a texture image flipped for OpenGL through the resource cache
+
+    Parameters
+    ----------
+    filename : str
+        image file
+
+    Returns
+    -------
+    image : PIL.Image.Image
+        flipped texture image
+    """
+    return get_resource_cache().get(
+        "texture",
+        filename,
+        lambda: ImageOps.flip(Image.open(filename)),
+        _image_nbytes,
+    )
+
+
+def texture_color(filename):
+    """
+    Obtain the mean color of a texture through the resource cache
+
+    Parameters
+    ----------
+    filename : str
+        image file
+
+    Returns
+    -------
+    color : tuple
+        mean RGB values
+    """
+
+    def mean_color():
+        image = np.asarray(load_texture(filename).convert("RGB"))
+        return tuple(image.reshape(-1, 3).mean(axis=0).tolist())
+
+    return get_resource_cache().get(
+        "texture-color", filename, mean_color, lambda color: 24
+    )
+
+
+def solar_object_sprite(solar_object):
+    """
+    Convert a solar object smaller than a pixel into a star-like sprite
+
+    Parameters
+    ----------
+    solar_object : dict
+        solar object of ObsInfo with a model
+
+    Returns
+    -------
+    sprite : dict
+        sprite which can be passed to rasterize_stars
+    """
+    model = solar_object["model"]
+    if model["type"] == "texture-body":
+        color = texture_color(model["file"])
+    else:
+        color = (255, 255, 255)
+    magnitude = solar_object["magnitude"]
+    if magnitude is None:
+        magnitude = SPRITE_DEFAULT_MAGNITUDE
+    return {
+        "image_pos": solar_object["image_pos"],
+        "visual_magnitude": magnitude,
+        "color": color,
+    }
@@ -1,5 +1,64 @@
-from .obs_info import ObsInfo
+from .obs_info import ObsContext, ObsInfo
 
 
 def simulate(inst, et, abcorr, obsrvr, width, height, mag_limit):
     return ObsInfo(inst, et, abcorr, obsrvr, width, height, mag_limit)
+
+
+def simulate_series(
+    inst,
+    ets,
+    abcorr,
+    obsrvr,
+    width,
+    height,
+    mag_limit,
+    ephemeris=None,
+    context=None,
+):
+    """
+    Simulate observations at a series of epochs
+
+    The epoch-independent state (FOV geometry, star catalog, body list and
+    frame lookups) is computed once and shared by all the observations.
+
+    Parameters
+    ----------
+    inst : str
+        instrument name
+    ets : iterable
+        epochs in ephemeris time
+    abcorr : str
+        aberration correction
+    obsrvr : str
+        observer name
+    width : int
+        image width
+    height : int
+        image height
+    mag_limit : float
+        limiting magnitude of stars
+    ephemeris : EphemerisCache
+        interpolation cache of positions and rotations
+    context : ObsContext
+        epoch-independent state of the instrument built beforehand; if
+        given, ephemeris is ignored
+
+    Returns
+    -------
+    obsinfos : iterator
+        ObsInfo for each epoch
+    """
+    if context is None:
+        context = ObsContext(inst, ephemeris)
+    for et in ets:
+        yield ObsInfo(
+            inst,
+            et,
+            abcorr,
+            obsrvr,
+            width,
+            height,
+            mag_limit,
+            context=context,
+        )
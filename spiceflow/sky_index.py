@@ -0,0 +1,120 @@
+import numpy as np
+from .util import vec_dist
+
+
+class SkyIndex:
+    """
+    Spatial index of unit vectors on the celestial sphere
+
+    The sphere is divided into declination zones of equal height, and each
+    zone is divided into right ascension sectors. The indexed points are
+    sorted by cell and by magnitude in each cell, so that a cone search
+    visits only the cells overlapping the cone and stops at the magnitude
+    limit found by bisection in the magnitudes of each cell.
+    """
+
+    def __init__(self, ra, dec, magnitude, vectors, n_dec=90):
+        self._n_dec = n_dec
+        self._n_ra = 2 * n_dec
+        self._step = np.pi / n_dec
+        self._vectors = vectors
+
+        ncell = self._n_dec * self._n_ra
+        cells = self._cells(np.asarray(ra), np.asarray(dec))
+        magnitude = np.asarray(magnitude, dtype=np.float64)
+        self._order = np.lexsort((magnitude, cells))
+        self._magnitude = magnitude[self._order]
+        counts = np.bincount(cells, minlength=ncell)
+        self._start = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self):
+        return len(self._order)
+
+    def _cells(self, ra, dec):
+        zone = np.floor((dec + np.pi / 2.0) / self._step).astype(np.int64)
+        zone = np.clip(zone, 0, self._n_dec - 1)
+        sector = np.floor(np.mod(ra, 2.0 * np.pi) / self._step)
+        sector = np.clip(sector.astype(np.int64), 0, self._n_ra - 1)
+        return zone * self._n_ra + sector
+
+    def _search_magnitude(self, starts, ends, mag_limit):
+        """ Bisect the magnitude slice [starts, ends) of each cell at once """
+        lo = starts.copy()
+        hi = ends.copy()
+        while True:
+            active = lo < hi
+            if not np.any(active):
+                return lo
+            mid = (lo + hi) // 2
+            # the index of an empty slice is clipped, and not used
+            brighter = self._magnitude[np.minimum(mid, len(self) - 1)]
+            brighter = brighter < mag_limit
+            lo = np.where(active & brighter, mid + 1, lo)
+            hi = np.where(active & ~brighter, mid, hi)
+
+    def _cone_cells(self, ra0, dec0, radius):
+        dec_lo = dec0 - radius
+        dec_hi = dec0 + radius
+        zone_lo = int(np.floor((dec_lo + np.pi / 2.0) / self._step))
+        zone_hi = int(np.floor((dec_hi + np.pi / 2.0) / self._step))
+        zones = np.arange(
+            max(zone_lo, 0), min(zone_hi, self._n_dec - 1) + 1, dtype=np.int64
+        )
+
+        if dec_hi >= np.pi / 2.0 or dec_lo <= -np.pi / 2.0:
+            sectors = np.arange(self._n_ra, dtype=np.int64)
+        else:
+            dra = np.arcsin(min(np.sin(radius) / np.cos(dec0), 1.0))
+            sector_lo = int(np.floor((ra0 - dra) / self._step))
+            sector_hi = int(np.floor((ra0 + dra) / self._step))
+            if sector_hi - sector_lo + 1 >= self._n_ra:
+                sectors = np.arange(self._n_ra, dtype=np.int64)
+            else:
+                sectors = np.mod(
+                    np.arange(sector_lo, sector_hi + 1, dtype=np.int64),
+                    self._n_ra,
+                )
+        return (zones[:, np.newaxis] * self._n_ra + sectors).ravel()
+
+    def cone_search(self, center_vec, radius, mag_limit=None):
+        """
+        Search points in a cone
+
+        Parameters
+        ----------
+        center_vec : numpy.ndarray
+            direction of the cone axis
+        radius : float
+            half angle of the cone in radians
+        mag_limit : float
+            points with magnitude equal to or fainter than this are skipped
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            sorted indices of the points whose angular distance from
+            center_vec is less than radius
+        """
+        center = np.asarray(center_vec, dtype=np.float64)
+        center = center / np.linalg.norm(center)
+        ra0 = np.arctan2(center[1], center[0])
+        dec0 = np.arcsin(np.clip(center[2], -1.0, 1.0))
+
+        cells = self._cone_cells(ra0, dec0, radius)
+        starts = self._start[cells]
+        if mag_limit is None:
+            ends = self._start[cells + 1]
+        else:
+            ends = self._search_magnitude(
+                starts, self._start[cells + 1], mag_limit
+            )
+
+        # concatenate the ranges [starts, ends) of all cells
+        lengths = ends - starts
+        total = np.sum(lengths)
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(total)
+
+        candidates = self._order[positions]
+        inside = vec_dist(center, self._vectors[candidates]) < radius
+        return np.sort(candidates[inside])
@@ -1,7 +1,7 @@
 import numpy as np
 import spiceypy as spice
+from .table import SolarObjectTable
 from .transform import viewport_frustum
-from .util import get_object_type
 
 
 OBJECT_ID_SUN = 10
@@ -19,22 +19,72 @@ OBJECT_ID_PLUTO = 999
 
 def search_solar_objects(obsinfo):
     solar_objects = []
-    count = spice.ktotal("spk")
-    for which in range(count):
-        filename, _filetype, _source, _handle = spice.kdata(which, "spk")
-        ids = spice.spkobj(filename)
-        for i in range(spice.card(ids)):
-            obj = ids[i]
-            target = spice.bodc2n(obj)
-            if is_target_in_fov(
+    for body in obsinfo.context.bodies:
+        in_fov = screen_target(obsinfo, body)
+        if in_fov is None:
+            in_fov = is_target_in_fov(
                 obsinfo.inst,
-                target,
+                body["name"],
                 obsinfo.et,
                 obsinfo.abcorr,
                 obsinfo.obsrvr,
-            ):
-                solar_objects.append(get_solar_object(obsinfo, obj, target))
-    return solar_objects
+                body["frame"],
+            )
+        if in_fov:
+            solar_objects.append(get_solar_object(obsinfo, body))
+    return SolarObjectTable.from_rows(solar_objects)
+
+
+def screen_target(obsinfo, body):
+    """
+    Screen a target by its angular separation from the FOV center
+
+    Parameters
+    ----------
+    obsinfo : ObsInfo
+        observation information
+    body : dict
+        target body from the body registry
+
+    Returns
+    -------
+    in_fov : bool or None
+        True if the target center is inside the cone inscribed in the FOV,
+        False if the target is outside the cone enclosing the FOV or has
+        no data, and None if exact FOV testing is required
+    """
+    target = body["name"]
+    if body["radii"] is None or body["frame"] is None:
+        return False
+    try:
+        pos, _lt = obsinfo.context.spkpos(
+            target,
+            obsinfo.et,
+            obsinfo.fov.frame,
+            obsinfo.abcorr,
+            obsinfo.obsrvr,
+        )
+    except spice.utils.support_types.SpiceyError:
+        return False
+
+    dist = spice.vnorm(pos)
+    radius = np.max(body["radii"])
+    if dist <= radius:
+        return None
+    ang_radius = np.arcsin(radius / dist)
+    sep = spice.vsep(obsinfo.fov.bounds_rect.center_vec, pos)
+    if sep > obsinfo.fov.enclosing_angle + ang_radius:
+        return False
+    if sep >= obsinfo.fov.inscribed_angle:
+        return None
+
+    # exact testing uses the body-fixed frame of the target, so it must be
+    # usable
+    try:
+        spice.pxform(body["frame"], obsinfo.fov.frame, obsinfo.et)
+    except spice.utils.support_types.SpiceyError:
+        return False
+    return True
 
 
 def get_planet_magnitude(object_id, pos_planet, pos_basis):
@@ -103,24 +153,19 @@ def get_planet_magnitude(object_id, pos_planet, pos_basis):
     return mag
 
 
-def get_orientation_matrix(obsinfo, target, object_id):
-    iau_frame = f"IAU_{target}"
-    frcode = spice.namfrm(iau_frame)
-    if frcode == 0:
-        frame_name = f"FRAME_{object_id}_NAME"
-        _n, iau_frame = spice.gcpool(frame_name, 0, 1)
-        frcode = spice.namfrm(iau_frame)
-    mtx = spice.pxform(iau_frame, obsinfo.fov.frame, obsinfo.et)
+def get_orientation_matrix(obsinfo, iau_frame):
+    mtx = obsinfo.context.pxform(iau_frame, obsinfo.fov.frame, obsinfo.et)
     # rot = get_boresight_rotation_matrix(obsinfo['boresight'])
     # return spice.mxm(rot, mtx)
     return mtx
 
 
-def is_target_in_fov(inst_name, target, et, abcorr, obsrvr):
+def is_target_in_fov(inst_name, target, et, abcorr, obsrvr, tframe=None):
     cnfine = spice.cell_double(4)
     spice.wninsd(et, et + 1, cnfine)
     step = 1
-    tframe = f"IAU_{target}"
+    if tframe is None:
+        tframe = f"IAU_{target}"
     try:
         results = spice.gftfov(
             inst_name,
@@ -137,12 +182,15 @@ def is_target_in_fov(inst_name, target, et, abcorr, obsrvr):
     return True if spice.card(results) > 0 else False
 
 
-def get_solar_object(obsinfo, naif_id, target):
+def get_solar_object(obsinfo, body):
+    naif_id = body["naif_id"]
+    target = body["name"]
+
     # magnitude
-    target_from_sun_j2000, _ = spice.spkpos(
+    target_from_sun_j2000, _ = obsinfo.context.spkpos(
         target, obsinfo.et, "J2000", "LT+S", "SUN"
     )
-    obsrvr_from_sun_j2000, _ = spice.spkpos(
+    obsrvr_from_sun_j2000, _ = obsinfo.context.spkpos(
         obsinfo.obsrvr, obsinfo.et, "J2000", "LT+S", "SUN"
     )
     mag = get_planet_magnitude(
@@ -150,15 +198,12 @@ def get_solar_object(obsinfo, naif_id, target):
     )
 
     # target position on instrument frame
-    target_from_obsrvr, lt = spice.spkpos(
+    target_from_obsrvr, lt = obsinfo.context.spkpos(
         target, obsinfo.et, obsinfo.fov.frame, obsinfo.abcorr, obsinfo.obsrvr
     )
 
-    # radii
-    radii = spice.gdpool(f"BODY{naif_id}_RADII", 0, 3)
-
     # orientation matrix
-    mtx = get_orientation_matrix(obsinfo, target, naif_id)
+    mtx = get_orientation_matrix(obsinfo, body["frame"])
 
     vp = viewport_frustum(
         obsinfo.fov.bounds_rect,
@@ -170,11 +215,11 @@ def get_solar_object(obsinfo, naif_id, target):
     return {
         "naif_id": naif_id,
         "name": target,
-        "type": get_object_type(naif_id),
+        "type": body["type"],
         "position": target_from_obsrvr,
         "magnitude": mag,
         "distance": lt * spice.clight(),
-        "radius": radii,
+        "radius": body["radii"],
         "rotation": mtx,
         "image_pos": vp[0:2],
     }
@@ -1,81 +1,102 @@
 import itertools
 import numpy as np
-import spiceypy as spice
+from .star_catalog import get_star_catalog
+from .table import StarTable, Table
 from .transform import viewport_frustum
-from .util import vec_padist
 
 
-def search_stars(obsinfo, mag_limit=7.0):
-    query = (
-        "SELECT"
-        " CATALOG_NUMBER,RA,DEC,VISUAL_MAGNITUDE,PARLAX,SPECTRAL_TYPE"
-        " FROM HIPPARCOS"
+def search_stars(obsinfo, mag_limit=7.0, catalog=None):
+    if catalog is None:
+        catalog = get_star_catalog()
+
+    center = np.dot(obsinfo.obs2refmtx, obsinfo.center)
+    idx = catalog.cone_search(center, obsinfo.fov.fovmax, mag_limit)
+    tvecs = catalog.vectors[idx] @ np.transpose(obsinfo.ref2obsmtx)
+
+    distance = catalog.distance[idx]
+    vps = viewport_frustum(
+        obsinfo.fov.bounds_rect, obsinfo.width, obsinfo.height, tvecs.T
+    )
+
+    spectral = catalog.spectral_type[idx]
+    return StarTable(
+        hip_id=catalog.hip_id[idx],
+        position=tvecs,
+        ra=catalog.ra[idx],
+        dec=catalog.dec[idx],
+        spectral_type=spectral,
+        visual_magnitude=catalog.visual_magnitude[idx],
+        distance=distance,
+        image_pos=vps[0:2].T,
+        color=get_star_colors(spectral),
     )
-    nmrows, _error, _errmsg = spice.ekfind(query)
-    stars = []
-    for row in range(nmrows):
-        ra = spice.ekgd(1, row, 0)[0] * spice.rpd()
-        dec = spice.ekgd(2, row, 0)[0] * spice.rpd()
-        mag = spice.ekgd(3, row, 0)[0]
-        vec = spice.radrec(1.0, ra, dec)
-        tvec = spice.mxv(obsinfo.ref2obsmtx, vec)
-        _tpa, tdist = vec_padist(obsinfo.center, tvec)
-        if tdist < obsinfo.fov.fovmax and mag < mag_limit:
-            parallax = spice.ekgd(4, row, 0)[0]
-            spectral = spice.ekgc(5, row, 0)[0]
-            distance = 1.0 / np.tan(parallax * spice.rpd())
-            distance = spice.convrt(distance, "AU", "km")
-            pos = tvec * distance
-            vp = viewport_frustum(
-                obsinfo.fov.bounds_rect, obsinfo.width, obsinfo.height, pos
-            )
-            star = {
-                "hip_id": spice.ekgi(0, row, 0)[0],
-                "position": tvec,
-                "ra": ra,
-                "dec": dec,
-                "spectral_type": spectral,
-                "visual_magnitude": mag,
-                "distance": distance,
-                "image_pos": vp[0:2],
-                "color": get_star_color(spectral),
-            }
-            stars.append(star)
-    return stars
+
+
+_SPECTRAL_COLORS = {
+    "O": (128, 128, 255),
+    "W": (128, 128, 255),  # Wolf-Rayet
+    "B": (160, 160, 255),
+    "A": (192, 192, 255),
+    "F": (224, 224, 255),
+    "G": (255, 192, 192),
+    "K": (255, 160, 160),
+    "k": (255, 160, 160),
+    "R": (255, 160, 160),
+    "M": (255, 128, 128),
+    "N": (255, 128, 128),
+    "S": (255, 128, 128),
+    "s": (255, 128, 128),
+    "C": (255, 128, 128),  # carbon star
+}
+
+# RGB values indexed by the character code of the spectral class
+_SPECTRAL_COLOR_LUT = np.tile(
+    np.array(_SPECTRAL_COLORS["G"], dtype=np.int32), (128, 1)
+)
+for _key, _color in _SPECTRAL_COLORS.items():
+    _SPECTRAL_COLOR_LUT[ord(_key)] = _color
 
 
 def get_star_color(spectral):
     """ Obtain RGB values from the spectral type of a star """
 
-    rgb = {
-        "O": (128, 128, 255),
-        "W": (128, 128, 255),  # Wolf-Rayet
-        "B": (160, 160, 255),
-        "A": (192, 192, 255),
-        "F": (224, 224, 255),
-        "G": (255, 192, 192),
-        "K": (255, 160, 160),
-        "k": (255, 160, 160),
-        "R": (255, 160, 160),
-        "M": (255, 128, 128),
-        "N": (255, 128, 128),
-        "S": (255, 128, 128),
-        "s": (255, 128, 128),
-        "C": (255, 128, 128),  # carbon star
-    }
-
-    color = rgb["G"]  # default
+    color = _SPECTRAL_COLORS["G"]  # default
 
     type = spectral[0]
     if type == "(" or type == "D":
         type = spectral[1]
 
-    if type in rgb:
-        color = rgb[type]
+    if type in _SPECTRAL_COLORS:
+        color = _SPECTRAL_COLORS[type]
 
     return color
 
 
+def get_star_colors(spectral_types):
+    """
+    Obtain RGB values from the spectral types of stars
+
+    This is the vectorized version of get_star_color.
+
+    Parameters
+    ----------
+    spectral_types : array_like
+        spectral types
+
+    Returns
+    -------
+    colors : numpy.ndarray
+        RGB values of shape (n, 3)
+    """
+    # character codes of the first two characters, 0 if absent
+    codes = np.ascontiguousarray(spectral_types, dtype="U2")
+    codes = codes.reshape(-1, 1).view(np.uint32).reshape(-1, 2)
+    skip = (codes[:, 0] == ord("(")) | (codes[:, 0] == ord("D"))
+    code = np.where(skip, codes[:, 1], codes[:, 0])
+    code = np.where(code < len(_SPECTRAL_COLOR_LUT), code, ord("G"))
+    return _SPECTRAL_COLOR_LUT[code]
+
+
 _star_map = [
     [
         [0x00, 0x00, 0x99, 0x99, 0x00, 0x00],
@@ -119,3 +140,93 @@ def star_texture(pos_x, pos_y, mag, color, width, height):
         if px >= 0 and px < width and py >= 0 and py < height:
             img[py, px, 0:3] = np.array(color) * star[x][y] / 255.0
     return img
+
+
+def rasterize_stars(stars, width, height, out=None, offset=(0, 0)):
+    """
+    Rasterize stars into an RGBA image
+
+    Stars are grouped by the size of their _star_map kernel and splatted
+    with vectorized indexing. Overlapping stars are added with saturation.
+
+    Parameters
+    ----------
+    stars : StarTable or list
+        stars returned by search_stars, or dicts with the same keys
+    width : int
+        image width
+    height : int
+        image height
+    out : numpy.ndarray
+        output image of shape (height, width, 4) and dtype uint8; the stars
+        are added to its contents if given
+    offset : tuple
+        position (x, y) of the output image in the frame of image_pos, to
+        rasterize a tile of a larger frame
+
+    Returns
+    -------
+    image : numpy.ndarray
+        RGBA image whose alpha is 255 on the pixels covered by stars
+    """
+    if out is None:
+        out = np.zeros(shape=(height, width, 4), dtype=np.uint8)
+    if len(stars) == 0:
+        return out
+
+    if isinstance(stars, Table):
+        pos = stars["image_pos"]
+        mags = stars["visual_magnitude"]
+        colors = stars["color"].astype(np.float64)
+    else:
+        pos = np.array([star["image_pos"] for star in stars], dtype=np.float64)
+        mags = np.array([star["visual_magnitude"] for star in stars])
+        colors = np.array([star["color"] for star in stars], dtype=np.float64)
+    mag_idx = np.clip(np.floor(mags + 0.5).astype(int), 0, 7)
+
+    # skip stars whose kernels cannot reach the output image
+    ox, oy = offset
+    margin = len(_star_map[0])
+    near = (
+        (pos[:, 0] >= ox - margin)
+        & (pos[:, 0] < ox + width + margin)
+        & (pos[:, 1] >= oy - margin)
+        & (pos[:, 1] < oy + height + margin)
+    )
+    pos = pos[near]
+    colors = colors[near]
+    mag_idx = mag_idx[near]
+
+    pixels = []
+    values = []
+    for idx in np.unique(mag_idx):
+        kernel = np.array(_star_map[idx], dtype=np.float64)
+        d = len(kernel)
+        sel = mag_idx == idx
+        # kernel[x][y] is drawn at (pos_x - d / 2 + x, pos_y - d / 2 + y)
+        dx, dy = np.meshgrid(np.arange(d), np.arange(d), indexing="ij")
+        px = (pos[sel, 0, None, None] - d / 2 + dx).astype(int).ravel()
+        py = (pos[sel, 1, None, None] - d / 2 + dy).astype(int).ravel()
+        px -= ox
+        py -= oy
+        value = colors[sel, None, None, :] * kernel[None, :, :, None] / 255.0
+        value = value.astype(np.uint8).reshape(-1, 3)
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        inside &= np.any(value > 0, axis=1)
+        pixels.append(py[inside] * width + px[inside])
+        values.append(value[inside])
+    if len(pixels) == 0:
+        return out
+    pixels = np.concatenate(pixels)
+    values = np.concatenate(values).astype(np.int32)
+
+    # accumulate overlapping stars only on the covered pixels
+    covered, inverse = np.unique(pixels, return_inverse=True)
+    sums = np.zeros((len(covered), 3), dtype=np.int32)
+    np.add.at(sums, inverse.ravel(), values)
+
+    rows, cols = np.divmod(covered, width)
+    sums += out[rows, cols, 0:3]
+    out[rows, cols, 0:3] = np.minimum(sums, 255)
+    out[rows, cols, 3] = 255
+    return out
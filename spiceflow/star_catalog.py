@@ -0,0 +1,254 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy as np
+import spiceypy as spice
+from pathlib import Path
+from .sky_index import SkyIndex
+from .util import get_cache_dir, loaded_kernels, radrec_array
+
+
+class StarCatalog:
+    """
+    HIPPARCOS star catalog held as NumPy columns
+
+    The columns used for star search are extracted from the HIPPARCOS EK
+    table once, so that searching stars for an observation is performed
+    as whole-array operations instead of per-row EK queries.
+    """
+
+    COLUMNS = [
+        "hip_id",
+        "ra",
+        "dec",
+        "visual_magnitude",
+        "parallax",
+        "spectral_type",
+    ]
+
+    QUERY = (
+        "SELECT"
+        " CATALOG_NUMBER,RA,DEC,VISUAL_MAGNITUDE,PARLAX,SPECTRAL_TYPE"
+        " FROM HIPPARCOS"
+    )
+
+    def __init__(
+        self, hip_id, ra, dec, visual_magnitude, parallax, spectral_type
+    ):
+        self._hip_id = np.asarray(hip_id)
+        self._ra = np.asarray(ra)
+        self._dec = np.asarray(dec)
+        self._visual_magnitude = np.asarray(visual_magnitude)
+        self._parallax = np.asarray(parallax)
+        self._spectral_type = np.asarray(spectral_type)
+        self._vectors = None
+        self._distance = None
+        self._index = None
+
+    @classmethod
+    def from_ek(cls):
+        """
+        Extract the star catalog from the loaded HIPPARCOS EK table
+
+        Returns
+        -------
+        catalog : StarCatalog
+            star catalog
+        """
+        nmrows, _error, _errmsg = spice.ekfind(cls.QUERY)
+        hip_id = np.empty(nmrows, dtype=np.int32)
+        ra = np.empty(nmrows, dtype=np.float64)
+        dec = np.empty(nmrows, dtype=np.float64)
+        mag = np.empty(nmrows, dtype=np.float64)
+        parallax = np.empty(nmrows, dtype=np.float64)
+        spectral = []
+        for row in range(nmrows):
+            hip_id[row] = spice.ekgi(0, row, 0)[0]
+            ra[row] = spice.ekgd(1, row, 0)[0]
+            dec[row] = spice.ekgd(2, row, 0)[0]
+            mag[row] = spice.ekgd(3, row, 0)[0]
+            parallax[row] = spice.ekgd(4, row, 0)[0]
+            spectral.append(spice.ekgc(5, row, 0)[0])
+        return cls(
+            hip_id,
+            ra * spice.rpd(),
+            dec * spice.rpd(),
+            mag,
+            parallax,
+            np.array(spectral, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, dirname, mmap_mode="r"):
+        """
+        Load a star catalog saved by StarCatalog.save
+
+        Parameters
+        ----------
+        dirname : str
+            directory containing the catalog columns
+        mmap_mode : str
+            memory-map mode passed to numpy.load
+
+        Returns
+        -------
+        catalog : StarCatalog
+            star catalog
+        """
+        path = Path(dirname)
+        columns = [
+            np.load(path / f"{column}.npy", mmap_mode=mmap_mode)
+            for column in cls.COLUMNS
+        ]
+        return cls(*columns)
+
+    def save(self, dirname):
+        """
+        Save the catalog columns as .npy files
+
+        Parameters
+        ----------
+        dirname : str
+            output directory
+        """
+        path = Path(dirname)
+        path.mkdir(parents=True, exist_ok=True)
+        for column in self.COLUMNS:
+            np.save(path / f"{column}.npy", getattr(self, column))
+
+    def __len__(self):
+        return len(self._hip_id)
+
+    @property
+    def hip_id(self):
+        return self._hip_id
+
+    @property
+    def ra(self):
+        return self._ra
+
+    @property
+    def dec(self):
+        return self._dec
+
+    @property
+    def visual_magnitude(self):
+        return self._visual_magnitude
+
+    @property
+    def parallax(self):
+        return self._parallax
+
+    @property
+    def spectral_type(self):
+        return self._spectral_type
+
+    @property
+    def vectors(self):
+        """ Unit vectors of the stars in J2000 """
+        if self._vectors is None:
+            self._vectors = radrec_array(self._ra, self._dec)
+        return self._vectors
+
+    @property
+    def distance(self):
+        """ Distances of the stars in km """
+        if self._distance is None:
+            with np.errstate(divide="ignore"):
+                distance = 1.0 / np.tan(self._parallax * spice.rpd())
+            self._distance = distance * spice.convrt(1.0, "AU", "km")
+        return self._distance
+
+    @property
+    def index(self):
+        """ Sky index of the stars """
+        if self._index is None:
+            self._index = SkyIndex(
+                self._ra, self._dec, self._visual_magnitude, self.vectors
+            )
+        return self._index
+
+    def cone_search(self, center_vec, radius, mag_limit=None):
+        """
+        Search stars in a cone
+
+        Parameters
+        ----------
+        center_vec : numpy.ndarray
+            direction of the cone axis in J2000
+        radius : float
+            half angle of the cone in radians
+        mag_limit : float
+            stars brighter than this magnitude are returned
+
+        Returns
+        -------
+        indices : numpy.ndarray
+            sorted row indices of the stars in the cone
+        """
+        return self.index.cone_search(center_vec, radius, mag_limit)
+
+
+_catalog = None
+_catalog_kernels = None
+
+
+def _catalog_cache_key(kernels):
+    digest = hashlib.sha1(StarCatalog.QUERY.encode())
+    for kernel in kernels:
+        stat = os.stat(kernel)
+        digest.update(os.path.abspath(kernel).encode())
+        digest.update(f":{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def _load_cached_catalog(kernels, cache_dir):
+    path = Path(cache_dir) / "stars" / _catalog_cache_key(kernels)
+    if path.exists():
+        return StarCatalog.load(path)
+
+    catalog = StarCatalog.from_ek()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=path.parent)
+    catalog.save(tmp)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # another process has stored the same catalog
+        shutil.rmtree(tmp, ignore_errors=True)
+    return StarCatalog.load(path)
+
+
+def get_star_catalog(cache_dir=None, use_cache=True):
+    """
+    Obtain the star catalog of the loaded EK files
+
+    The catalog is extracted once and reused until the set of loaded EK
+    files changes. When use_cache is True, the extracted columns are also
+    stored under cache_dir keyed by the path, size and modification time
+    of the EK files, and memory-mapped by subsequent processes.
+
+    Parameters
+    ----------
+    cache_dir : str
+        cache directory (default: spiceflow.util.get_cache_dir())
+    use_cache : bool
+        whether to use the on-disk cache
+
+    Returns
+    -------
+    catalog : StarCatalog
+        star catalog
+    """
+    global _catalog, _catalog_kernels
+    kernels = loaded_kernels("EK")
+    if _catalog is None or kernels != _catalog_kernels:
+        if use_cache and kernels:
+            if cache_dir is None:
+                cache_dir = get_cache_dir()
+            _catalog = _load_cached_catalog(kernels, cache_dir)
+        else:
+            _catalog = StarCatalog.from_ek()
+        _catalog_kernels = kernels
+    return _catalog
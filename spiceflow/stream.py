@@ -0,0 +1,251 @@
+import abc
+import queue
+import threading
+import numpy as np
+from pathlib import Path
+from PIL import Image
+from .render import get_session_class
+
+
+__all__ = [
+    "PngSequenceWriter",
+    "NpyCubeWriter",
+    "VideoWriter",
+    "render_sequence",
+]
+
+
+class _FrameWriter(abc.ABC):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @abc.abstractmethod
+    def write(self, index, image):
+        pass
+
+    def close(self):
+        pass
+
+
+class PngSequenceWriter(_FrameWriter):
+    """
+    Write frames as numbered PNG files
+
+    Parameters
+    ----------
+    dirname : str
+        output directory
+    pattern : str
+        format of the filenames with the frame index
+    """
+
+    def __init__(self, dirname, pattern="frame_{:06d}.png"):
+        self._path = Path(dirname)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._pattern = pattern
+
+    def write(self, index, image):
+        filename = self._path / self._pattern.format(index)
+        Image.fromarray(image.astype(np.uint8, copy=False)).save(filename)
+
+
+class NpyCubeWriter(_FrameWriter):
+    """
+    Write frames into a memory-mapped .npy cube
+
+    The cube has the shape (nframes, height, width, 4) and dtype uint8.
+
+    Parameters
+    ----------
+    filename : str
+        output .npy file
+    nframes : int
+        number of frames
+    width : int
+        frame width
+    height : int
+        frame height
+    """
+
+    def __init__(self, filename, nframes, width, height):
+        self._cube = np.lib.format.open_memmap(
+            filename,
+            mode="w+",
+            dtype=np.uint8,
+            shape=(nframes, height, width, 4),
+        )
+
+    def write(self, index, image):
+        self._cube[index] = image
+
+    def close(self):
+        if self._cube is not None:
+            self._cube.flush()
+            self._cube = None
+
+
+class VideoWriter(_FrameWriter):
+    """
+    Write frames into a video file through imageio
+
+    imageio (and a plugin for the container, e.g. imageio-ffmpeg) is an
+    optional dependency required only by this writer.
+
+    Parameters
+    ----------
+    filename : str
+        output video file
+    fps : float
+        frame rate
+    **kwargs : dict
+        additional arguments for imageio.get_writer
+    """
+
+    def __init__(self, filename, fps=30, **kwargs):
+        try:
+            import imageio
+        except ImportError as e:
+            raise ImportError("VideoWriter requires imageio") from e
+        self._writer = imageio.get_writer(filename, fps=fps, **kwargs)
+
+    def write(self, index, image):
+        self._writer.append_data(image[..., 0:3].astype(np.uint8, copy=False))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+_END = object()
+
+
+def _produce(obsinfos, obs_table, out_queue, stop):
+    try:
+        for obsinfo in obsinfos:
+            if stop.is_set():
+                return
+            if obs_table is not None:
+                obsinfo.set_obs_table(obs_table)
+            out_queue.put(obsinfo)
+    except BaseException as e:
+        out_queue.put(e)
+    out_queue.put(_END)
+
+
+def _consume(writer, in_queue, errors):
+    while True:
+        item = in_queue.get()
+        if item is _END:
+            return
+        if errors:
+            # drain the queue so that the renderer is not blocked
+            continue
+        try:
+            writer.write(*item)
+        except BaseException as e:
+            errors.append(e)
+
+
+def render_sequence(
+    obsinfos,
+    writer,
+    obs_table=None,
+    bg_color=(0.0, 0.0, 0.0),
+    wireframe=False,
+    queue_size=4,
+    backend="pyrender",
+):
+    """
+    Render a sequence of observations and write the frames incrementally
+
+    Simulation, rendering and writing run in separate threads connected by
+    bounded queues, so that they overlap and the memory use does not
+    depend on the sequence length. SPICE is called only from the
+    simulation thread, which iterates obsinfos; pass a lazy iterable such
+    as simulate_series to simulate while rendering.
+
+    Parameters
+    ----------
+    obsinfos : iterable
+        ObsInfo of each frame, e.g. simulate_series(...)
+    writer : PngSequenceWriter, NpyCubeWriter or VideoWriter
+        frame writer
+    obs_table : dict
+        models of the solar objects passed to ObsInfo.set_obs_table
+    bg_color : tuple
+        background color
+    wireframe : bool
+        whether to render texture bodies as wireframes
+    queue_size : int
+        maximum number of frames in flight between the stages
+    backend : str
+        rendering backend, "pyrender" or "raycast"
+
+    Returns
+    -------
+    nframes : int
+        number of frames written
+    """
+    sim_queue = queue.Queue(maxsize=queue_size)
+    write_queue = queue.Queue(maxsize=queue_size)
+    errors = []
+    stop = threading.Event()
+
+    producer = threading.Thread(
+        target=_produce,
+        args=(obsinfos, obs_table, sim_queue, stop),
+        daemon=True,
+    )
+    consumer = threading.Thread(
+        target=_consume, args=(writer, write_queue, errors), daemon=True
+    )
+    producer.start()
+    consumer.start()
+
+    nframes = 0
+    session = None
+    buffers = None
+    try:
+        while True:
+            item = sim_queue.get()
+            if item is _END:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            if errors:
+                raise errors[0]
+            if session is None:
+                session = get_session_class(backend)(
+                    item.width, item.height, bg_color, wireframe
+                )
+            # frames in flight: queued, being written and being rendered
+            if buffers is None or buffers[0].shape[0:2] != (
+                item.height,
+                item.width,
+            ):
+                buffers = [
+                    np.empty((item.height, item.width, 4), dtype=np.uint8)
+                    for _ in range(queue_size + 2)
+                ]
+            image = session.render(item, buffers[nframes % len(buffers)])
+            write_queue.put((nframes, image))
+            nframes += 1
+    finally:
+        if session is not None:
+            session.close()
+        write_queue.put(_END)
+        consumer.join()
+        # unblock the simulation thread if rendering has been aborted
+        stop.set()
+        while producer.is_alive():
+            try:
+                sim_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    if errors:
+        raise errors[0]
+    return nframes
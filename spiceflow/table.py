@@ -0,0 +1,213 @@
+from collections.abc import MutableMapping
+import numpy as np
+
+
+__all__ = ["Table", "StarTable", "SolarObjectTable"]
+
+
+# value of extra columns on the rows where the key is not set
+_MISSING = object()
+
+
+def _object_column(values):
+    column = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        column[i] = value
+    return column
+
+
+class Row(MutableMapping):
+    """
+    Dict-like view of a row of a Table
+
+    Reading and writing a key reads and writes the corresponding column of
+    the table. Keys which are not columns of the table, such as "model" of
+    solar objects, are stored in extra object columns.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._table._get(self._index, key)
+
+    def __setitem__(self, key, value):
+        self._table._set(self._index, key, value)
+
+    def __delitem__(self, key):
+        self._table._delete(self._index, key)
+
+    def __iter__(self):
+        for key, column in self._table._columns.items():
+            if column.dtype != object or column[self._index] is not _MISSING:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _key in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Table:
+    """
+    Table of objects backed by NumPy columns
+
+    The table supports len(), iteration over dict-like rows, row access by
+    an integer index and column access by a name. Subclasses define
+    COLUMNS, the tuple of (name, dtype, shape) of the columns, and
+    NULLABLE, the names of float columns whose NaN values are read as None
+    from the rows.
+    """
+
+    COLUMNS = ()
+    NULLABLE = ()
+
+    def __init__(self, **columns):
+        self._columns = {}
+        length = None
+        for name, dtype, shape in self.COLUMNS:
+            column = np.ascontiguousarray(columns.pop(name), dtype=dtype)
+            if length is None:
+                length = len(column)
+            self._columns[name] = column.reshape((length,) + shape)
+        for name, values in columns.items():
+            self._columns[name] = _object_column(values)
+        self._length = 0 if length is None else length
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a table from a list of dicts
+
+        Parameters
+        ----------
+        rows : list
+            dicts with the keys of COLUMNS and optionally other keys
+
+        Returns
+        -------
+        table : Table
+            table of the rows
+        """
+        columns = {}
+        for name, dtype, shape in cls.COLUMNS:
+            values = [row[name] for row in rows]
+            if name in cls.NULLABLE:
+                values = [np.nan if v is None else v for v in values]
+            columns[name] = np.array(values, dtype=dtype).reshape(
+                (len(rows),) + shape
+            )
+        names = {name for name, _dtype, _shape in cls.COLUMNS}
+        extra = set()
+        for row in rows:
+            extra.update(row.keys() - names)
+        for key in extra:
+            columns[key] = [row.get(key, _MISSING) for row in rows]
+        return cls(**columns)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield Row(self, index)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._columns[key]
+        if key < 0:
+            key += self._length
+        if key < 0 or key >= self._length:
+            raise IndexError("row index out of range")
+        return Row(self, key)
+
+    def __getstate__(self):
+        # the sentinel of missing values is not preserved by pickling
+        state = self.__dict__.copy()
+        state["_columns"] = {
+            key: self._pickle_column(column)
+            for key, column in self._columns.items()
+        }
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for key, (column, missing) in self._columns.items():
+            if missing is not None:
+                column[missing] = _MISSING
+            self._columns[key] = column
+
+    @staticmethod
+    def _pickle_column(column):
+        if column.dtype != object:
+            return column, None
+        missing = np.array([value is _MISSING for value in column], dtype=bool)
+        column = column.copy()
+        column[missing] = None
+        return column, missing
+
+    @property
+    def columns(self):
+        """ Names of the columns """
+        return list(self._columns)
+
+    def _get(self, index, key):
+        value = self._columns[key][index]
+        if value is _MISSING:
+            raise KeyError(key)
+        if key in self.NULLABLE and np.isnan(value):
+            return None
+        return value
+
+    def _set(self, index, key, value):
+        if key not in self._columns:
+            column = np.empty(self._length, dtype=object)
+            column[:] = _MISSING
+            self._columns[key] = column
+        column = self._columns[key]
+        if key in self.NULLABLE and value is None:
+            value = np.nan
+        column[index] = value
+
+    def _delete(self, index, key):
+        column = self._columns[key]
+        if column.dtype != object or column[index] is _MISSING:
+            raise KeyError(key)
+        column[index] = _MISSING
+
+
+class StarTable(Table):
+    """ Stars found in the FOV """
+
+    COLUMNS = (
+        ("hip_id", np.int64, ()),
+        ("position", np.float64, (3,)),
+        ("ra", np.float64, ()),
+        ("dec", np.float64, ()),
+        ("spectral_type", str, ()),
+        ("visual_magnitude", np.float64, ()),
+        ("distance", np.float64, ()),
+        ("image_pos", np.float64, (2,)),
+        ("color", np.int32, (3,)),
+    )
+
+
+class SolarObjectTable(Table):
+    """ Solar objects found in the FOV """
+
+    COLUMNS = (
+        ("naif_id", np.int64, ()),
+        ("name", str, ()),
+        ("type", str, ()),
+        ("position", np.float64, (3,)),
+        ("magnitude", np.float64, ()),
+        ("distance", np.float64, ()),
+        ("radius", np.float64, (3,)),
+        ("rotation", np.float64, (3, 3)),
+        ("image_pos", np.float64, (2,)),
+    )
+    NULLABLE = ("magnitude",)
@@ -0,0 +1,198 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import pyrender
+import spiceypy as spice
+from PIL import Image
+
+
+INST = "TESTCAM"
+OBSRVR = "TESTSC"
+
+TEXT_KERNEL = """KPL/IK
+\\begindata
+NAIF_BODY_NAME += ( 'TESTSC', 'TESTCAM', 'TESTROCK' )
+NAIF_BODY_CODE += ( -1000, -1000001, 2000001 )
+INS-1000001_FOV_SHAPE = 'RECTANGLE'
+INS-1000001_FOV_FRAME = 'J2000'
+INS-1000001_FOV_CLASS_SPEC = 'CORNERS'
+INS-1000001_BORESIGHT = ( 0 0 1 )
+INS-1000001_FOV_BOUNDARY_CORNERS = (
+    -0.04 -0.03 1  0.04 -0.03 1  0.04 0.03 1  -0.04 0.03 1 )
+DELTET/DELTA_T_A = 32.184
+DELTET/K = 1.657D-3
+DELTET/EB = 1.671D-2
+DELTET/M = ( 6.239996D0 1.99096871D-7 )
+DELTET/DELTA_AT = ( 10, @1972-JAN-1 37, @2017-JAN-1 )
+BODY301_RADII = ( 1737.4 1737.4 1737.4 )
+BODY301_POLE_RA = ( 0 0 0 )
+BODY301_POLE_DEC = ( 90 0 0 )
+BODY301_PM = ( 30 13.17 0 )
+BODY399_RADII = ( 6378.1 6378.1 6356.8 )
+BODY399_POLE_RA = ( 0 0 0 )
+BODY399_POLE_DEC = ( 90 0 0 )
+BODY399_PM = ( 0 360.98 0 )
+BODY10_RADII = ( 696000 696000 696000 )
+BODY10_POLE_RA = ( 286.13 0 0 )
+BODY10_POLE_DEC = ( 63.87 0 0 )
+BODY10_PM = ( 84.176 14.18 0 )
+BODY2000001_RADII = ( 0.5 0.5 0.5 )
+FRAME_2000001_NAME = 'IAU_MOON'
+\\begintext
+"""
+
+# body, position relative to the solar system barycenter, velocity
+BODIES = [
+    (10, (1.5e8, 0.0, 0.0), (0.0, 0.0, 0.0)),
+    (-1000, (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)),
+    (301, (-2.0e3, 0.0, 1.0e5), (2.0, 0.0, 0.0)),
+    (399, (1.0e5, 1.0e5, -1.0e5), (0.0, 0.0, 0.0)),
+    (2000001, (300.0, 200.0, 1.05e5), (0.0, 0.0, 0.0)),
+]
+
+SPECTRAL_TYPES = ["G2V", "K0", "(A0)", "M1", "B5", "DA"]
+
+
+def write_scene(dirname, nstars=500):
+    """
+    Write the kernels of a synthetic observation scene
+
+    The camera TESTCAM of the spacecraft TESTSC looks along +Z of J2000 at
+    the Moon, which moves by 2 km/s, and at TESTROCK, which is smaller than
+    a pixel. Some stars of the HIPPARCOS table are around the north pole.
+
+    Parameters
+    ----------
+    dirname : str
+        directory of the kernels
+    nstars : int
+        number of stars
+
+    Returns
+    -------
+    meta_kernel : str
+        meta-kernel loading the kernels
+    obs_table : dict
+        observation table with a texture of the Moon and TESTROCK
+    """
+    spk = os.path.join(dirname, "scene.bsp")
+    handle = spice.spkopn(spk, "scene", 0)
+    epochs = np.array([-1.0e6, 1.0e6])
+    for body, position, velocity in BODIES:
+        states = np.array(
+            [
+                list(np.add(position, np.multiply(velocity, t)))
+                + list(velocity)
+                for t in epochs
+            ]
+        )
+        spice.spkw09(
+            handle,
+            body,
+            0,
+            "J2000",
+            -1.0e6,
+            1.0e6,
+            "scene",
+            1,
+            2,
+            states,
+            epochs,
+        )
+    spice.spkcls(handle)
+
+    ek = os.path.join(dirname, "scene.bes")
+    handle = spice.ekopn(ek, "scene", 0)
+    columns = [
+        "CATALOG_NUMBER",
+        "RA",
+        "DEC",
+        "VISUAL_MAGNITUDE",
+        "PARLAX",
+        "SPECTRAL_TYPE",
+    ]
+    declarations = [
+        "DATATYPE = INTEGER",
+        "DATATYPE = DOUBLE PRECISION",
+        "DATATYPE = DOUBLE PRECISION",
+        "DATATYPE = DOUBLE PRECISION",
+        "DATATYPE = DOUBLE PRECISION",
+        "DATATYPE = CHARACTER*(12)",
+    ]
+    segment = spice.ekbseg(handle, "HIPPARCOS", columns, declarations)
+    rng = np.random.RandomState(3)
+    for i in range(nstars):
+        record = spice.ekappr(handle, segment)
+        ra = rng.uniform(0.0, 360.0)
+        if i < nstars // 10:
+            dec = rng.uniform(86.0, 90.0)
+        else:
+            dec = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0)))
+        values = [
+            ("CATALOG_NUMBER", spice.ekacei, i + 1),
+            ("RA", spice.ekaced, ra),
+            ("DEC", spice.ekaced, dec),
+            ("VISUAL_MAGNITUDE", spice.ekaced, rng.uniform(-1.0, 10.0)),
+            ("PARLAX", spice.ekaced, rng.uniform(1.0e-6, 1.0e-4)),
+            ("SPECTRAL_TYPE", spice.ekacec, rng.choice(SPECTRAL_TYPES)),
+        ]
+        for column, add, value in values:
+            add(handle, segment, record, column, 1, [value], False)
+    spice.ekcls(handle)
+
+    text_kernel = os.path.join(dirname, "scene.tk")
+    with open(text_kernel, "w") as f:
+        f.write(TEXT_KERNEL)
+
+    texture = os.path.join(dirname, "moon.png")
+    image = np.full((32, 64, 3), 128, dtype=np.uint8)
+    image[..., 0] = np.linspace(0, 255, 64, dtype=np.uint8)[None, :]
+    image[..., 1] = np.linspace(0, 255, 32, dtype=np.uint8)[:, None]
+    Image.fromarray(image).save(texture)
+
+    meta_kernel = os.path.join(dirname, "scene.tm")
+    with open(meta_kernel, "w") as f:
+        f.write("KPL/MK\n\\begindata\nKERNELS_TO_LOAD = (\n")
+        for kernel in (spk, ek, text_kernel):
+            f.write(f"  '{kernel}'\n")
+        f.write(")\n\\begintext\n")
+
+    model = {"type": "texture-body", "file": texture}
+    obs_table = {"MOON": model, "TESTROCK": model}
+    return meta_kernel, obs_table
+
+
+def require_offscreen_context():
+    """ Skip the tests unless an offscreen OpenGL context can be created """
+    # e.g. PYOPENGL_PLATFORM=egl is required on a headless machine
+    try:
+        pyrender.OffscreenRenderer(1, 1).delete()
+    except Exception as e:
+        raise unittest.SkipTest(f"no offscreen context: {e}")
+
+
+class SceneTestCase(unittest.TestCase):
+    """
+    Test case writing the synthetic scene into a temporary directory
+
+    The star catalog cache of SPICEFLOW_CACHE_DIR is also redirected to
+    the directory, including in worker processes, which inherit the
+    environment. The attributes tmpdir, meta_kernel and obs_table are set
+    for the class.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls._environ = mock.patch.dict(
+            os.environ, {"SPICEFLOW_CACHE_DIR": cls.tmpdir.name}
+        )
+        cls._environ.start()
+        cls.meta_kernel, cls.obs_table = write_scene(cls.tmpdir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._environ.stop()
+        cls.tmpdir.cleanup()
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.body_registry import (
+    build_body_registry,
+    get_bodies,
+    get_body_frame,
+)
+
+
+def _write_spk(filename, segments):
+    handle = spice.spkopn(filename, "test", 0)
+    epochs = np.linspace(0.0, 100.0, 4)
+    states = np.zeros((4, 6))
+    states[:, 0] = 1.0e5
+    for target, center in segments:
+        spice.spkw09(
+            handle,
+            target,
+            center,
+            "J2000",
+            0.0,
+            100.0,
+            "test",
+            3,
+            4,
+            states,
+            epochs,
+        )
+    spice.spkcls(handle)
+
+
+def _define_frame(name, code, center):
+    spice.pipool(f"FRAME_{name}", [code])
+    spice.pcpool(f"FRAME_{code}_NAME", [name])
+    spice.pipool(f"FRAME_{code}_CLASS", [4])
+    spice.pipool(f"FRAME_{code}_CLASS_ID", [code])
+    spice.pipool(f"FRAME_{code}_CENTER", [center])
+    spice.pcpool(f"TKFRAME_{code}_RELATIVE", ["J2000"])
+    spice.pcpool(f"TKFRAME_{code}_SPEC", ["MATRIX"])
+    spice.pdpool(f"TKFRAME_{code}_MATRIX", np.eye(3).ravel())
+
+
+class TestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.spk1 = os.path.join(cls.tmpdir.name, "earth_moon.bsp")
+        cls.spk2 = os.path.join(cls.tmpdir.name, "rocks.bsp")
+        # the Moon has segments in both files and twice in the first one
+        _write_spk(cls.spk1, [(301, 3), (3, 0), (301, 3)])
+        _write_spk(cls.spk2, [(301, 3), (2162173, 10), (2162174, 10)])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        spice.boddef("MYROCK", 2162173)
+        spice.boddef("OTHERROCK", 2162174)
+        spice.pdpool("BODY2162173_RADII", [1.0, 1.0, 0.5])
+        _define_frame("MYROCK_FIXED", 1400001, 2162173)
+        spice.pcpool("FRAME_2162173_NAME", ["MYROCK_FIXED"])
+        # the frame named by the kernel pool is not defined
+        spice.pcpool("FRAME_2162174_NAME", ["OTHERROCK_FIXED"])
+
+    def tearDown(self):
+        spice.kclear()
+
+    def test_deduplication(self):
+        spice.furnsh(self.spk1)
+        spice.furnsh(self.spk2)
+        bodies = build_body_registry()
+        self.assertEqual(
+            [body["naif_id"] for body in bodies], [3, 301, 2162173, 2162174]
+        )
+        moon = bodies[1]
+        self.assertEqual(moon["name"], "MOON")
+        self.assertEqual(moon["type"], "SATELLITE")
+        self.assertEqual(moon["frame"], "IAU_MOON")
+
+    def test_frame_fallback(self):
+        self.assertEqual(get_body_frame("MOON", 301), "IAU_MOON")
+        self.assertEqual(get_body_frame("MYROCK", 2162173), "MYROCK_FIXED")
+        self.assertIsNone(get_body_frame("OTHERROCK", 2162174))
+        self.assertIsNone(get_body_frame("NOROCK", 2162175))
+
+        spice.furnsh(self.spk2)
+        bodies = {body["naif_id"]: body for body in build_body_registry()}
+        self.assertEqual(bodies[2162173]["frame"], "MYROCK_FIXED")
+        np.testing.assert_array_equal(
+            bodies[2162173]["radii"], [1.0, 1.0, 0.5]
+        )
+        self.assertIsNone(bodies[2162174]["frame"])
+        self.assertIsNone(bodies[2162174]["radii"])
+
+    def test_cache_invalidation(self):
+        spice.furnsh(self.spk1)
+        bodies = get_bodies()
+        self.assertIs(get_bodies(), bodies)
+        self.assertEqual([body["naif_id"] for body in bodies], [3, 301])
+
+        spice.furnsh(self.spk2)
+        bodies = get_bodies()
+        self.assertEqual(
+            [body["naif_id"] for body in bodies], [3, 301, 2162173, 2162174]
+        )
+
+        spice.unload(self.spk1)
+        bodies = get_bodies()
+        self.assertEqual(
+            [body["naif_id"] for body in bodies], [301, 2162173, 2162174]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.ephemeris_cache import EphemerisCache
+
+
+class TestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.spk = os.path.join(cls.tmpdir.name, "orbit.bsp")
+        epochs = np.linspace(0.0, 20000.0, 2001)
+        omega = 2.0 * np.pi / 10000.0
+        radius = 1.0e5
+        states = np.array(
+            [
+                [
+                    radius * np.cos(omega * t),
+                    radius * np.sin(omega * t),
+                    0.0,
+                    -radius * omega * np.sin(omega * t),
+                    radius * omega * np.cos(omega * t),
+                    0.0,
+                ]
+                for t in epochs
+            ]
+        )
+        handle = spice.spkopn(cls.spk, "test", 0)
+        spice.spkw09(
+            handle,
+            301,
+            399,
+            "J2000",
+            0.0,
+            20000.0,
+            "orbit",
+            7,
+            len(epochs),
+            states,
+            epochs,
+        )
+        spice.spkcls(handle)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        spice.furnsh(self.spk)
+        spice.pdpool("BODY399_POLE_RA", [0.0, 0.0, 0.0])
+        spice.pdpool("BODY399_POLE_DEC", [90.0, 0.0, 0.0])
+        spice.pdpool("BODY399_PM", [10.0, 360.9856, 0.0])
+
+    def tearDown(self):
+        spice.kclear()
+
+    def test_spkpos(self):
+        cache = EphemerisCache(1000.0, 19000.0, 60.0, pos_tol=1.0e-3)
+        for et in np.linspace(1000.0, 19000.0, 37) + 7.3:
+            pos, lt = cache.spkpos("MOON", et, "J2000", "NONE", "EARTH")
+            expected, expected_lt = spice.spkpos(
+                "MOON", et, "J2000", "NONE", "EARTH"
+            )
+            self.assertLess(np.linalg.norm(pos - expected), 1.0e-3)
+            self.assertAlmostEqual(lt, expected_lt, places=9)
+
+    def test_spkpos_outside_window(self):
+        cache = EphemerisCache(1000.0, 2000.0, 60.0)
+        pos, _lt = cache.spkpos("MOON", 5000.0, "J2000", "NONE", "EARTH")
+        expected, _lt = spice.spkpos("MOON", 5000.0, "J2000", "NONE", "EARTH")
+        np.testing.assert_array_equal(pos, expected)
+
+    def test_pxform(self):
+        cache = EphemerisCache(1000.0, 19000.0, 600.0, rot_tol=1.0e-8)
+        for et in np.linspace(1000.0, 19000.0, 19) + 13.1:
+            mtx = cache.pxform("J2000", "IAU_EARTH", et)
+            expected = spice.pxform("J2000", "IAU_EARTH", et)
+            np.testing.assert_allclose(mtx, expected, atol=1.0e-8)
+
+    def test_lazy_sampling(self):
+        cache = EphemerisCache(0.0, 20000.0, 60.0)
+        ets = np.linspace(5000.0, 5600.0, 100)
+        with mock.patch.object(
+            spice, "spkezr", wraps=spice.spkezr
+        ) as spkezr, mock.patch.object(
+            spice, "spkpos", wraps=spice.spkpos
+        ) as spkpos:
+            for et in ets:
+                cache.spkpos("MOON", et, "J2000", "NONE", "EARTH")
+        # only the 12 grid points around the epochs are sampled and the 11
+        # intervals validated, instead of a SPICE call for each epoch
+        self.assertEqual(spkezr.call_count, 12)
+        self.assertEqual(spkpos.call_count, 11)
+        self.assertLess(spkezr.call_count + spkpos.call_count, len(ets))
+
+    def test_partial_coverage(self):
+        # the grid intervals before the coverage of the SPK fail in SPICE
+        cache = EphemerisCache(-3000.0, 3000.0, 60.0)
+        with self.assertRaises(spice.utils.support_types.SpiceyError):
+            cache.spkpos("MOON", -100.0, "J2000", "NONE", "EARTH")
+        ets = [70.0, 80.0, 90.0, 100.0]
+        expected = [
+            spice.spkpos("MOON", et, "J2000", "NONE", "EARTH")[0]
+            for et in ets
+        ]
+        with mock.patch.object(spice, "spkpos", wraps=spice.spkpos) as spkpos:
+            for et, expected_pos in zip(ets, expected):
+                pos, _lt = cache.spkpos("MOON", et, "J2000", "NONE", "EARTH")
+                self.assertLess(np.linalg.norm(pos - expected_pos), 1.0e-3)
+        # only the midpoint of the interval is computed directly
+        self.assertEqual(spkpos.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.events import _merge_intervals, find_fov_events
+
+
+INST_ID = -1005
+# half width of the square FOV as the tangent of the angle
+FOV_TAN = 0.1
+DISTANCE = 1.0e5
+SPEED = 1.0e5
+CROSSING = 550.0
+
+
+class TestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # the Moon crosses the FOV in 0.2 seconds along the x axis, and is
+        # at the same separation from the boresight at the samples before
+        # and after the crossing
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.spk = os.path.join(cls.tmpdir.name, "crossing.bsp")
+        epochs = np.array([0.0, 1000.0])
+        states = np.array(
+            [
+                [SPEED * (t - CROSSING), 0.0, DISTANCE, SPEED, 0.0, 0.0]
+                for t in epochs
+            ]
+        )
+        handle = spice.spkopn(cls.spk, "test", 0)
+        spice.spkw09(
+            handle,
+            301,
+            399,
+            "J2000",
+            0.0,
+            1000.0,
+            "crossing",
+            1,
+            len(epochs),
+            states,
+            epochs,
+        )
+        spice.spkcls(handle)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        spice.furnsh(self.spk)
+        spice.boddef("TEST_INST", INST_ID)
+        bounds = [
+            [-FOV_TAN, -FOV_TAN, 1.0],
+            [FOV_TAN, -FOV_TAN, 1.0],
+            [FOV_TAN, FOV_TAN, 1.0],
+            [-FOV_TAN, FOV_TAN, 1.0],
+        ]
+        spice.pcpool(f"INS{INST_ID}_FOV_SHAPE", ["RECTANGLE"])
+        spice.pcpool(f"INS{INST_ID}_FOV_FRAME", ["J2000"])
+        spice.pcpool(f"INS{INST_ID}_FOV_CLASS_SPEC", ["CORNERS"])
+        spice.pdpool(f"INS{INST_ID}_BORESIGHT", [0.0, 0.0, 1.0])
+        spice.pdpool(f"INS{INST_ID}_FOV_BOUNDARY_CORNERS", np.ravel(bounds))
+
+    def tearDown(self):
+        spice.kclear()
+
+    def test_merge_intervals(self):
+        self.assertEqual(_merge_intervals([]), [])
+        self.assertEqual(
+            _merge_intervals([(5.0, 6.0), (0.0, 2.0), (1.0, 3.0)]),
+            [(0.0, 3.0), (5.0, 6.0)],
+        )
+        # touching and nested intervals are merged
+        self.assertEqual(
+            _merge_intervals([(0.0, 1.0), (1.0, 2.0), (0.5, 0.7)]),
+            [(0.0, 2.0)],
+        )
+
+    def test_fast_target(self):
+        start, stop, refine_step = 400.0, 700.0, 0.05
+        events = find_fov_events(
+            "TEST_INST",
+            "MOON",
+            start,
+            stop,
+            100.0,
+            "NONE",
+            "EARTH",
+            refine_step=refine_step,
+        )
+
+        cnfine = spice.cell_double(2)
+        spice.wninsd(start, stop, cnfine)
+        result = spice.gftfov(
+            "TEST_INST",
+            "MOON",
+            "POINT",
+            " ",
+            "NONE",
+            "EARTH",
+            refine_step,
+            cnfine,
+        )
+        expected = [
+            spice.wnfetd(result, i) for i in range(spice.wncard(result))
+        ]
+        self.assertEqual(len(expected), 1)
+        self.assertEqual(len(events["MOON"]), 1)
+        np.testing.assert_allclose(events["MOON"], expected, atol=1.0e-5)
+        half = DISTANCE * FOV_TAN / SPEED
+        np.testing.assert_allclose(
+            expected[0], [CROSSING - half, CROSSING + half], atol=1.0e-5
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
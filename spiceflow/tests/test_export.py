@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from spiceflow.export import (
+    SOLAR_OBJECT_DTYPE,
+    STAR_DTYPE,
+    export_npz,
+    load_npz,
+    solar_objects_to_array,
+    stars_to_array,
+)
+
+
+def _obsinfo(et, nstars):
+    stars = [
+        {
+            "hip_id": 100 + i,
+            "image_pos": np.array([i + 0.5, 2.0 * i]),
+            "ra": 0.1 * i,
+            "dec": -0.1 * i,
+            "visual_magnitude": 3.0 + i,
+            "distance": 1.0e14 * (i + 1),
+            "position": np.array([0.0, 0.0, 1.0]),
+        }
+        for i in range(nstars)
+    ]
+    solar_objects = [
+        {
+            "naif_id": 301,
+            "name": "MOON",
+            "image_pos": np.array([160.0, 120.0]),
+            "magnitude": None,
+            "distance": 1.0e5,
+            "position": np.array([0.0, 0.0, 1.0e5]),
+            "radius": np.array([1737.4, 1737.4, 1737.4]),
+            "rotation": np.identity(3),
+        }
+    ]
+    return SimpleNamespace(et=et, stars=stars, solar_objects=solar_objects)
+
+
+class TestCase(unittest.TestCase):
+    def test_export_npz(self):
+        obsinfos = [_obsinfo(10.0, 3), _obsinfo(20.0, 0), _obsinfo(30.0, 2)]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "frames.npz")
+            self.assertEqual(export_npz(obsinfos, filename), 3)
+            stars, solar_objects = load_npz(filename)
+
+        assert_array_equal(stars["frame"], [0, 0, 0, 2, 2])
+        assert_array_equal(stars["et"], [10.0, 10.0, 10.0, 30.0, 30.0])
+        assert_array_equal(stars["hip_id"], [100, 101, 102, 100, 101])
+        assert_array_equal(stars["image_pos"][1], [1.5, 2.0])
+
+        assert_array_equal(solar_objects["frame"], [0, 1, 2])
+        assert_array_equal(solar_objects["name"], ["MOON"] * 3)
+        self.assertTrue(np.all(np.isnan(solar_objects["magnitude"])))
+        assert_array_equal(solar_objects["rotation"][0], np.identity(3))
+
+    def test_export_npz_stream(self):
+        def obsinfos():
+            for frame in range(50):
+                yield _obsinfo(10.0 * frame, frame % 4)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "frames")
+            self.assertEqual(export_npz(obsinfos(), filename), 50)
+            stars, solar_objects = load_npz(filename + ".npz")
+
+        # same arrays as those concatenated in memory
+        expected_stars = np.concatenate(
+            [stars_to_array(o, i) for i, o in enumerate(obsinfos())]
+        )
+        expected_solar_objects = np.concatenate(
+            [solar_objects_to_array(o, i) for i, o in enumerate(obsinfos())]
+        )
+        self.assertEqual(stars.dtype, STAR_DTYPE)
+        self.assertEqual(solar_objects.dtype, SOLAR_OBJECT_DTYPE)
+        # NaN magnitudes are compared by their bytes
+        self.assertEqual(stars.tobytes(), expected_stars.tobytes())
+        self.assertEqual(
+            solar_objects.tobytes(), expected_solar_objects.tobytes()
+        )
+
+    def test_export_npz_empty(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "frames.npz")
+            self.assertEqual(export_npz([], filename), 0)
+            stars, solar_objects = load_npz(filename)
+        self.assertEqual(stars.shape, (0,))
+        self.assertEqual(stars.dtype, STAR_DTYPE)
+        self.assertEqual(solar_objects.dtype, SOLAR_OBJECT_DTYPE)
+
+
+if __name__ == "__main__":
+    unittest.main()
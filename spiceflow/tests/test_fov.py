@@ -0,0 +1,91 @@
+import itertools
+import unittest
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.fov import Fov, get_fov
+
+
+def _define_fov(inst_id, shape, boresight, bounds):
+    spice.pcpool(f"INS{inst_id}_FOV_SHAPE", [shape])
+    spice.pcpool(f"INS{inst_id}_FOV_FRAME", ["J2000"])
+    spice.pcpool(f"INS{inst_id}_FOV_CLASS_SPEC", ["CORNERS"])
+    spice.pdpool(f"INS{inst_id}_BORESIGHT", boresight)
+    spice.pdpool(f"INS{inst_id}_FOV_BOUNDARY_CORNERS", np.ravel(bounds))
+
+
+class TestCase(unittest.TestCase):
+    def tearDown(self):
+        spice.kclear()
+
+    def test_polygon_fovmax(self):
+        bounds = [
+            [-0.01, -0.02, 1.0],
+            [0.015, -0.01, 1.0],
+            [0.02, 0.01, 1.0],
+            [0.0, 0.025, 1.0],
+            [-0.02, 0.005, 1.0],
+        ]
+        _define_fov(-1001, "POLYGON", [0.0, 0.0, 1.0], bounds)
+        fov = Fov(-1001)
+        expected = max(
+            spice.vsep(v1, v2) * 0.5
+            for v1, v2 in itertools.combinations(np.array(bounds), 2)
+        )
+        self.assertAlmostEqual(fov.fovmax, expected, places=12)
+        self.assertAlmostEqual(fov.bounds_rect.left, -0.02)
+        self.assertAlmostEqual(fov.bounds_rect.bottom, 0.025)
+
+    def test_rectangle_cone(self):
+        bounds = [
+            [-0.02, -0.01, 1.0],
+            [0.02, -0.01, 1.0],
+            [0.02, 0.01, 1.0],
+            [-0.02, 0.01, 1.0],
+        ]
+        _define_fov(-1004, "RECTANGLE", [0.0, 0.0, 1.0], bounds)
+        fov = Fov(-1004)
+        self.assertAlmostEqual(
+            fov.enclosing_angle,
+            spice.vsep([0.0, 0.0, 1.0], bounds[0]),
+            places=12,
+        )
+        self.assertAlmostEqual(fov.inscribed_angle, np.arctan(0.01))
+
+    def test_ellipse_bounds_rect(self):
+        a, b, t = 0.02, 0.01, np.radians(30.0)
+        bounds = [
+            [a * np.cos(t), a * np.sin(t), 1.0],
+            [-b * np.sin(t), b * np.cos(t), 1.0],
+        ]
+        _define_fov(-1002, "ELLIPSE", [0.0, 0.0, 1.0], bounds)
+        fov = Fov(-1002)
+        theta = np.linspace(0.0, 2.0 * np.pi, 100001)
+        x = a * np.cos(theta) * np.cos(t) - b * np.sin(theta) * np.sin(t)
+        y = a * np.cos(theta) * np.sin(t) + b * np.sin(theta) * np.cos(t)
+        self.assertAlmostEqual(fov.bounds_rect.right, np.max(x), places=8)
+        self.assertAlmostEqual(fov.bounds_rect.top, np.min(y), places=8)
+        self.assertAlmostEqual(
+            fov.fovmax, spice.vsep([0.0, 0.0, 1.0], bounds[0]), places=12
+        )
+
+    def test_get_fov_invalidation(self):
+        bounds = [
+            [-0.01, -0.01, 1.0],
+            [0.01, -0.01, 1.0],
+            [0.01, 0.01, 1.0],
+            [-0.01, 0.01, 1.0],
+        ]
+        _define_fov(-1003, "RECTANGLE", [0.0, 0.0, 1.0], bounds)
+        fov = get_fov(-1003)
+        self.assertIs(get_fov(-1003), fov)
+
+        bounds = np.multiply(bounds, 2)
+        _define_fov(-1003, "RECTANGLE", [0.0, 0.0, 1.0], bounds)
+        updated = get_fov(-1003)
+        self.assertIsNot(updated, fov)
+        self.assertAlmostEqual(updated.bounds_rect.right, 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
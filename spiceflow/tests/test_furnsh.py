@@ -0,0 +1,187 @@
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import unittest
+from email.utils import formatdate
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from spiceflow.furnsh import _download_kernels, download
+
+
+class _RangeRequestHandler(SimpleHTTPRequestHandler):
+    """ Static file handler supporting single byte ranges """
+
+    ranges = True
+    # whether to send the whole file as a partial content
+    ignore_offset = False
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Range")))
+        header = self.headers.get("Range")
+        if not self.ranges or header is None:
+            return super().do_GET()
+        path = self.translate_path(self.path)
+        validator = self.headers.get("If-Range")
+        if validator != self.date_time_string(os.path.getmtime(path)):
+            return super().do_GET()
+        with open(path, "rb") as f:
+            data = f.read()
+        start = 0 if self.ignore_offset else int(header[len("bytes=") : -1])
+        if start >= len(data):
+            self.send_error(416)
+            return
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header(
+            "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+        )
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmpdir.name, "remote")
+        self.local = os.path.join(self._tmpdir.name, "local")
+        os.makedirs(self.root)
+        self.data = {}
+        for i in range(5):
+            data = os.urandom(10000 + i)
+            name = f"k{i}.bsp"
+            with open(os.path.join(self.root, name), "wb") as f:
+                f.write(data)
+            self.data[name] = data
+
+        _RangeRequestHandler.ranges = True
+        _RangeRequestHandler.ignore_offset = False
+        _RangeRequestHandler.requests = []
+        handler = partial(_RangeRequestHandler, directory=self.root)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_port)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmpdir.cleanup()
+
+    def _read(self, filename):
+        with open(filename, "rb") as f:
+            return f.read()
+
+    def test_download(self):
+        calls = []
+        filename = os.path.join(self._tmpdir.name, "k0.bsp")
+        download(
+            self.url + "k0.bsp",
+            filename,
+            lambda *args: calls.append(args),
+            chunk_size=4096,
+        )
+        self.assertEqual(self._read(filename), self.data["k0.bsp"])
+        self.assertFalse(os.path.exists(filename + ".part"))
+        self.assertEqual([c[2] for c in calls], [0, 4096, 8192, 10000])
+        self.assertEqual(calls[-1][3], 10000)
+
+    def _write_part(self, name, data, validator=None):
+        filename = os.path.join(self._tmpdir.name, name)
+        with open(filename + ".part", "wb") as f:
+            f.write(data)
+        if validator is None:
+            mtime = os.path.getmtime(os.path.join(self.root, name))
+            validator = formatdate(mtime, usegmt=True)
+        with open(filename + ".part.validator", "w") as f:
+            f.write(validator)
+        return filename
+
+    def test_resume(self):
+        filename = self._write_part("k1.bsp", self.data["k1.bsp"][:3000])
+        download(self.url + "k1.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k1.bsp"])
+        self.assertFalse(os.path.exists(filename + ".part.validator"))
+        self.assertEqual(
+            _RangeRequestHandler.requests, [("/k1.bsp", "bytes=3000-")]
+        )
+
+    def test_resume_without_validator(self):
+        filename = os.path.join(self._tmpdir.name, "k1.bsp")
+        with open(filename + ".part", "wb") as f:
+            f.write(b"x" * 3000)
+        download(self.url + "k1.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k1.bsp"])
+        self.assertEqual(_RangeRequestHandler.requests, [("/k1.bsp", None)])
+
+    def test_resume_modified(self):
+        filename = self._write_part(
+            "k1.bsp", b"x" * 3000, "Thu, 01 Jan 1970 00:00:00 GMT"
+        )
+        download(self.url + "k1.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k1.bsp"])
+        self.assertEqual(
+            _RangeRequestHandler.requests, [("/k1.bsp", "bytes=3000-")]
+        )
+
+    def test_resume_wrong_content_range(self):
+        _RangeRequestHandler.ignore_offset = True
+        filename = self._write_part("k1.bsp", b"x" * 3000)
+        download(self.url + "k1.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k1.bsp"])
+        self.assertEqual(
+            _RangeRequestHandler.requests,
+            [("/k1.bsp", "bytes=3000-"), ("/k1.bsp", None)],
+        )
+
+    def test_resume_without_ranges(self):
+        _RangeRequestHandler.ranges = False
+        filename = self._write_part("k2.bsp", b"x" * 3000)
+        download(self.url + "k2.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k2.bsp"])
+
+    def test_resume_invalid_range(self):
+        filename = self._write_part("k3.bsp", b"x" * 20000)
+        download(self.url + "k3.bsp", filename)
+        self.assertEqual(self._read(filename), self.data["k3.bsp"])
+        self.assertEqual(
+            _RangeRequestHandler.requests,
+            [("/k3.bsp", "bytes=20000-"), ("/k3.bsp", None)],
+        )
+
+    def test_download_kernels_verbose(self):
+        kernels = [
+            (self.url + name, os.path.join(self.local, "spk", name))
+            for name in sorted(self.data)
+        ]
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            _download_kernels(kernels[:2], verbose=True)
+            # existing kernels are not downloaded again
+            _download_kernels(kernels[:2], verbose=True)
+        self.assertEqual(
+            sorted(stdout.getvalue().splitlines()),
+            ["{} ==> {}".format(*kernel) for kernel in kernels[:2]],
+        )
+
+    def test_download_kernels(self):
+        kernels = [
+            (self.url + name, os.path.join(self.local, "spk", name))
+            for name in sorted(self.data)
+        ]
+        _download_kernels(kernels + kernels[:1], verbose=False)
+        for name, data in self.data.items():
+            filename = os.path.join(self.local, "spk", name)
+            self.assertEqual(self._read(filename), data)
+        self.assertEqual(len(_RangeRequestHandler.requests), len(self.data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from spiceflow.kernel_cache import KernelCache
+
+
+class _ETagRequestHandler(SimpleHTTPRequestHandler):
+    """ Static file handler answering If-None-Match with ETags """
+
+    statuses = []
+    # status code of the errors sent instead of the files
+    error = None
+    # function called with each request before it is answered
+    hook = None
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.hook is not None:
+            type(self).hook(self)
+        if self.error is not None:
+            self.statuses.append((self.path, self.error))
+            self.send_error(self.error)
+            return
+        path = self.translate_path(self.path)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.send_error(404)
+            return
+        etag = '"{}"'.format(hashlib.md5(data).hexdigest())
+        if self.headers.get("If-None-Match") == etag:
+            self.statuses.append((self.path, 304))
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.statuses.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.remote = os.path.join(self._tmpdir.name, "remote")
+        self.local = os.path.join(self._tmpdir.name, "local")
+        os.makedirs(self.remote)
+        self.cache = KernelCache(os.path.join(self._tmpdir.name, "cache"))
+
+        _ETagRequestHandler.statuses = []
+        _ETagRequestHandler.error = None
+        _ETagRequestHandler.hook = None
+        handler = partial(_ETagRequestHandler, directory=self.remote)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_port)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmpdir.cleanup()
+
+    def _write_remote(self, name, data):
+        with open(os.path.join(self.remote, name), "wb") as f:
+            f.write(data)
+
+    def _read(self, filename):
+        with open(filename, "rb") as f:
+            return f.read()
+
+    def test_revalidation(self):
+        self._write_remote("a.bsp", b"version 1")
+        path = self.cache.fetch(self.url + "a.bsp")
+        self.assertEqual(self._read(path), b"version 1")
+        self.assertEqual(self.cache.fetch(self.url + "a.bsp"), path)
+
+        self._write_remote("a.bsp", b"version 2")
+        path = self.cache.fetch(self.url + "a.bsp")
+        self.assertEqual(self._read(path), b"version 2")
+        self.assertEqual(
+            [code for _path, code in _ETagRequestHandler.statuses],
+            [200, 304, 200],
+        )
+
+    def test_content_addressed(self):
+        self._write_remote("a.bsp", b"same")
+        self._write_remote("b.bsp", b"same")
+        path_a = self.cache.fetch(self.url + "a.bsp")
+        path_b = self.cache.fetch(self.url + "b.bsp")
+        self.assertEqual(path_a, path_b)
+        self.assertEqual(len(os.listdir(self.cache.root / "objects")), 1)
+
+    def test_offline(self):
+        self._write_remote("a.bsp", b"kernel")
+        path = self.cache.fetch(self.url + "a.bsp")
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertEqual(self.cache.fetch(self.url + "a.bsp"), path)
+
+    def test_server_error(self):
+        self._write_remote("a.bsp", b"kernel")
+        path = self.cache.fetch(self.url + "a.bsp")
+        for error in (403, 500):
+            _ETagRequestHandler.error = error
+            self.assertEqual(self.cache.fetch(self.url + "a.bsp"), path)
+        with self.assertRaises(urllib.error.HTTPError):
+            self.cache.fetch(self.url + "b.bsp")
+
+    def test_evicted_during_revalidation(self):
+        self._write_remote("a.bsp", b"kernel")
+        path = self.cache.fetch(self.url + "a.bsp")
+
+        def evict(handler):
+            # another process evicts the kernel before the 304 response
+            if handler.headers.get("If-None-Match") is not None:
+                for name in os.listdir(self.cache.root / "objects"):
+                    os.unlink(self.cache.root / "objects" / name)
+
+        _ETagRequestHandler.hook = evict
+        filename = os.path.join(self.local, "a.bsp")
+        self.cache.materialize(self.url + "a.bsp", filename)
+        self.assertEqual(self._read(filename), b"kernel")
+        self.assertTrue(os.path.samefile(filename, path))
+        self.assertEqual(
+            [code for _path, code in _ETagRequestHandler.statuses],
+            [200, 304, 200],
+        )
+
+    def test_concurrent_eviction(self):
+        for i in range(50):
+            name = f"{i}.bsp"
+            self._write_remote(name, name.encode())
+            self.cache.fetch(self.url + name)
+
+        # caches of other processes do not share the thread lock
+        caches = [KernelCache(self.cache.root, max_bytes=0) for _ in range(8)]
+        with ThreadPoolExecutor(max_workers=len(caches)) as executor:
+            futures = [executor.submit(cache.evict) for cache in caches]
+            for future in futures:
+                future.result()
+        self.assertEqual(os.listdir(self.cache.root / "objects"), [])
+        self.assertEqual(os.listdir(self.cache.root / "urls"), [])
+
+    def test_eviction(self):
+        cache = KernelCache(self.cache.root, max_bytes=25)
+        for name in ("a.bsp", "b.bsp", "c.bsp"):
+            self._write_remote(name, name.encode() * 2)
+        cache.fetch(self.url + "a.bsp")
+        cache.fetch(self.url + "b.bsp")
+        cache.fetch(self.url + "a.bsp")
+        cache.fetch(self.url + "c.bsp")
+
+        # b.bsp is the least recently used
+        objects = os.listdir(cache.root / "objects")
+        self.assertEqual(len(objects), 2)
+        self.assertNotIn(hashlib.sha256(b"b.bsp" * 2).hexdigest(), objects)
+        self.assertEqual(len(os.listdir(cache.root / "urls")), 2)
+
+    def test_materialize(self):
+        self._write_remote("a.bsp", b"kernel")
+        filename = os.path.join(self.local, "spk", "a.bsp")
+        self.cache.materialize(self.url + "a.bsp", filename)
+        path = self.cache.fetch(self.url + "a.bsp")
+        self.assertTrue(os.path.samefile(filename, path))
+
+        filename = os.path.join(self.local, "spk", "b.bsp")
+        self.cache.materialize(self.url + "a.bsp", filename, mode="symlink")
+        self.assertTrue(os.path.islink(filename))
+        self.assertEqual(self._read(filename), b"kernel")
+
+        filename = os.path.join(self.local, "spk", "c.bsp")
+        self.cache.materialize(self.url + "a.bsp", filename, mode="copy")
+        self.assertFalse(os.path.samefile(filename, path))
+        self.assertEqual(self._read(filename), b"kernel")
+
+
+if __name__ == "__main__":
+    unittest.main()
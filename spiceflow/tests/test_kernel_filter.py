@@ -0,0 +1,340 @@
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.furnsh import remote_furnsh
+from spiceflow.kernel_filter import (
+    file_reader,
+    read_daf_summaries,
+    select_kernels,
+)
+
+
+FRAME_KERNEL = """KPL/FK
+\\begindata
+FRAME_TEST_SC = -999000
+FRAME_-999000_NAME = 'TEST_SC'
+FRAME_-999000_CLASS = 3
+FRAME_-999000_CLASS_ID = -999000
+FRAME_-999000_CENTER = -999
+CK_-999000_SCLK = -999
+CK_-999000_SPK = -999
+FRAME_TEST_INST = -999100
+FRAME_-999100_NAME = 'TEST_INST'
+FRAME_-999100_CLASS = 4
+FRAME_-999100_CLASS_ID = -999100
+FRAME_-999100_CENTER = -999
+TKFRAME_-999100_RELATIVE = 'TEST_SC'
+TKFRAME_-999100_SPEC = 'ANGLES'
+TKFRAME_-999100_UNITS = 'DEGREES'
+TKFRAME_-999100_AXES = ( 1, 2, 3 )
+TKFRAME_-999100_ANGLES = ( 0.0, 0.0, 0.0 )
+FRAME_TEST_OTHER = -998000
+FRAME_-998000_NAME = 'TEST_OTHER'
+FRAME_-998000_CLASS = 3
+FRAME_-998000_CLASS_ID = -998000
+FRAME_-998000_CENTER = -998
+FRAME_TEST_CAM = -998100
+FRAME_-998100_NAME = 'TEST_CAM'
+FRAME_-998100_CLASS = 4
+FRAME_-998100_CLASS_ID = -998100
+FRAME_-998100_CENTER = -998
+TKFRAME_TEST_CAM_RELATIVE = 'TEST_OTHER'
+TKFRAME_TEST_CAM_SPEC = 'ANGLES'
+TKFRAME_TEST_CAM_UNITS = 'DEGREES'
+TKFRAME_TEST_CAM_AXES = ( 1, 2, 3 )
+TKFRAME_TEST_CAM_ANGLES = ( 0.0, 0.0, 0.0 )
+\\begintext
+"""
+
+# the clock -998 starts 1e6 seconds before the clock -999
+SCLK_KERNEL = """KPL/SCLK
+\\begindata
+SCLK_KERNEL_ID = ( @2000-01-01 )
+SCLK_DATA_TYPE_999 = ( 1 )
+SCLK01_TIME_SYSTEM_999 = ( 1 )
+SCLK01_N_FIELDS_999 = ( 1 )
+SCLK01_MODULI_999 = ( 1000000000 )
+SCLK01_OFFSETS_999 = ( 0 )
+SCLK01_OUTPUT_DELIM_999 = ( 1 )
+SCLK_PARTITION_START_999 = ( 0.0 )
+SCLK_PARTITION_END_999 = ( 1.0E9 )
+SCLK01_COEFFICIENTS_999 = ( 0.0 0.0 1.0 )
+SCLK_DATA_TYPE_998 = ( 1 )
+SCLK01_TIME_SYSTEM_998 = ( 1 )
+SCLK01_N_FIELDS_998 = ( 1 )
+SCLK01_MODULI_998 = ( 1000000000 )
+SCLK01_OFFSETS_998 = ( 0 )
+SCLK01_OUTPUT_DELIM_998 = ( 1 )
+SCLK_PARTITION_START_998 = ( 0.0 )
+SCLK_PARTITION_END_998 = ( 1.0E9 )
+SCLK01_COEFFICIENTS_998 = ( 0.0 -1.0E6 1.0 )
+\\begintext
+"""
+
+META_KERNEL = """KPL/MK
+\\begindata
+PATH_VALUES = ( 'data' )
+PATH_SYMBOLS = ( 'ROOT' )
+KERNELS_TO_LOAD = (
+{}
+)
+\\begintext
+"""
+
+# name, target, center, start, stop
+SPK_SEGMENTS = [
+    ("moon.bsp", 301, 3, 0.0, 100.0),
+    ("earth.bsp", 3, 0, 0.0, 100.0),
+    ("mars.bsp", 4, 0, 0.0, 100.0),
+    ("moon_late.bsp", 301, 3, 1000.0, 2000.0),
+]
+
+# name, CK ID
+CK_SEGMENTS = [("sc.bc", -999000), ("other.bc", -998000)]
+
+
+def _write_spk(filename, target, center, start, stop):
+    handle = spice.spkopn(filename, "test", 0)
+    epochs = np.linspace(start, stop, 4)
+    states = np.zeros((4, 6))
+    states[:, 0] = 1.0e5
+    spice.spkw09(
+        handle,
+        target,
+        center,
+        "J2000",
+        start,
+        stop,
+        "test",
+        3,
+        4,
+        states,
+        epochs,
+    )
+    spice.spkcls(handle)
+
+
+def _write_ck(filename, ck_id):
+    handle = spice.ckopn(filename, "test", 0)
+    ticks = np.array([0.0, 100.0])
+    quats = np.array([[1.0, 0.0, 0.0, 0.0]] * 2)
+    spice.ckw03(
+        handle,
+        0.0,
+        100.0,
+        ck_id,
+        "J2000",
+        False,
+        "test",
+        2,
+        ticks,
+        quats,
+        np.zeros((2, 3)),
+        1,
+        ticks[:1],
+    )
+    spice.ckcls(handle)
+
+
+class _RangeRequestHandler(SimpleHTTPRequestHandler):
+    """ Static file handler supporting single closed byte ranges """
+
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        self.requests.append((self.path, header))
+        if header is None:
+            return super().do_GET()
+        path = self.translate_path(self.path)
+        with open(path, "rb") as f:
+            data = f.read()
+        start, end = header[len("bytes=") :].split("-")
+        data = data[int(start) : int(end) + 1]
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmpdir.name, "remote")
+        self.local = os.path.join(self._tmpdir.name, "local")
+        data = os.path.join(self.root, "data")
+        os.makedirs(os.path.join(self.root, "mk"))
+        os.makedirs(data)
+        for name, target, center, start, stop in SPK_SEGMENTS:
+            _write_spk(os.path.join(data, name), target, center, start, stop)
+        for name, ck_id in CK_SEGMENTS:
+            _write_ck(os.path.join(data, name), ck_id)
+        with open(os.path.join(data, "test.tf"), "w") as f:
+            f.write(FRAME_KERNEL)
+        self.names = ["test.tf"] + [s[0] for s in SPK_SEGMENTS + CK_SEGMENTS]
+        with open(os.path.join(self.root, "mk", "test.tm"), "w") as f:
+            f.write(
+                META_KERNEL.format(
+                    "\n".join(f"'$ROOT/{name}'" for name in self.names)
+                )
+            )
+
+        _RangeRequestHandler.requests = []
+        handler = partial(_RangeRequestHandler, directory=self.root)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_port)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        spice.kclear()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmpdir.cleanup()
+
+    def _summaries(self):
+        return [
+            read_daf_summaries(
+                file_reader(os.path.join(self.root, "data", name))
+            )
+            for name in self.names
+        ]
+
+    def test_read_daf_summaries(self):
+        idword, summaries = read_daf_summaries(
+            file_reader(os.path.join(self.root, "data", "moon.bsp"))
+        )
+        self.assertEqual(idword, "DAF/SPK")
+        self.assertEqual(len(summaries), 1)
+        dc, ic = summaries[0]
+        self.assertEqual(dc, (0.0, 100.0))
+        self.assertEqual(ic[:4], (301, 3, 1, 9))
+
+        idword, summaries = read_daf_summaries(
+            file_reader(os.path.join(self.root, "data", "sc.bc"))
+        )
+        self.assertEqual(idword, "DAF/CK")
+        self.assertEqual(summaries[0][1][:3], (-999000, 1, 3))
+
+        self.assertIsNone(
+            read_daf_summaries(
+                file_reader(os.path.join(self.root, "data", "test.tf"))
+            )
+        )
+
+    def test_select_bodies(self):
+        selected = select_kernels(
+            self._summaries(), window=(10.0, 20.0), bodies=[301]
+        )
+        names = [n for n, s in zip(self.names, selected) if s]
+        self.assertEqual(
+            names, ["test.tf", "moon.bsp", "earth.bsp", "sc.bc", "other.bc"]
+        )
+
+    def test_select_frames(self):
+        spice.furnsh(os.path.join(self.root, "data", "test.tf"))
+        selected = select_kernels(self._summaries(), frames=["TEST_INST"])
+        names = [n for n, s in zip(self.names, selected) if s]
+        self.assertEqual(
+            names,
+            ["test.tf", "moon.bsp", "earth.bsp", "mars.bsp"]
+            + ["moon_late.bsp", "sc.bc"],
+        )
+
+        # the variables of TEST_CAM are named by the frame name
+        selected = select_kernels(self._summaries(), frames=["TEST_CAM"])
+        names = [n for n, s in zip(self.names, selected) if s]
+        self.assertEqual(
+            names,
+            ["test.tf", "moon.bsp", "earth.bsp", "mars.bsp"]
+            + ["moon_late.bsp", "other.bc"],
+        )
+
+    def test_ck_clock(self):
+        filename = os.path.join(self._tmpdir.name, "test.tsc")
+        with open(filename, "w") as f:
+            f.write(SCLK_KERNEL)
+        spice.furnsh(filename)
+        summaries = self._summaries()
+
+        # the window is outside other.bc in the default clock of its CK ID
+        selected = select_kernels(summaries, window=(10.0, 20.0), bodies=[])
+        names = [n for n, s in zip(self.names, selected) if s]
+        self.assertEqual(names, ["test.tf", "sc.bc"])
+
+        # but not in the clock assigned to it
+        spice.pipool("CK_-998000_SCLK", [-999])
+        selected = select_kernels(summaries, window=(10.0, 20.0), bodies=[])
+        names = [n for n, s in zip(self.names, selected) if s]
+        self.assertEqual(names, ["test.tf", "sc.bc", "other.bc"])
+
+    def test_remote_furnsh(self):
+        filename = os.path.join(self._tmpdir.name, "test.tm")
+        remote_furnsh(
+            self.url + "mk/test.tm",
+            filename,
+            local_kernel_dir=self.local,
+            verbose=False,
+            window=(10.0, 20.0),
+            bodies=["MOON"],
+            frames=["TEST_INST"],
+        )
+        selected = ["test.tf", "moon.bsp", "earth.bsp", "sc.bc"]
+        for name in self.names:
+            path = os.path.join(self.local, "data", name)
+            self.assertEqual(os.path.exists(path), name in selected)
+        with open(filename) as f:
+            content = f.read()
+        for name in self.names:
+            self.assertEqual(f"$ROOT/{name}" in content, name in selected)
+        self.assertEqual(spice.ktotal("SPK"), 2)
+        self.assertEqual(spice.ktotal("CK"), 1)
+        # only the summaries of the skipped kernels are downloaded
+        for path, header in _RangeRequestHandler.requests:
+            if path.endswith(("mars.bsp", "moon_late.bsp", "other.bc")):
+                self.assertIsNotNone(header)
+
+    def test_user_pool(self):
+        user_kernel = os.path.join(self._tmpdir.name, "user.tk")
+        with open(user_kernel, "w") as f:
+            f.write("KPL/PCK\n\\begindata\nUSER_KERNEL_VAR = 1.5\n")
+        spice.furnsh(user_kernel)
+        spice.pcpool("USER_VAR", ["kept"])
+        spice.pdpool("BODY301_RADII", [1.0, 2.0, 3.0])
+        spice.boddef("USER_BODY", -12345)
+
+        filename = os.path.join(self._tmpdir.name, "test.tm")
+        remote_furnsh(
+            self.url + "mk/test.tm",
+            filename,
+            local_kernel_dir=self.local,
+            verbose=False,
+            window=(10.0, 20.0),
+            bodies=["MOON"],
+        )
+        self.assertEqual(spice.gcpool("USER_VAR", 0, 1), ["kept"])
+        np.testing.assert_array_equal(
+            spice.gdpool("BODY301_RADII", 0, 3), [1.0, 2.0, 3.0]
+        )
+        self.assertEqual(spice.bodn2c("USER_BODY"), -12345)
+        self.assertEqual(spice.gdpool("USER_KERNEL_VAR", 0, 1), [1.5])
+        loaded = [
+            spice.kdata(i, "TEXT")[0] for i in range(spice.ktotal("TEXT"))
+        ]
+        self.assertEqual(loaded[0], user_kernel)
+        # the frame kernel is loaded through the new meta-kernel
+        self.assertEqual(spice.namfrm("TEST_INST"), -999100)
+
+
+if __name__ == "__main__":
+    unittest.main()
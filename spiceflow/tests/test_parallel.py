@@ -0,0 +1,65 @@
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+import spiceypy as spice
+
+from spiceflow import parallel
+from spiceflow.obs_info import ObsContext
+from spiceflow.parallel import simulate_parallel
+from spiceflow.simulate import simulate_series
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+
+
+ARGS = ("NONE", OBSRVR, 160, 120, 8.0)
+
+
+class TestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+
+    def tearDown(self):
+        parallel._worker.clear()
+        spice.kclear()
+
+    def test_worker_context(self):
+        parallel._init_worker([], INST)
+        context = parallel._worker["context"]
+        self.assertIsInstance(context, ObsContext)
+        for ets in ([0.0, 10.0], [20.0]):
+            obsinfos = parallel._simulate_chunk((INST, ets) + ARGS)
+            self.assertEqual(len(obsinfos), len(ets))
+            for obsinfo in obsinfos:
+                self.assertIs(obsinfo.context, context)
+
+    def test_worker_without_inst(self):
+        parallel._init_worker([])
+        with self.assertRaisesRegex(ValueError, "get_pool"):
+            parallel._simulate_chunk((INST, [0.0]) + ARGS)
+        parallel._init_worker([], INST)
+        with self.assertRaisesRegex(ValueError, "OTHERCAM"):
+            parallel._simulate_chunk(("OTHERCAM", [0.0]) + ARGS)
+
+    def test_pool_without_inst(self):
+        with parallel.get_pool(self.meta_kernel, 1) as pool:
+            with self.assertRaisesRegex(ValueError, "get_pool"):
+                pool.map(parallel._simulate_chunk, [(INST, [0.0]) + ARGS])
+
+    def test_simulate_parallel(self):
+        ets = np.linspace(0.0, 400.0, 5)
+        expected = list(simulate_series(INST, ets, *ARGS))
+        obsinfos = list(
+            simulate_parallel(
+                self.meta_kernel, INST, ets, *ARGS, processes=2, chunksize=2
+            )
+        )
+        self.assertEqual(len(obsinfos), len(ets))
+        for obsinfo, reference in zip(obsinfos, expected):
+            self.assertEqual(obsinfo.et, reference.et)
+            self.assertEqual(
+                ET.tostring(obsinfo.to_xml()),
+                ET.tostring(reference.to_xml()),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+import spiceypy as spice
+from numpy.testing import assert_allclose
+
+from spiceflow.flow_rect import FlowRect
+from spiceflow.raycast import RaycastSession, pixel_rays, raycast_ellipsoid
+from spiceflow.scene import pixel_radius
+from spiceflow.simulate import simulate
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+from spiceflow.transform import viewport_frustum
+
+
+WIDTH = 320
+HEIGHT = 240
+
+
+class TestCase(unittest.TestCase):
+    def test_pixel_rays(self):
+        rect = FlowRect(left=-0.2, top=-0.1, right=0.4, bottom=0.2, z=2.0)
+        rays = pixel_rays(rect, 60, 30, 10, 20, 5, 9)
+        self.assertEqual(rays.shape, (4, 10, 3))
+
+        # pixel centers are projected back onto themselves
+        vp = viewport_frustum(rect, 60, 30, rays.reshape(-1, 3).T)
+        x, y = np.meshgrid(np.arange(10, 20) + 0.5, np.arange(5, 9) + 0.5)
+        assert_allclose(vp[0], x.ravel())
+        assert_allclose(vp[1], y.ravel())
+
+    def test_raycast_ellipsoid(self):
+        # body-fixed x axis along the instrument z axis
+        rotation = np.array([[0, 0, -1], [0, 1, 0], [1, 0, 0]], dtype=float)
+        position = np.array([0.0, 0.0, 100.0])
+        radii = np.array([10.0, 20.0, 30.0])
+        rays = np.array(
+            [[0.0, 0.0, 1.0], [0.0, 0.19, 1.0], [0.0, 0.21, 1.0]]
+        )
+        hit, points, t = raycast_ellipsoid(rays, position, rotation, radii)
+
+        assert_allclose(hit, [True, True, False])
+        assert_allclose(t[0], 90.0)
+        assert_allclose(points[0], [-10.0, 0.0, 0.0], atol=1e-12)
+        on_surface = np.sum(np.square(points[hit] / radii), axis=1)
+        assert_allclose(on_surface, 1.0)
+
+    def test_behind_observer(self):
+        hit, _points, _t = raycast_ellipsoid(
+            np.array([[0.0, 0.0, 1.0]]),
+            np.array([0.0, 0.0, -100.0]),
+            np.identity(3),
+            np.array([10.0, 10.0, 10.0]),
+        )
+        self.assertFalse(hit[0])
+
+
+class SessionTestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+        self.obsinfo = simulate(INST, 0.0, "NONE", OBSRVR, WIDTH, HEIGHT, 8.0)
+        self.obsinfo.set_obs_table(self.obs_table)
+        self.moon = self.obsinfo.solar_objects[0]
+        self.assertEqual(self.moon["name"], "MOON")
+        with RaycastSession(WIDTH, HEIGHT) as session:
+            self.image = session.render(self.obsinfo)
+            self.depth = session.depth
+
+    def tearDown(self):
+        spice.kclear()
+
+    def test_silhouette(self):
+        y, x = np.nonzero(self.depth > 0)
+        # pixel centers of the disk
+        assert_allclose(
+            [np.mean(x) + 0.5, np.mean(y) + 0.5],
+            self.moon["image_pos"],
+            atol=0.1,
+        )
+        radius = pixel_radius(self.moon, self.obsinfo.angle_res)
+        self.assertAlmostEqual(np.sqrt(len(x) / np.pi), radius, delta=0.5)
+        self.assertAlmostEqual((np.ptp(x) + 1) / 2.0, radius, delta=1.0)
+        self.assertAlmostEqual((np.ptp(y) + 1) / 2.0, radius, delta=1.0)
+
+    def test_depth(self):
+        body = self.depth > 0
+        rect = self.obsinfo.fov.bounds_rect
+        rays = pixel_rays(rect, WIDTH, HEIGHT, 0, WIDTH, 0, HEIGHT)
+        # depth is along the boresight, and the range is along the rays
+        ranges = self.depth * np.linalg.norm(rays, axis=2) / rays[..., 2]
+        distance = np.linalg.norm(self.moon["position"])
+        tolerance = np.max(self.moon["radius"])
+        self.assertTrue(np.all(ranges[body] >= distance - tolerance - 1e-6))
+        self.assertTrue(np.all(ranges[body] <= distance))
+        self.assertTrue(np.all(self.depth[~body] == 0.0))
+
+    def test_lit_side(self):
+        # direction to the Sun from the Moon, projected onto the image
+        position = np.asarray(self.moon["position"])
+        sun = -self.obsinfo.pos - position
+        sun /= np.linalg.norm(sun)
+        rect = self.obsinfo.fov.bounds_rect
+        radius = 0.5 * np.max(self.moon["radius"])
+        points = np.array([position + radius * sun, position - radius * sun])
+        vp = viewport_frustum(rect, WIDTH, HEIGHT, points.T)
+        direction = vp[0:2, 0] - vp[0:2, 1]
+        self.assertGreater(np.linalg.norm(direction), 10.0)
+
+        y, x = np.nonzero(self.depth > 0)
+        offsets = np.dot(
+            np.stack([x + 0.5, y + 0.5], axis=1) - self.moon["image_pos"],
+            direction,
+        )
+        brightness = np.sum(self.image[y, x, 0:3], axis=1, dtype=float)
+        lit = np.mean(brightness[offsets > 0])
+        dark = np.mean(brightness[offsets < 0])
+        self.assertGreater(lit, 4.0 * dark)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.render import RenderSession, render, unit_sphere
+from spiceflow.simulate import simulate_series
+from spiceflow.star import rasterize_stars
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+from spiceflow.tests.kernels import require_offscreen_context
+
+
+WIDTH = 320
+HEIGHT = 240
+
+
+class TestCase(SceneTestCase):
+    @classmethod
+    def setUpClass(cls):
+        require_offscreen_context()
+        super().setUpClass()
+
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+
+    def tearDown(self):
+        spice.kclear()
+
+    def _simulate(self, ets):
+        for obsinfo in simulate_series(
+            INST, ets, "NONE", OBSRVR, WIDTH, HEIGHT, 8.0
+        ):
+            obsinfo.set_obs_table(self.obs_table)
+            yield obsinfo
+
+    def test_session(self):
+        obsinfos = list(self._simulate(np.linspace(0.0, 1000.0, 4)))
+        images = []
+        moon_node = None
+        with RenderSession(WIDTH, HEIGHT) as session:
+            for obsinfo in obsinfos:
+                out = np.zeros((HEIGHT, WIDTH, 4), dtype=np.uint8)
+                image = session.render(obsinfo, out=out)
+                self.assertIs(image, out)
+                images.append(image)
+
+                # the Moon mesh is moved, and TESTROCK is drawn as a sprite
+                self.assertEqual(list(session._mesh_nodes), [301])
+                if moon_node is None:
+                    moon_node = session._mesh_nodes[301]
+                self.assertIs(session._mesh_nodes[301], moon_node)
+                self.assertEqual(session.depth.shape, (HEIGHT, WIDTH))
+                self.assertGreater(np.count_nonzero(session.depth), 0)
+
+        # offscreen contexts cannot be nested, so the frames rendered
+        # from scratch are compared after the session is closed
+        for obsinfo, image in zip(obsinfos, images):
+            np.testing.assert_array_equal(image, render(obsinfo))
+
+    def test_body_leaves_fov(self):
+        obsinfo, = self._simulate([0.0])
+        with RenderSession(WIDTH, HEIGHT) as session:
+            session.render(obsinfo)
+            self.assertEqual(len(session._mesh_nodes), 1)
+            obsinfo.solar_objects = []
+            image = session.render(obsinfo)
+            self.assertEqual(session._mesh_nodes, {})
+            self.assertEqual(np.count_nonzero(session.depth), 0)
+        np.testing.assert_array_equal(image, render(obsinfo))
+
+    def test_composite(self):
+        obsinfo, = self._simulate([0.0])
+        obsinfo.solar_objects = [
+            body for body in obsinfo.solar_objects if body["name"] == "MOON"
+        ]
+        with RenderSession(WIDTH, HEIGHT, bg_color=(0.0, 0.0, 0.5)) as session:
+            image = session.render(obsinfo)
+            body = session.depth > 0
+
+        # stars are drawn by their alpha over the background, except on the
+        # pixels covered by the Moon
+        stars = rasterize_stars(obsinfo.stars, WIDTH, HEIGHT)
+        covered = stars[..., 3] > 0
+        self.assertGreater(np.count_nonzero(covered & ~body), 0)
+        expected = np.where(
+            covered[..., None], stars, np.array([0, 0, 127, 255], np.uint8)
+        )
+        np.testing.assert_array_equal(image[~body], expected[~body])
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertTrue(np.all(image[body, 3] == 255))
+
+
+class UnitSphereTestCase(unittest.TestCase):
+    def test_uv(self):
+        for count in ((8, 8), (32, 32), (64, 64)):
+            vertices, faces, uv = unit_sphere(count)
+            # per-vertex texture coordinates from reclat
+            expected = []
+            for vertex in vertices:
+                _r, lon, lat = spice.reclat(np.array(vertex))
+                u = (lon + np.pi) / (2.0 * np.pi)
+                v = (np.pi / 2.0 - lat) / np.pi
+                expected.append([u, v])
+            np.testing.assert_allclose(uv, expected, rtol=0.0, atol=1.0e-12)
+            np.testing.assert_allclose(np.linalg.norm(vertices, axis=1), 1.0)
+            self.assertEqual(faces.shape[1], 3)
+
+            # the poles and the vertices on the seam at lon = +-pi
+            poles = np.abs(vertices[:, 2]) == 1.0
+            self.assertEqual(np.count_nonzero(poles), 2)
+            np.testing.assert_allclose(
+                np.sort(uv[poles, 1]), [0.0, 1.0], atol=1.0e-12
+            )
+            seam = (vertices[:, 0] < 0.0) & (np.abs(vertices[:, 1]) < 1e-12)
+            self.assertGreater(np.count_nonzero(seam), 0)
+            u = uv[seam, 0]
+            np.testing.assert_allclose(np.fmin(u, 1.0 - u), 0.0, atol=1e-12)
+
+    def test_cache(self):
+        arrays = unit_sphere((16, 16))
+        self.assertIs(unit_sphere((16, 16)), arrays)
+        self.assertIsNot(unit_sphere((8, 8)), arrays)
+        for array in arrays:
+            self.assertFalse(array.flags.writeable)
+            with self.assertRaises(ValueError):
+                array[0] = 0
+
+
+if __name__ == "__main__":
+    unittest.main()
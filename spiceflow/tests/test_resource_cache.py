@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+
+from spiceflow.resource_cache import ResourceCache
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.files = []
+        for i in range(3):
+            filename = os.path.join(self.tmpdir.name, f"{i}.dat")
+            with open(filename, "w") as f:
+                f.write(str(i))
+            self.files.append(filename)
+        self.loads = []
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _get(self, cache, filename):
+        def loader():
+            self.loads.append(filename)
+            return filename
+
+        return cache.get("data", filename, loader, lambda value: 10)
+
+    def test_hit(self):
+        cache = ResourceCache(100)
+        self._get(cache, self.files[0])
+        self._get(cache, self.files[0])
+        self.assertEqual(self.loads, [self.files[0]])
+        self.assertEqual(cache.nbytes, 10)
+
+    def test_lru_eviction(self):
+        cache = ResourceCache(20)
+        self._get(cache, self.files[0])
+        self._get(cache, self.files[1])
+        self._get(cache, self.files[0])
+        self._get(cache, self.files[2])
+        self.assertEqual(len(cache), 2)
+        self._get(cache, self.files[0])
+        self._get(cache, self.files[1])
+        self.assertEqual(
+            self.loads,
+            [self.files[0], self.files[1], self.files[2], self.files[1]],
+        )
+
+    def test_modified_file(self):
+        cache = ResourceCache(100)
+        self._get(cache, self.files[0])
+        stat = os.stat(self.files[0])
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self._get(cache, self.files[0])
+        self.assertEqual(self.loads, [self.files[0], self.files[0]])
+
+    def test_max_bytes(self):
+        cache = ResourceCache(100)
+        for filename in self.files:
+            self._get(cache, filename)
+        cache.max_bytes = 15
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
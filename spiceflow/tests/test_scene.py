@@ -0,0 +1,96 @@
+import os
+import unittest
+import numpy as np
+import spiceypy as spice
+from PIL import Image
+
+from spiceflow.raycast import RaycastSession
+from spiceflow.scene import (
+    LOD_COUNT_RANGE,
+    SPRITE_DEFAULT_MAGNITUDE,
+    pixel_radius,
+    solar_object_sprite,
+    sphere_count,
+)
+from spiceflow.simulate import simulate
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+
+
+class TestCase(SceneTestCase):
+    def tearDown(self):
+        spice.kclear()
+
+    def test_pixel_radius(self):
+        body = {"radius": np.array([1.0, 2.0, 1.0]), "distance": 200.0}
+        self.assertAlmostEqual(
+            pixel_radius(body, 0.01), np.degrees(np.arcsin(0.01)) / 0.01
+        )
+        # the observer is inside the body
+        body = {"radius": np.array([10.0, 10.0, 10.0]), "distance": 5.0}
+        self.assertAlmostEqual(pixel_radius(body, 0.5), 180.0)
+
+    def test_sphere_count(self):
+        self.assertIsNone(sphere_count(0.0))
+        self.assertIsNone(sphere_count(0.49))
+        self.assertEqual(sphere_count(0.5), (8, 8))
+        self.assertEqual(sphere_count(5.0), (8, 8))
+        # the edges along the equator are at most 4 pixels long
+        self.assertEqual(sphere_count(10.0), (16, 16))
+        self.assertEqual(sphere_count(10.5), (32, 32))
+        self.assertEqual(sphere_count(40.0), (64, 64))
+        self.assertEqual(sphere_count(1.0e4), (64, 64))
+        radii = np.geomspace(0.5, 1.0e3, 50)
+        counts = [sphere_count(radius)[0] for radius in radii]
+        self.assertEqual(counts, sorted(counts))
+        self.assertTrue(
+            all(LOD_COUNT_RANGE[0] <= n <= LOD_COUNT_RANGE[1] for n in counts)
+        )
+
+    def test_solar_object_sprite(self):
+        texture = os.path.join(self.tmpdir.name, "red.png")
+        image = np.zeros((4, 8, 3), dtype=np.uint8)
+        image[..., 0] = 200
+        image[0:2, :, 2] = 100
+        Image.fromarray(image).save(texture)
+
+        body = {
+            "image_pos": (10.5, 20.5),
+            "magnitude": 3.0,
+            "model": {"type": "texture-body", "file": texture},
+        }
+        sprite = solar_object_sprite(body)
+        self.assertEqual(sprite["image_pos"], (10.5, 20.5))
+        self.assertEqual(sprite["visual_magnitude"], 3.0)
+        self.assertEqual(sprite["color"], (200.0, 0.0, 50.0))
+
+        body = dict(body, magnitude=None, model={"type": "model"})
+        sprite = solar_object_sprite(body)
+        self.assertEqual(sprite["visual_magnitude"], SPRITE_DEFAULT_MAGNITUDE)
+        self.assertEqual(sprite["color"], (255, 255, 255))
+
+    def test_sprite_rendering(self):
+        spice.furnsh(self.meta_kernel)
+        obsinfo = simulate(INST, 0.0, "NONE", OBSRVR, 320, 240, 8.0)
+        obsinfo.set_obs_table(self.obs_table)
+        bodies = {body["name"]: body for body in obsinfo.solar_objects}
+        self.assertIsNotNone(
+            sphere_count(pixel_radius(bodies["MOON"], obsinfo.angle_res))
+        )
+        rock = bodies["TESTROCK"]
+        self.assertIsNone(sphere_count(pixel_radius(rock, obsinfo.angle_res)))
+
+        with RaycastSession(320, 240) as session:
+            image = session.render(obsinfo)
+            obsinfo.solar_objects = [bodies["MOON"]]
+            without_rock = session.render(obsinfo)
+
+        # the sprite is drawn around the position of TESTROCK
+        changed = np.any(image != without_rock, axis=2)
+        self.assertGreater(np.count_nonzero(changed), 0)
+        y, x = np.nonzero(changed)
+        self.assertLess(np.max(np.abs(x + 0.5 - rock["image_pos"][0])), 5.0)
+        self.assertLess(np.max(np.abs(y + 0.5 - rock["image_pos"][1])), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
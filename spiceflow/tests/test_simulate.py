@@ -0,0 +1,56 @@
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.obs_info import ObsContext
+from spiceflow.simulate import simulate, simulate_series
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+
+
+ARGS = ("NONE", OBSRVR, 320, 240, 8.0)
+
+
+class TestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+
+    def tearDown(self):
+        spice.kclear()
+
+    def test_simulate_series(self):
+        ets = np.linspace(0.0, 1000.0, 4)
+        obsinfos = list(simulate_series(INST, ets, *ARGS))
+        self.assertEqual(len(obsinfos), len(ets))
+        # the epoch-independent state is shared
+        context = obsinfos[0].context
+        self.assertIsInstance(context, ObsContext)
+        for obsinfo in obsinfos:
+            self.assertIs(obsinfo.context, context)
+
+        for et, obsinfo in zip(ets, obsinfos):
+            reference = simulate(INST, et, *ARGS)
+            self.assertIsNot(reference.context, context)
+            self.assertEqual(obsinfo.et, et)
+            self.assertEqual(
+                [body["name"] for body in obsinfo.solar_objects],
+                ["MOON", "TESTROCK"],
+            )
+            self.assertGreater(len(obsinfo.stars), 0)
+            self.assertEqual(
+                ET.tostring(obsinfo.to_xml()),
+                ET.tostring(reference.to_xml()),
+            )
+
+    def test_context(self):
+        context = ObsContext(INST)
+        obsinfos = list(
+            simulate_series(INST, [0.0, 10.0], *ARGS, context=context)
+        )
+        for obsinfo in obsinfos:
+            self.assertIs(obsinfo.context, context)
+        self.assertEqual(list(simulate_series(INST, [], *ARGS)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
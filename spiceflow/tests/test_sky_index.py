@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from spiceflow.sky_index import SkyIndex
+from spiceflow.util import radrec_array, vec_dist
+
+
+class TestCase(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        n = 20000
+        self.ra = rng.uniform(0.0, 2.0 * np.pi, n)
+        self.dec = np.arcsin(rng.uniform(-1.0, 1.0, n))
+        self.mag = rng.uniform(-1.0, 12.0, n)
+        self.vectors = radrec_array(self.ra, self.dec)
+        self.index = SkyIndex(self.ra, self.dec, self.mag, self.vectors)
+
+    def _brute_force(self, center, radius, mag_limit):
+        dist = vec_dist(center, self.vectors)
+        mask = dist < radius
+        if mag_limit is not None:
+            mask &= self.mag < mag_limit
+        return np.flatnonzero(mask)
+
+    def test_cone_search(self):
+        centers = [
+            [1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0],
+            [0.0, 0.1, -1.0],
+            [-1.0, -0.001, 0.2],
+            [0.3, -0.4, 0.8],
+        ]
+        for center in centers:
+            for radius in [0.001, 0.05, 0.5, 2.0]:
+                for mag_limit in [None, 6.0, 20.0]:
+                    assert_array_equal(
+                        self.index.cone_search(center, radius, mag_limit),
+                        self._brute_force(center, radius, mag_limit),
+                    )
+
+    def test_mag_limit_boundary(self):
+        # stars at, just below and just above the limit in a cell near the
+        # north pole, whose cell number is the largest
+        mag_limit = 6.0
+        mags = [
+            np.nextafter(mag_limit, -np.inf),
+            mag_limit,
+            np.nextafter(mag_limit, np.inf),
+            -30.0,
+            40.0,
+        ]
+        ra = np.full(len(mags), 3.0)
+        dec = np.full(len(mags), np.radians(89.5))
+        vectors = radrec_array(ra, dec)
+        index = SkyIndex(ra, dec, mags, vectors)
+        center = vectors[0]
+        assert_array_equal(index.cone_search(center, 0.01, mag_limit), [0, 3])
+        assert_array_equal(
+            index.cone_search(center, 0.01, np.nextafter(mag_limit, np.inf)),
+            [0, 1, 3],
+        )
+        assert_array_equal(index.cone_search(center, 0.01), range(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from types import SimpleNamespace
+import numpy as np
+import spiceypy as spice
+from numpy.testing import assert_allclose, assert_array_equal
+
+from spiceflow.fov import Fov
+from spiceflow.star import (
+    get_star_color,
+    rasterize_stars,
+    search_stars,
+    star_texture,
+)
+from spiceflow.star_catalog import StarCatalog
+from spiceflow.transform import viewport_frustum
+from spiceflow.util import vec_padist
+
+
+def _star(x, y, mag, color):
+    return {
+        "image_pos": np.array([x, y]),
+        "visual_magnitude": mag,
+        "color": color,
+    }
+
+
+def _search_stars_loop(obsinfo, catalog, mag_limit):
+    """ Star search of the original per-star loop over the EK rows """
+    stars = []
+    for row in range(len(catalog.hip_id)):
+        ra = catalog.ra[row]
+        dec = catalog.dec[row]
+        mag = catalog.visual_magnitude[row]
+        vec = spice.radrec(1.0, ra, dec)
+        tvec = spice.mxv(obsinfo.ref2obsmtx, vec)
+        _tpa, tdist = vec_padist(obsinfo.center, tvec)
+        if tdist < obsinfo.fov.fovmax and mag < mag_limit:
+            spectral = catalog.spectral_type[row]
+            distance = 1.0 / np.tan(catalog.parallax[row] * spice.rpd())
+            distance = spice.convrt(distance, "AU", "km")
+            vp = viewport_frustum(
+                obsinfo.fov.bounds_rect,
+                obsinfo.width,
+                obsinfo.height,
+                tvec * distance,
+            )
+            stars.append(
+                {
+                    "hip_id": catalog.hip_id[row],
+                    "position": tvec,
+                    "distance": distance,
+                    "visual_magnitude": mag,
+                    "image_pos": vp[0:2],
+                    "color": get_star_color(spectral),
+                }
+            )
+    return stars
+
+
+class TestCase(unittest.TestCase):
+    def tearDown(self):
+        spice.kclear()
+
+    def test_search_stars(self):
+        rng = np.random.RandomState(5)
+        n = 3000
+        obs2ref = spice.eul2m(0.4, np.pi / 2 - 0.3, 1.0, 3, 2, 3)
+        _r, ra0, dec0 = spice.recrad(obs2ref @ [0.0, 0.0, 1.0])
+        # half of the stars are scattered around the boresight
+        ra = np.concatenate(
+            [
+                rng.uniform(0.0, 2.0 * np.pi, n // 2),
+                rng.normal(ra0, 0.1, n // 2),
+            ]
+        )
+        dec = np.concatenate(
+            [
+                np.arcsin(rng.uniform(-1.0, 1.0, n // 2)),
+                rng.normal(dec0, 0.1, n // 2),
+            ]
+        )
+        # magnitudes on the limit test that the cut is exclusive
+        mag = np.round(rng.uniform(-1.0, 9.0, n), 0)
+        catalog = StarCatalog(
+            hip_id=np.arange(1, n + 1, dtype=np.int32),
+            ra=ra,
+            dec=dec,
+            visual_magnitude=mag,
+            parallax=rng.uniform(1.0e-6, 1.0e-4, n),
+            spectral_type=rng.choice(["G2V", "(K0)", "DA", "M1", "B5"], n),
+        )
+
+        spice.pcpool("INS-1006_FOV_SHAPE", ["RECTANGLE"])
+        spice.pcpool("INS-1006_FOV_FRAME", ["J2000"])
+        spice.pcpool("INS-1006_FOV_CLASS_SPEC", ["CORNERS"])
+        spice.pdpool("INS-1006_BORESIGHT", [0.0, 0.0, 1.0])
+        spice.pdpool(
+            "INS-1006_FOV_BOUNDARY_CORNERS",
+            [-0.2, -0.1, 1.0, 0.2, -0.1, 1.0, 0.2, 0.1, 1.0, -0.2, 0.1, 1.0],
+        )
+        fov = Fov(-1006)
+        obsinfo = SimpleNamespace(
+            fov=fov,
+            center=fov.bounds_rect.center_vec,
+            obs2refmtx=obs2ref,
+            ref2obsmtx=np.ascontiguousarray(np.transpose(obs2ref)),
+            width=640,
+            height=320,
+        )
+
+        stars = search_stars(obsinfo, 6.0, catalog)
+        expected = _search_stars_loop(obsinfo, catalog, 6.0)
+        self.assertGreater(len(expected), 50)
+        self.assertEqual(len(stars), len(expected))
+        assert_array_equal(
+            stars["hip_id"], [star["hip_id"] for star in expected]
+        )
+        self.assertTrue(np.all(stars["visual_magnitude"] < 6.0))
+        for name in ("position", "distance", "image_pos"):
+            assert_allclose(
+                stars[name],
+                [star[name] for star in expected],
+                rtol=1.0e-12,
+                atol=1.0e-9,
+            )
+        assert_array_equal(
+            stars["color"], [star["color"] for star in expected]
+        )
+
+    def test_rasterize_stars(self):
+        stars = [
+            _star(10.3, 12.7, 0.2, (255, 192, 192)),
+            _star(30.0, 5.5, 3.4, (128, 128, 255)),
+            _star(1.2, 39.6, 6.6, (224, 224, 255)),
+            _star(47.9, 20.0, 9.0, (255, 160, 160)),
+        ]
+        image = rasterize_stars(stars, 48, 40)
+
+        expected = np.zeros((40, 48, 4), dtype=np.uint8)
+        for star in stars:
+            x, y = star["image_pos"]
+            expected += star_texture(
+                x, y, star["visual_magnitude"], star["color"], 48, 40
+            )
+        assert_array_equal(image[..., 0:3], expected[..., 0:3])
+        assert_array_equal(
+            image[..., 3] == 255, np.any(expected[..., 0:3] > 0, axis=2)
+        )
+
+    def test_offset(self):
+        stars = [
+            _star(10.3, 12.7, 0.2, (255, 192, 192)),
+            _star(19.5, 20.1, 2.0, (128, 128, 255)),
+            _star(-0.4, 25.0, 4.0, (224, 224, 255)),
+        ]
+        image = rasterize_stars(stars, 48, 40)
+        for x0, y0 in [(0, 0), (16, 8), (20, 20)]:
+            tile = rasterize_stars(stars, 16, 12, offset=(x0, y0))
+            assert_array_equal(tile, image[y0 : y0 + 12, x0 : x0 + 16])
+
+    def test_saturation(self):
+        stars = [_star(5.0, 5.0, 0.0, (255, 255, 255))] * 3
+        image = rasterize_stars(stars, 10, 10)
+        self.assertEqual(image[5, 5, 0], 255)
+        self.assertEqual(image[2, 4, 0], 255)
+
+    def test_no_stars(self):
+        image = rasterize_stars([], 8, 6)
+        self.assertEqual(image.shape, (6, 8, 4))
+        self.assertFalse(np.any(image))
+
+
+if __name__ == "__main__":
+    unittest.main()
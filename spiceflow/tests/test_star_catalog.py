@@ -0,0 +1,42 @@
+import tempfile
+import unittest
+import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+
+from spiceflow.star_catalog import StarCatalog
+
+
+def _make_catalog():
+    return StarCatalog(
+        hip_id=np.array([1, 2, 3], dtype=np.int32),
+        ra=np.radians([0.0, 90.0, 180.0]),
+        dec=np.radians([0.0, 0.0, 90.0]),
+        visual_magnitude=np.array([1.0, 5.5, 9.0]),
+        parallax=np.array([1.0e-5, 2.0e-5, 3.0e-5]),
+        spectral_type=np.array(["G2V", "(K0)", "A0"], dtype=str),
+    )
+
+
+class TestCase(unittest.TestCase):
+    def test_vectors(self):
+        catalog = _make_catalog()
+        assert_array_almost_equal(
+            catalog.vectors,
+            np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float64),
+        )
+
+    def test_save_load(self):
+        catalog = _make_catalog()
+        with tempfile.TemporaryDirectory() as dirname:
+            catalog.save(dirname)
+            loaded = StarCatalog.load(dirname)
+            self.assertEqual(len(loaded), 3)
+            for column in StarCatalog.COLUMNS:
+                assert_array_equal(
+                    getattr(loaded, column), getattr(catalog, column)
+                )
+            self.assertIsInstance(loaded.ra.base, np.memmap)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import os
+import time
+import unittest
+import numpy as np
+import spiceypy as spice
+from PIL import Image
+
+from spiceflow.raycast import RaycastSession
+from spiceflow.simulate import simulate_series
+from spiceflow.stream import (
+    NpyCubeWriter,
+    PngSequenceWriter,
+    _FrameWriter,
+    render_sequence,
+)
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+
+
+WIDTH = 160
+HEIGHT = 120
+
+
+class _FailingWriter(_FrameWriter):
+    def write(self, index, image):
+        if index == 2:
+            raise RuntimeError("disk full")
+
+
+class _SlowWriter(_FrameWriter):
+    def __init__(self):
+        self.frames = []
+
+    def write(self, index, image):
+        time.sleep(0.02)
+        self.frames.append((index, image, image.copy()))
+
+
+class TestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+        self.ets = np.linspace(0.0, 1000.0, 6)
+
+    def tearDown(self):
+        spice.kclear()
+
+    def _simulate(self, ets):
+        return simulate_series(INST, ets, "NONE", OBSRVR, WIDTH, HEIGHT, 8.0)
+
+    def _expected(self, ets):
+        images = []
+        with RaycastSession(WIDTH, HEIGHT) as session:
+            for obsinfo in self._simulate(ets):
+                obsinfo.set_obs_table(self.obs_table)
+                images.append(session.render(obsinfo))
+        return images
+
+    def test_npy_cube(self):
+        filename = os.path.join(self.tmpdir.name, "cube.npy")
+        with NpyCubeWriter(filename, len(self.ets), WIDTH, HEIGHT) as writer:
+            nframes = render_sequence(
+                self._simulate(self.ets),
+                writer,
+                self.obs_table,
+                backend="raycast",
+            )
+        self.assertEqual(nframes, len(self.ets))
+        cube = np.load(filename)
+        self.assertEqual(cube.shape, (len(self.ets), HEIGHT, WIDTH, 4))
+        self.assertEqual(cube.dtype, np.uint8)
+        for image, expected in zip(cube, self._expected(self.ets)):
+            np.testing.assert_array_equal(image, expected)
+
+    def test_png_sequence(self):
+        dirname = os.path.join(self.tmpdir.name, "png")
+        ets = self.ets[:3]
+        with PngSequenceWriter(dirname) as writer:
+            render_sequence(
+                self._simulate(ets), writer, self.obs_table, backend="raycast"
+            )
+        self.assertEqual(
+            sorted(os.listdir(dirname)),
+            ["frame_000000.png", "frame_000001.png", "frame_000002.png"],
+        )
+        for i, expected in enumerate(self._expected(ets)):
+            filename = os.path.join(dirname, f"frame_{i:06d}.png")
+            with Image.open(filename) as image:
+                np.testing.assert_array_equal(np.asarray(image), expected)
+
+    def test_buffer_reuse(self):
+        ets = np.linspace(0.0, 1000.0, 12)
+        writer = _SlowWriter()
+        render_sequence(
+            self._simulate(ets),
+            writer,
+            self.obs_table,
+            queue_size=1,
+            backend="raycast",
+        )
+        expected = self._expected(ets)
+        self.assertEqual(
+            [index for index, _image, _copy in writer.frames],
+            list(range(len(ets))),
+        )
+        # a buffer is not rendered into again before it has been written
+        for (_index, _image, copy), image in zip(writer.frames, expected):
+            np.testing.assert_array_equal(copy, image)
+        buffers = {id(image) for _index, image, _copy in writer.frames}
+        self.assertEqual(len(buffers), 3)
+
+    def test_simulation_error(self):
+        def obsinfos():
+            yield from self._simulate(self.ets[:2])
+            raise RuntimeError("no ephemeris")
+
+        filename = os.path.join(self.tmpdir.name, "error.npy")
+        with NpyCubeWriter(filename, 2, WIDTH, HEIGHT) as writer:
+            with self.assertRaisesRegex(RuntimeError, "no ephemeris"):
+                render_sequence(
+                    obsinfos(), writer, self.obs_table, backend="raycast"
+                )
+
+    def test_writer_error(self):
+        with self.assertRaisesRegex(RuntimeError, "disk full"):
+            render_sequence(
+                self._simulate(np.linspace(0.0, 1000.0, 20)),
+                _FailingWriter(),
+                self.obs_table,
+                queue_size=1,
+                backend="raycast",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
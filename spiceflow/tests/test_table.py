@@ -0,0 +1,68 @@
+import pickle
+import unittest
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from spiceflow.star import get_star_color, get_star_colors
+from spiceflow.table import SolarObjectTable
+
+
+def _solar_object(naif_id, name, magnitude):
+    return {
+        "naif_id": naif_id,
+        "name": name,
+        "type": "SATELLITE",
+        "position": np.array([1.0, 2.0, 3.0]),
+        "magnitude": magnitude,
+        "distance": 4.0,
+        "radius": np.array([5.0, 5.0, 4.0]),
+        "rotation": np.identity(3),
+        "image_pos": np.array([6.0, 7.0]),
+    }
+
+
+class TestCase(unittest.TestCase):
+    def test_rows(self):
+        table = SolarObjectTable.from_rows(
+            [_solar_object(301, "MOON", -12.7), _solar_object(401, "X", None)]
+        )
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table[0]["name"], "MOON")
+        self.assertIsNone(table[1]["magnitude"])
+        self.assertTrue(np.isnan(table["magnitude"][1]))
+        assert_array_equal(table[-1]["radius"], [5.0, 5.0, 4.0])
+        self.assertEqual([row["naif_id"] for row in table], [301, 401])
+        with self.assertRaises(IndexError):
+            table[2]
+
+    def test_extra_keys(self):
+        table = SolarObjectTable.from_rows(
+            [_solar_object(301, "MOON", None), _solar_object(401, "X", None)]
+        )
+        model = {"type": "texture-body", "file": "moon.png"}
+        table[0]["model"] = model
+        self.assertIs(table[0]["model"], model)
+        self.assertIn("model", table[0])
+        self.assertNotIn("model", table[1])
+        self.assertNotIn("model", dict(table[1]))
+
+        copied = pickle.loads(pickle.dumps(table))
+        self.assertEqual(copied[0]["model"], model)
+        self.assertNotIn("model", copied[1])
+
+        del table[0]["model"]
+        self.assertNotIn("model", table[0])
+
+    def test_empty(self):
+        table = SolarObjectTable.from_rows([])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table["rotation"].shape, (0, 3, 3))
+
+    def test_star_colors(self):
+        spectral_types = ["G2V", "K0III", "(A)", "DA", "M5", "Q", "B9"]
+        expected = [get_star_color(s) for s in spectral_types]
+        assert_array_equal(get_star_colors(spectral_types), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
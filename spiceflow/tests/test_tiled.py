@@ -0,0 +1,87 @@
+import os
+import unittest
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.raycast import RaycastSession
+from spiceflow.render import render
+from spiceflow.simulate import simulate
+from spiceflow.star import rasterize_stars
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+from spiceflow.tests.kernels import require_offscreen_context
+from spiceflow.tiled import render_tiled, tile_viewports
+
+
+WIDTH = 320
+HEIGHT = 240
+TILE_SIZE = 48
+
+
+class TestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+        self.obsinfo = simulate(INST, 0.0, "NONE", OBSRVR, WIDTH, HEIGHT, 8.0)
+        self.obsinfo.set_obs_table(self.obs_table)
+        self.filename = os.path.join(self.tmpdir.name, "tiled.npy")
+
+    def tearDown(self):
+        spice.kclear()
+
+    def _tiles(self, mask):
+        y, x = np.nonzero(mask)
+        return set(zip(y // TILE_SIZE, x // TILE_SIZE))
+
+    def _assert_crosses_tiles(self, depth):
+        # the Moon and a star are split across the tiles
+        self.assertGreater(len(self._tiles(depth > 0)), 1)
+        stars = [
+            rasterize_stars([star], WIDTH, HEIGHT)[..., 3] > 0
+            for star in self.obsinfo.stars
+        ]
+        self.assertTrue(any(len(self._tiles(star)) > 1 for star in stars))
+
+    def test_tile_viewports(self):
+        viewports = tile_viewports(50, 30, 16)
+        self.assertEqual(len(viewports), 4 * 2)
+        self.assertEqual(viewports[0], (0, 0, 16, 16))
+        self.assertEqual(viewports[-1], (48, 16, 2, 14))
+
+        # the tiles cover the frame exactly once
+        count = np.zeros((30, 50), dtype=int)
+        for x, y, width, height in viewports:
+            count[y : y + height, x : x + width] += 1
+        self.assertTrue(np.all(count == 1))
+
+    def test_render_tiled(self):
+        with RaycastSession(WIDTH, HEIGHT) as session:
+            expected = session.render(self.obsinfo)
+            self._assert_crosses_tiles(session.depth)
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                image = render_tiled(
+                    self.obsinfo,
+                    self.filename,
+                    tile_size=TILE_SIZE,
+                    backend="raycast",
+                    processes=processes,
+                )
+                self.assertEqual(image.shape, (HEIGHT, WIDTH, 4))
+                np.testing.assert_array_equal(image, expected)
+                del image
+
+    def test_render_tiled_pyrender(self):
+        require_offscreen_context()
+        expected = render(self.obsinfo)
+        image = render_tiled(
+            self.obsinfo, self.filename, tile_size=TILE_SIZE, processes=2
+        )
+        self.assertEqual(image.shape, (HEIGHT, WIDTH, 4))
+        # the sub-frustums of the tiles are rasterized with rounding
+        # differences of one level on a few pixels along the tile edges
+        diff = np.abs(image.astype(int) - expected)
+        self.assertLessEqual(np.max(diff), 1)
+        self.assertLess(np.count_nonzero(diff), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
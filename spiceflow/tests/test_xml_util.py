@@ -0,0 +1,58 @@
+import io
+import os
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+import spiceypy as spice
+
+from spiceflow.simulate import simulate_series
+from spiceflow.tests.kernels import INST, OBSRVR, SceneTestCase
+from spiceflow.xml_util import SvdocWriter, write_svdoc
+
+
+class TestCase(SceneTestCase):
+    def setUp(self):
+        spice.furnsh(self.meta_kernel)
+        ets = np.linspace(0.0, 1000.0, 5)
+        self.obsinfos = list(
+            simulate_series(INST, ets, "NONE", OBSRVR, 320, 240, 8.0)
+        )
+        for obsinfo in self.obsinfos:
+            obsinfo.set_obs_table(self.obs_table)
+
+    def tearDown(self):
+        spice.kclear()
+
+    def _assert_frames(self, data):
+        root = ET.fromstring(data)
+        self.assertEqual(root.tag, "svdoc")
+        self.assertEqual(len(root), len(self.obsinfos))
+        for frame, obsinfo in zip(root, self.obsinfos):
+            expected = obsinfo.to_xml()
+            self.assertEqual(len(expected), 1)
+            self.assertEqual(ET.tostring(frame), ET.tostring(expected[0]))
+
+    def test_write_svdoc(self):
+        for processes in (None, 2):
+            with self.subTest(processes=processes):
+                f = io.BytesIO()
+                nframes = write_svdoc(iter(self.obsinfos), f, processes)
+                self.assertEqual(nframes, len(self.obsinfos))
+                self._assert_frames(f.getvalue())
+
+    def test_writer(self):
+        filename = os.path.join(self.tmpdir.name, "frames.xml")
+        with SvdocWriter(filename, processes=2, max_pending=1) as writer:
+            for obsinfo in self.obsinfos:
+                writer.write(obsinfo)
+        with open(filename, "rb") as f:
+            self._assert_frames(f.read())
+
+        # an empty document is still well-formed
+        f = io.BytesIO()
+        self.assertEqual(write_svdoc([], f), 0)
+        self.assertEqual(len(ET.fromstring(f.getvalue())), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import multiprocessing
+import numpy as np
+from .render import get_session_class
+
+
+__all__ = ["tile_viewports", "render_tiled"]
+
+
+# state of a worker process, set by _init_worker
+_worker = {}
+
+
+def tile_viewports(width, height, tile_size):
+    """
+    Split a frame into tiles
+
+    Parameters
+    ----------
+    width : int
+        frame width
+    height : int
+        frame height
+    tile_size : int
+        maximum width and height of the tiles
+
+    Returns
+    -------
+    viewports : list
+        tiles (x, y, width, height) in row-major order
+    """
+    return [
+        (x, y, min(tile_size, width - x), min(tile_size, height - y))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+
+def _init_worker(obsinfo, filename, bg_color, wireframe, backend):
+    # the ObsInfo is transferred once per worker instead of once per tile
+    _worker["obsinfo"] = obsinfo
+    _worker["image"] = np.load(filename, mmap_mode="r+")
+    _worker["session"] = get_session_class(backend)(
+        1, 1, bg_color, wireframe
+    )
+
+
+def _render_tile(viewport):
+    x0, y0, width, height = viewport
+    image = _worker["image"]
+    _worker["session"].render(
+        _worker["obsinfo"],
+        image[y0 : y0 + height, x0 : x0 + width],
+        viewport,
+    )
+    image.flush()
+    return viewport
+
+
+def render_tiled(
+    obsinfo,
+    filename,
+    tile_size=2048,
+    bg_color=(0.0, 0.0, 0.0),
+    wireframe=False,
+    backend="pyrender",
+    processes=None,
+):
+    """
+    Render a large frame by tiles into a memory-mapped .npy image
+
+    The viewport of the FOV is split into tiles, each of which is rendered
+    with its sub-frustum in a worker process and written directly into the
+    output file, so that the memory use of each worker depends only on the
+    tile size.
+
+    Parameters
+    ----------
+    obsinfo : ObsInfo
+        observation information
+    filename : str
+        output .npy file of shape (height, width, 4) and dtype uint8
+    tile_size : int
+        maximum width and height of the tiles
+    bg_color : tuple
+        background color
+    wireframe : bool
+        whether to render texture bodies as wireframes
+    backend : str
+        rendering backend, "pyrender" or "raycast"
+    processes : int
+        number of worker processes (default: os.cpu_count()); the tiles
+        are rendered in this process if 1
+
+    Returns
+    -------
+    image : numpy.memmap
+        rendered image opened read-only
+    """
+    image = np.lib.format.open_memmap(
+        filename,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(obsinfo.height, obsinfo.width, 4),
+    )
+    del image
+    viewports = tile_viewports(obsinfo.width, obsinfo.height, tile_size)
+    initargs = (obsinfo, filename, bg_color, wireframe, backend)
+
+    if processes == 1:
+        _init_worker(*initargs)
+        try:
+            for viewport in viewports:
+                _render_tile(viewport)
+        finally:
+            _worker["session"].close()
+            _worker.clear()
+    else:
+        # workers are spawned so that each creates its own OpenGL context
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(processes, _init_worker, initargs) as pool:
+            for _viewport in pool.imap_unordered(_render_tile, viewports):
+                pass
+    return np.load(filename, mmap_mode="r")
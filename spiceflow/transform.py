@@ -14,12 +14,12 @@ def viewport_frustum(rect, width, height, v):
     height : int
         scale height
     v : numpy.ndarray
-        a point on window
+        a point on window, or points on window with shape (3, n)
 
     Returns
     -------
     point : numpy.ndarray
-        correspondhing point on viewport
+        correspondhing point on viewport, or points with shape (3, n)
     """
     return np.array(
         [
@@ -1,5 +1,7 @@
+import os
 import numpy as np
 import spiceypy as spice
+from pathlib import Path
 
 
 def vec_padist(vec1, vec2):
@@ -42,6 +44,90 @@ def vec_padist(vec1, vec2):
     return pa, dist
 
 
+def vec_dist(vec, vecs):
+    """
+    Calculate great-circle distances from one vector to many vectors
+
+    Parameters
+    ----------
+    vec : numpy.ndarray
+        position vector of the reference target, or position vectors with
+        shape (n, 3) paired with vecs
+    vecs : numpy.ndarray
+        position vectors of targets with shape (n, 3)
+
+    Returns
+    -------
+    dist : numpy.ndarray
+        great-circle distances in radians with shape (n,)
+    """
+    u1 = np.asarray(vec, dtype=np.float64)
+    u1 = u1 / np.linalg.norm(u1, axis=-1, keepdims=True)
+    u2 = np.asarray(vecs, dtype=np.float64)
+    u2 = u2 / np.linalg.norm(u2, axis=-1, keepdims=True)
+    chord = np.linalg.norm(u2 - u1, axis=-1)
+    return np.arcsin(np.clip(chord / 2.0, 0.0, 1.0)) * 2
+
+
+def radrec_array(ra, dec):
+    """
+    Convert right ascensions and declinations to unit vectors
+
+    Parameters
+    ----------
+    ra : numpy.ndarray
+        right ascensions in radians
+    dec : numpy.ndarray
+        declinations in radians
+
+    Returns
+    -------
+    vecs : numpy.ndarray
+        unit vectors with shape (n, 3)
+    """
+    cos_dec = np.cos(dec)
+    return np.stack(
+        [cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1
+    )
+
+
+def loaded_kernels(kind="ALL"):
+    """
+    Obtain the kernel files currently loaded
+
+    Parameters
+    ----------
+    kind : str
+        kernel type such as "SPK", "EK" or "ALL"
+
+    Returns
+    -------
+    filenames : tuple
+        loaded kernel filenames in load order
+    """
+    return tuple(
+        spice.kdata(which, kind)[0] for which in range(spice.ktotal(kind))
+    )
+
+
+def get_cache_dir():
+    """
+    Obtain the directory for persistent caches
+
+    The directory is given by the environment variable SPICEFLOW_CACHE_DIR,
+    or defaults to ~/.cache/spiceflow.
+
+    Returns
+    -------
+    cache_dir : pathlib.Path
+        cache directory
+    """
+    cache_dir = os.environ.get("SPICEFLOW_CACHE_DIR")
+    if cache_dir is None:
+        return Path.home() / ".cache" / "spiceflow"
+    return Path(cache_dir)
+
+
 def get_object_type(object_id):
     """
     Obtain object type
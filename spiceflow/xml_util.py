@@ -1,3 +1,5 @@
+import collections
+import multiprocessing
 import xml.etree.ElementTree as ET
 
 
@@ -168,3 +170,120 @@ def get_star_xml(star):
     tag_color.text = "{},{},{}".format(*star["color"])
 
     return tag_object
+
+
+def get_frame_xml(obsinfo):
+    tag_frame = ET.Element("frame")
+    tag_frame.append(get_view_xml(obsinfo))
+    for solar_object in obsinfo.solar_objects:
+        tag_frame.append(get_solar_xml(solar_object))
+    for star in obsinfo.stars:
+        tag_frame.append(get_star_xml(star))
+    return tag_frame
+
+
+def _serialize_frame(obsinfo):
+    return ET.tostring(get_frame_xml(obsinfo))
+
+
+class SvdocWriter:
+    """
+    Incremental writer of a svdoc document with multiple frames
+
+    Each frame is serialized and written as soon as it is given, so that
+    the memory use does not depend on the number of frames. If processes
+    is given, frames are serialized in worker processes while keeping
+    their order, with at most max_pending frames in flight.
+
+    Parameters
+    ----------
+    file : str or file object
+        output filename or binary stream
+    processes : int
+        number of worker processes for serialization (default: serialize
+        in this process)
+    max_pending : int
+        maximum number of frames being serialized (default: 2 * processes)
+    """
+
+    def __init__(self, file, processes=None, max_pending=None):
+        if isinstance(file, str):
+            self._file = open(file, "wb")
+            self._close_file = True
+        else:
+            self._file = file
+            self._close_file = False
+        self._pool = None
+        self._pending = collections.deque()
+        if processes is not None:
+            context = multiprocessing.get_context("spawn")
+            self._pool = context.Pool(processes)
+            if max_pending is None:
+                max_pending = 2 * processes
+        self._max_pending = max_pending
+        self._file.write(b"<svdoc>")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, obsinfo):
+        """
+        Write a frame
+
+        Parameters
+        ----------
+        obsinfo : ObsInfo
+            observation information of the frame
+        """
+        if self._pool is None:
+            self._file.write(_serialize_frame(obsinfo))
+            return
+        result = self._pool.apply_async(_serialize_frame, (obsinfo,))
+        self._pending.append(result)
+        while len(self._pending) >= self._max_pending:
+            self._file.write(self._pending.popleft().get())
+
+    def close(self):
+        """ Write the pending frames and the end of the document """
+        if self._file is None:
+            return
+        try:
+            while self._pending:
+                self._file.write(self._pending.popleft().get())
+            self._file.write(b"</svdoc>")
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+            if self._close_file:
+                self._file.close()
+            self._file = None
+
+
+def write_svdoc(obsinfos, file, processes=None):
+    """
+    Write observations as frames of a svdoc document
+
+    Parameters
+    ----------
+    obsinfos : iterable
+        ObsInfo of each frame, e.g. simulate_series(...)
+    file : str or file object
+        output filename or binary stream
+    processes : int
+        number of worker processes for serialization
+
+    Returns
+    -------
+    nframes : int
+        number of frames written
+    """
+    nframes = 0
+    with SvdocWriter(file, processes) as writer:
+        for obsinfo in obsinfos:
+            writer.write(obsinfo)
+            nframes += 1
+    return nframes